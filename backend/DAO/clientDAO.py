@@ -2,7 +2,10 @@ import logging
 
 from fastapi import HTTPException
 
+import psycopg2.extensions
 from connect import get_db_connection
+from typing import Iterable, Optional
+from pagination import id_page_query, split_page
 from DAO.client import Client
 
 class ClientDAO:
@@ -14,9 +17,13 @@ class ClientDAO:
         
         self.logger = logging.getLogger("appLogger")
         
-        self.db_connection = get_db_connection()
-        
-        
+    @property
+    def db_connection(self) -> psycopg2.extensions.connection:
+        """
+        Pooled connection of the current request.
+        """
+        return get_db_connection()
+
     def create_client(self, client: Client) -> Client:
         """
         Insert a new client into the database.
@@ -86,6 +93,37 @@ class ClientDAO:
         
             
             
+    def get_clients_by_ids(self, client_ids: Iterable[int]) -> dict[int, Client]:
+        """
+        Retrieve several clients with a single query.
+        :param client_ids: The IDs of the clients to retrieve.
+        :return: A dictionary of the clients found, keyed by their ID.
+        """
+        ids = list(set(int(client_id) for client_id in client_ids))
+        if not ids:
+            return {}
+
+        query = """
+                SELECT * FROM "Clients" WHERE "ClientID" = ANY(%s)
+                """
+
+        logging.debug(f"Retrieving {len(ids)} clients by ID")
+
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(query, (ids,))
+            return {
+                row[0]: Client(
+                    clientID=row[0],
+                    CompanyName=row[1],
+                    CIF=row[2],
+                    address=row[3],
+                    email=row[4],
+                    phone=row[5],
+                    contact=row[6]
+                )
+                for row in cursor.fetchall()
+            }
+
     def get_all_clients(self) -> list[Client]:
         """
         Retrieve all clients from the database.
@@ -117,6 +155,36 @@ class ClientDAO:
             logging.info(f"Retrieved {len(clients)} clients")
             return clients
         
+    def get_clients_page(self, limit: int, after: Optional[str] = None) -> tuple[list[Client], Optional[str]]:
+        """
+        Retrieve one page of clients, ordered by ID.
+        :param limit: The maximum number of clients.
+        :param after: The cursor of the previous page, None for the first page.
+        :return: The clients and the cursor of the next page, None on the last page.
+        """
+        query, params = id_page_query('"Clients"', '"ClientID"', limit, after)
+
+        logging.debug(f"Retrieving {limit} clients after {after}")
+
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(query, params)
+            results, next_cursor = split_page(cursor.fetchall(), limit, lambda row: (row[0],))
+            clients = [
+                Client(
+                    clientID=row[0],
+                    CompanyName=row[1],
+                    CIF=row[2],
+                    address=row[3],
+                    email=row[4],
+                    phone=row[5],
+                    contact=row[6]
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(clients)} clients")
+            return clients, next_cursor
+
     def update_client(self, client: Client) -> Client:
         """
         Update an existing client in the database.
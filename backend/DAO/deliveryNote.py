@@ -7,8 +7,7 @@ import logging
 from DAO.product import Product 
 from DAO.client import Client
 from DAO.employe import Employe
-from DAO.clientDAO import ClientDAO
-from DAO.employeDAO import EmployeDAO
+from nameLoader import get_name_loader
 
 class ProductInDeliveryNote(BaseModel):
     id: int
@@ -49,10 +48,10 @@ class DeliveryNote:
         return total
     
     def get_deliveryNote_client(self) -> Client:
-        return ClientDAO().get_client_by_id(self.clientId)
+        return get_name_loader().get_client(self.clientId)
     
     def get_deliveryNote_employe(self) -> Employe:
-        return EmployeDAO().get_employee_by_id(self.employeId)
+        return get_name_loader().get_employe(self.employeId)
 
     def get_json(self) -> DeliveryNoteModel:
         return DeliveryNoteModel(
@@ -1,29 +1,50 @@
 from fastapi import HTTPException
 import logging
 
+import psycopg2.extensions
 from connect import get_db_connection
 from DAO.deliveryNote import DeliveryNote
+from DAO.lineWriter import write_lines
 from DAO.product import Product
+from documentFilter import DocumentFilter
+from pagination import STREAM_BATCH_SIZE, document_page_query, split_page
+from typing import Iterator, Optional
 from DAO.productDAO import ProductDAO
 
+# Product lines of a set of delivery notes, looked up by the index on "DeliveryNoteID"
+DELIVERY_NOTE_LINES_QUERY = """
+SELECT "DeliveryNoteID", "ProductID", "Quantity"
+FROM "ProdDn"
+WHERE "DeliveryNoteID" = ANY(%s);
+"""
+
 class DeliveryNoteDAO:
     def __init__(self):
         """
         Initialize the DAO with a database connection.
         :param db_connection: A database connection object.
         """
-        self.db_connection = get_db_connection()
         self.logger = logging.getLogger("appLogger")
+        self.product_dao = ProductDAO()
 
-    def create_delivery_note(self, delivery_note: DeliveryNote) -> None:
+    @property
+    def db_connection(self) -> psycopg2.extensions.connection:
+        """
+        Pooled connection of the current request.
+        """
+        return get_db_connection()
+
+    def create_delivery_note(self, delivery_note: DeliveryNote) -> bool:
         """
         Insert a new delivery note into the database.
         :param delivery_note: A DeliveryNote object containing delivery note details.
-        :return: The ID of the newly created delivery note.
+        :return: True if it was created, False if a delivery note with the same ID already exists.
         """
         query = """
         INSERT INTO "DeliveryNotes" ("DeliveryNoteID", "EmployeID", "ClientID", "Date", "TotalPrice")
         VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT ("DeliveryNoteID") DO NOTHING
+        RETURNING "DeliveryNoteID";
         """
 
         logging.debug(f"Creating delivery note: {delivery_note}")
@@ -36,23 +57,17 @@ class DeliveryNoteDAO:
                 delivery_note.date,
                 delivery_note.totalPrice
             ))
+            if cursor.fetchone() is None:
+                self.db_connection.rollback()
+                self.logger.error(f"Delivery note with ID {delivery_note.deliveryNoteID} already exists.")
+                return False
 
             # Insert products into ProdDn table
-            for productTup in delivery_note.products:
-                # Assuming product is a dictionary with 'Product' and 'quantity'
-                prod_query = """
-                INSERT INTO "ProdDn" ("DeliveryNoteID", "ProductID", "Quantity")
-                VALUES (%s, %s, %s);
-                """
-                product, quantity = productTup  # Unpack the tuple
-                cursor.execute(prod_query, (
-                    delivery_note.deliveryNoteID,
-                    product.productId,
-                    quantity
-                ))
+            write_lines(cursor, "ProdDn", delivery_note.deliveryNoteID, delivery_note.products)
 
             self.db_connection.commit()
             logging.info(f"Delivery note created with ID: {delivery_note.deliveryNoteID}")
+            return True
     
     
     def get_delivery_note_by_id(self, delivery_note_id: str) -> DeliveryNote:
@@ -73,20 +88,8 @@ class DeliveryNoteDAO:
             cursor.execute(query, (delivery_note_id,))
             result = cursor.fetchone()
             if result:
-                # Retrieve products associated with this delivery note
-                product_dao = ProductDAO()
-                product_query = """
-                SELECT "ProductID", "Quantity"
-                FROM "ProdDn"
-                WHERE "DeliveryNoteID" = %s;
-                """
-                cursor.execute(product_query, (delivery_note_id,))
-                products = list[tuple[Product, int]]()
-                for row in cursor.fetchall():
-                    product_id, quantity = row
-                    product = product_dao.get_product_by_id(product_id)
-                    products.append((product, quantity))
-                
+                products = self._get_delivery_notes_products(cursor, [delivery_note_id]).get(delivery_note_id, [])
+
                 # Create a DeliveryNote object
                 delivery_note = DeliveryNote(
                     deliveryNoteID=result[0],
@@ -126,6 +129,7 @@ class DeliveryNoteDAO:
                 updated_delivery_note.totalPrice,
                 updated_delivery_note.deliveryNoteID
             ))
+            updated = cursor.rowcount > 0
             
             # Update products in ProdDn table
             delete_query = """
@@ -134,21 +138,11 @@ class DeliveryNoteDAO:
                            """
             cursor.execute(delete_query, (updated_delivery_note.deliveryNoteID,))
             # Insert updated products
-            for productTup in updated_delivery_note.products:
-                prod_query = """
-                INSERT INTO "ProdDn" ("DeliveryNoteID", "ProductID", "Quantity")
-                VALUES (%s, %s, %s);
-                """
-                product, quantity = productTup
-                cursor.execute(prod_query, (
-                    updated_delivery_note.deliveryNoteID,
-                    product.productId,
-                    quantity
-                ))
-                
+            write_lines(cursor, "ProdDn", updated_delivery_note.deliveryNoteID, updated_delivery_note.products)
+
             self.db_connection.commit()
             logging.info(f"Delivery note updated with ID: {updated_delivery_note.deliveryNoteID}")
-            return cursor.rowcount > 0
+            return updated
         
         
     def delete_delivery_note(self, delivery_note_id: int) -> bool:
@@ -194,23 +188,10 @@ class DeliveryNoteDAO:
         with self.db_connection.cursor() as cursor:
             cursor.execute(query)
             results = cursor.fetchall()
+            products = self._get_delivery_notes_products(cursor, [row[0] for row in results])
+
             delivery_notes = list[DeliveryNote]()
             for row in results:
-                # Retrieve products associated with this delivery note
-                product_dao = ProductDAO()
-                product_query = """
-                SELECT "ProductID", "Quantity"
-                FROM "ProdDn"
-                WHERE "DeliveryNoteID" = %s;
-                """
-                cursor.execute(product_query, (row[0],))
-                products = list[tuple[Product, int]]()
-                
-                for prod_row in cursor.fetchall():
-                    product_id, quantity = prod_row
-                    product = product_dao.get_product_by_id(product_id)
-                    products.append((product, quantity))
-                
                 # Create a DeliveryNote object
                 delivery_note = DeliveryNote(
                     deliveryNoteID=row[0],
@@ -218,31 +199,92 @@ class DeliveryNoteDAO:
                     clientId=row[2],
                     deliveryNoteDate=row[3],
                     totalPrice=row[4],
-                    products=products
+                    products=products.get(row[0], [])
                 )
                 delivery_notes.append(delivery_note)
-            
+
             logging.info(f"Retrieved all {len(delivery_notes)} delivery notes")
             return delivery_notes
         
-    def check_delivery_note_exists(self, delivery_note_id: str) -> bool:
+    def get_delivery_notes_page(self, limit: Optional[int], after: Optional[str] = None, filters: Optional[DocumentFilter] = None) -> tuple[list[DeliveryNote], Optional[str]]:
         """
-        Check if a delivery note exists in the database.
-        :param delivery_note_id: The ID of the delivery note to check.
-        :return: True if the delivery note exists, False otherwise.
+        Retrieve one page of delivery notes, newest first, including their products.
+        :param limit: The maximum number of delivery notes, None for every matching one.
+        :param after: The cursor of the previous page, None for the first page.
+        :param filters: The filters of the list, None for no filter.
+        :return: The delivery notes and the cursor of the next page, None on the last page.
         """
-        query = """
-                SELECT COUNT(*)
-                FROM "DeliveryNotes"
-                WHERE "DeliveryNoteID" = %s;
-                """
+        query, params = document_page_query('"DeliveryNotes"', '"DeliveryNoteID"', limit, after, filters)
 
-        logging.debug(f"Checking if delivery note with ID {delivery_note_id} exists")
+        logging.debug(f"Retrieving {limit} delivery notes after {after} with {filters}")
 
         with self.db_connection.cursor() as cursor:
-            cursor.execute(query, (delivery_note_id,))
-            result = cursor.fetchone()
-            if result is None:
-                return False
-            else:
-                return result[0] > 0
\ No newline at end of file
+            cursor.execute(query, params)
+            results, next_cursor = split_page(cursor.fetchall(), limit, lambda row: (row[3], row[0]))
+            products = self._get_delivery_notes_products(cursor, [row[0] for row in results])
+
+            delivery_notes = [
+                DeliveryNote(
+                    deliveryNoteID=row[0],
+                    employeId=row[1],
+                    clientId=row[2],
+                    deliveryNoteDate=row[3],
+                    totalPrice=row[4],
+                    products=products.get(row[0], [])
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(delivery_notes)} delivery notes")
+            return delivery_notes, next_cursor
+
+    def stream_delivery_notes(self, filters: Optional[DocumentFilter] = None, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[list[DeliveryNote]]:
+        """
+        Read every matching delivery note, newest first, in batches through a server-side cursor,
+        only one batch and its product lines are in memory at a time.
+        :param filters: The filters of the list, None for no filter.
+        :param batch_size: The number of delivery notes of each batch.
+        :return: The batches, closing the generator closes the cursor.
+        """
+        query, params = document_page_query('"DeliveryNotes"', '"DeliveryNoteID"', None, None, filters)
+
+        logging.debug(f"Streaming delivery notes with {filters}")
+
+        connection = self.db_connection
+        with connection.cursor(name="stream_delivery_notes") as stream, connection.cursor() as cursor:
+            stream.execute(query, params)
+            while True:
+                results = stream.fetchmany(batch_size)
+                if not results:
+                    break
+                products = self._get_delivery_notes_products(cursor, [row[0] for row in results])
+                yield [
+                    DeliveryNote(
+                        deliveryNoteID=row[0],
+                        employeId=row[1],
+                        clientId=row[2],
+                        deliveryNoteDate=row[3],
+                        totalPrice=row[4],
+                        products=products.get(row[0], [])
+                    )
+                    for row in results
+                ]
+
+    def _get_delivery_notes_products(self, cursor: psycopg2.extensions.cursor, delivery_note_ids: list[str]) -> dict[str, list[tuple[Product, int]]]:
+        """
+        Retrieve the product lines of several delivery notes with one query for the lines and one for the products.
+        :param cursor: The cursor of the running operation.
+        :param delivery_note_ids: The IDs of the delivery notes.
+        :return: The (product, quantity) lines of each delivery note, keyed by delivery note ID.
+        """
+        lines = dict[str, list[tuple[Product, int]]]()
+        if not delivery_note_ids:
+            return lines
+
+        cursor.execute(DELIVERY_NOTE_LINES_QUERY, (delivery_note_ids,))
+        rows = cursor.fetchall()
+
+        products = self.product_dao.get_products_by_ids(row[1] for row in rows)
+        for delivery_note_id, product_id, quantity in rows:
+            lines.setdefault(delivery_note_id, []).append((products[product_id], quantity))
+        return lines
@@ -1,8 +1,17 @@
 import logging
+import psycopg2.extensions
 from connect import get_db_connection
+from cache import TTLCache, load_cache_env
+from typing import Iterable, Optional
+from pagination import id_page_query, split_page
 
 from DAO.employe import Employe
 
+# Employees read by the authorization checks of every request, keyed by EmployeID.
+# Writes through the sync or async DAO drop the entry, so role changes apply at once.
+ROLE_CACHE_SIZE, ROLE_CACHE_TTL = load_cache_env("ROLE_CACHE", 1024, 30.0)
+employe_cache = TTLCache[str, Employe]("employe_role", ROLE_CACHE_SIZE, ROLE_CACHE_TTL)
+
 class EmployeDAO:
     def __init__(self):
         """
@@ -10,9 +19,15 @@ class EmployeDAO:
         :param db_connection: A database connection object.
         """
         
-        self.db_connection = get_db_connection()
         self.logger = logging.getLogger("appLogger")
     
+    @property
+    def db_connection(self) -> psycopg2.extensions.connection:
+        """
+        Pooled connection of the current request.
+        """
+        return get_db_connection()
+
     def get_all_employees(self)-> list[Employe]:
         """
         Retrieve all employees from the database.
@@ -42,12 +57,44 @@ class EmployeDAO:
             logging.info(f"Retrieved {len(employees)} employees")
             return employees
 
+    def get_employees_page(self, limit: int, after: Optional[str] = None) -> tuple[list[Employe], Optional[str]]:
+        """
+        Retrieve one page of employees, ordered by ID.
+        :param limit: The maximum number of employees.
+        :param after: The cursor of the previous page, None for the first page.
+        :return: The employees and the cursor of the next page, None on the last page.
+        """
+        query, params = id_page_query('"Employes"', '"EmployeID"', limit, after, id_type=str)
+
+        logging.debug(f"Retrieving {limit} employees after {after}")
+
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(query, params)
+            results, next_cursor = split_page(cursor.fetchall(), limit, lambda row: (row[0],))
+            employees = [
+                Employe(
+                    employe_id=row[0],
+                    name=row[1],
+                    family_name=row[2],
+                    email=row[3],
+                    rol=row[4]
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(employees)} employees")
+            return employees, next_cursor
+
     def get_employee_by_id(self, employe_id: str)-> Employe:
         """
         Retrieve an employee by their ID.
         :param employee_id: The ID of the employee to retrieve.
         :return: An Employee object.
         """
+        employe = employe_cache.get(str(employe_id))
+        if employe is not None:
+            return employe
+
         query = """SELECT * FROM "Employes" WHERE "EmployeID" = %s"""
 
         logging.debug(f"Retrieving employee with ID: {employe_id}")
@@ -56,17 +103,46 @@ class EmployeDAO:
             cursor.execute(query, (employe_id,))
             row = cursor.fetchone()
             if row:
-                return Employe(
+                employe = Employe(
                     employe_id=row[0],
                     name=row[1],
                     family_name=row[2],
                     email=row[3],
                     rol=row[4]
                 )
+                employe_cache.set(str(employe_id), employe)
+                return employe
             else:
                 self.logger.error(f"Employee with ID {employe_id} not found.")
                 raise ValueError(f"Employee with ID {employe_id} not found.")
 
+    def get_employees_by_ids(self, employe_ids: Iterable[str]) -> dict[str, Employe]:
+        """
+        Retrieve several employees with a single query.
+        :param employe_ids: The IDs of the employees to retrieve.
+        :return: A dictionary of the employees found, keyed by their ID.
+        """
+        ids = list(set(employe_ids))
+        if not ids:
+            return {}
+
+        query = """SELECT * FROM "Employes" WHERE "EmployeID" = ANY(%s)"""
+
+        logging.debug(f"Retrieving {len(ids)} employees by ID")
+
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(query, (ids,))
+            return {
+                row[0]: Employe(
+                    employe_id=row[0],
+                    name=row[1],
+                    family_name=row[2],
+                    email=row[3],
+                    rol=row[4]
+                )
+                for row in cursor.fetchall()
+            }
+
     def add_employee(self, employe_id: str, name: str, family_name: str, email: str, rol: int = 0)-> Employe:
         """
         Add a new employee to the database.
@@ -87,6 +163,7 @@ class EmployeDAO:
         with self.db_connection.cursor() as cursor:
             cursor.execute(query, (employe_id, name, family_name, email, rol))
             self.db_connection.commit()
+            employe_cache.invalidate(str(employe_id))
             logging.info(f"Employee added with ID: {employe_id}")
             return Employe(employe_id=employe_id, name=name, family_name=family_name, email=email, rol=rol)
         
@@ -112,6 +189,7 @@ class EmployeDAO:
         with self.db_connection.cursor() as cursor:
             cursor.execute(query, (name, family_name, email, rol, employe_id))
             self.db_connection.commit()
+            employe_cache.invalidate(str(employe_id))
             logging.info(f"Employee with ID {employe_id} updated")
             return Employe(employe_id=employe_id, name=name, family_name=family_name, email=email, rol=rol)
         
@@ -129,6 +207,7 @@ class EmployeDAO:
         with self.db_connection.cursor() as cursor:
             cursor.execute(query, (employee_id,))
             self.db_connection.commit()
+            employe_cache.invalidate(str(employee_id))
             logging.info(f"Employee with ID {employee_id} deleted")
             return cursor.rowcount > 0
         
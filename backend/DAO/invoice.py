@@ -5,8 +5,7 @@ from pydantic import BaseModel
 from DAO.product import Product
 from DAO.client import Client
 from DAO.employe import Employe
-from DAO.clientDAO import ClientDAO
-from DAO.employeDAO import EmployeDAO
+from nameLoader import get_name_loader
 
 class ProductInInvoice(BaseModel):
     id: int
@@ -45,10 +44,10 @@ class Invoice:
         return total
     
     def get_invoce_client(self) -> Client:
-        return ClientDAO().get_client_by_id(self.clientId)
+        return get_name_loader().get_client(self.clientId)
     
     def get_invoice_employe(self) -> Employe:
-        return EmployeDAO().get_employee_by_id(self.employeId)
+        return get_name_loader().get_employe(self.employeId)
 
     def get_json(self) -> InvoiceModel:
         return InvoiceModel(
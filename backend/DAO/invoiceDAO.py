@@ -1,29 +1,50 @@
 from fastapi import HTTPException
 import logging
 
+import psycopg2.extensions
 from connect import get_db_connection
 from DAO.invoice import Invoice
+from DAO.lineWriter import write_lines
 from DAO.product import Product
+from documentFilter import DocumentFilter
+from pagination import STREAM_BATCH_SIZE, document_page_query, split_page
+from typing import Iterator, Optional
 from DAO.productDAO import ProductDAO
 
+# Product lines of a set of invoices, looked up by the index on "InvoiceID"
+INVOICE_LINES_QUERY = """
+SELECT "InvoiceID", "ProductID", "Quantity"
+FROM "ProdInv"
+WHERE "InvoiceID" = ANY(%s);
+"""
+
 class InvoiceDAO:
     def __init__(self):
         """
         Initialize the DAO with a database connection.
         :param db_connection: A database connection object.
         """
-        self.db_connection = get_db_connection()
         self.logger = logging.getLogger("appLogger")
+        self.product_dao = ProductDAO()
 
-    def create_invoice(self, invoice: Invoice) -> None:
+    @property
+    def db_connection(self) -> psycopg2.extensions.connection:
+        """
+        Pooled connection of the current request.
+        """
+        return get_db_connection()
+
+    def create_invoice(self, invoice: Invoice) -> bool:
         """
         Insert a new invoice into the database.
         :param invoice: An Invoice object containing invoice details.
-        :return: The ID of the newly created invoice.
+        :return: True if it was created, False if an invoice with the same ID already exists.
         """
         query = """
         INSERT INTO "Invoices" ("InvoiceID", "EmployeID", "ClientID", "Date", "TotalPrice")
         VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT ("InvoiceID") DO NOTHING
+        RETURNING "InvoiceID";
         """
 
         logging.debug(f"Creating invoice: {invoice}")
@@ -36,23 +57,17 @@ class InvoiceDAO:
                 invoice.date,
                 invoice.totalPrice
             ))
+            if cursor.fetchone() is None:
+                self.db_connection.rollback()
+                self.logger.error(f"Invoice with ID {invoice.invoiceID} already exists.")
+                return False
 
             # Insert products into ProdInv table
-            for productTup in invoice.products:
-                # Assuming product is a dictionary with 'Product' and 'quantity'
-                prod_query = """
-                INSERT INTO "ProdInv" ("InvoiceID", "ProductID", "Quantity")
-                VALUES (%s, %s, %s);
-                """
-                product, quantity = productTup  # Unpack the tuple
-                cursor.execute(prod_query, (
-                    invoice.invoiceID,
-                    product.productId,
-                    quantity
-                ))
+            write_lines(cursor, "ProdInv", invoice.invoiceID, invoice.products)
 
             self.db_connection.commit()
             logging.info(f"Invoice created with ID: {invoice.invoiceID}")
+            return True
             
         
     def get_invoice_by_id(self, invoice_id: str) -> Invoice:
@@ -73,19 +88,8 @@ class InvoiceDAO:
             result = cursor.fetchone()
             if result:
                 #fetch products related to the invoice
-                product_dao = ProductDAO()
-                prod_query = """
-                SELECT "ProductID", "Quantity"
-                FROM "ProdInv"
-                WHERE "InvoiceID" = %s;
-                """
-                cursor.execute(prod_query, (invoice_id,))
-                
-                products = list[tuple[Product, int]]()
-                for product_id, quantity in cursor.fetchall():
-                    product = product_dao.get_product_by_id(product_id)
-                    products.append((product, quantity))
-                
+                products = self._get_invoices_products(cursor, [invoice_id]).get(invoice_id, [])
+
                 invoice = Invoice(
                     invoiceID=result[0],
                     employeId=result[1],
@@ -123,6 +127,7 @@ class InvoiceDAO:
                 updated_invoice.totalPrice,
                 updated_invoice.invoiceID
             ))
+            updated = cursor.rowcount > 0
             
             # Update products in ProdInv table
             delete_query = """
@@ -131,21 +136,11 @@ class InvoiceDAO:
             """
             cursor.execute(delete_query, (updated_invoice.invoiceID,))
             
-            for productTup in updated_invoice.products:
-                prod_query = """
-                INSERT INTO "ProdInv" ("InvoiceID", "ProductID", "Quantity")
-                VALUES (%s, %s, %s);
-                """
-                product, quantity = productTup
-                cursor.execute(prod_query, (
-                    updated_invoice.invoiceID,
-                    product.productId,
-                    quantity
-                ))
-                
+            write_lines(cursor, "ProdInv", updated_invoice.invoiceID, updated_invoice.products)
+
             self.db_connection.commit()
             logging.info(f"Invoice updated with ID: {updated_invoice.invoiceID}")
-            return cursor.rowcount > 0
+            return updated
     
     
     def delete_invoice(self, invoice_id: int) -> bool:
@@ -191,55 +186,101 @@ class InvoiceDAO:
         with self.db_connection.cursor() as cursor:
             cursor.execute(query)
             results = cursor.fetchall()
+            products = self._get_invoices_products(cursor, [result[0] for result in results])
+
             invoices = list[Invoice]()
-            # Iterate through each invoice and fetch its products
             for result in results:
-                
-                
-                prod_query = """
-                SELECT "ProductID", "Quantity"
-                FROM "ProdInv"
-                WHERE "InvoiceID" = %s;
-                """
-                cursor.execute(prod_query, (result[0],))
-                
-                products = list[tuple[Product, int]]()
-                product_dao = ProductDAO()
-                
-                for product_id, quantity in cursor.fetchall():
-                    product = product_dao.get_product_by_id(product_id)
-                    products.append((product, quantity))
-                    
                 invoices.append(Invoice(
                     invoiceID=result[0],
                     employeId=result[1],
                     clientId=result[2],
                     invoiceDate=result[3],
                     totalPrice=result[4],
-                    products=products
+                    products=products.get(result[0], [])
                 ))
-            
+
             logging.info(f"Retrieved all {len(invoices)} invoices")
             return invoices
         
-    def check_invoice_exists(self, invoice_id: str) -> bool:
-        """
-        Check if an invoice exists in the database.
-        :param invoice_id: The ID of the invoice to check.
-        :return: True if the invoice exists, False otherwise.
+    def get_invoices_page(self, limit: Optional[int], after: Optional[str] = None, filters: Optional[DocumentFilter] = None) -> tuple[list[Invoice], Optional[str]]:
         """
-        query = """
-        SELECT COUNT(*)
-        FROM "Invoices"
-        WHERE "InvoiceID" = %s;
+        Retrieve one page of invoices, newest first, including their products.
+        :param limit: The maximum number of invoices, None for every matching one.
+        :param after: The cursor of the previous page, None for the first page.
+        :param filters: The filters of the list, None for no filter.
+        :return: The invoices and the cursor of the next page, None on the last page.
         """
+        query, params = document_page_query('"Invoices"', '"InvoiceID"', limit, after, filters)
 
-        logging.debug(f"Checking if invoice with ID {invoice_id} exists")
+        logging.debug(f"Retrieving {limit} invoices after {after} with {filters}")
 
         with self.db_connection.cursor() as cursor:
-            cursor.execute(query, (invoice_id,))
-            result = cursor.fetchone()
-            if result is None:
-                return False
-            else:
-                return result[0] > 0
\ No newline at end of file
+            cursor.execute(query, params)
+            results, next_cursor = split_page(cursor.fetchall(), limit, lambda row: (row[3], row[0]))
+            products = self._get_invoices_products(cursor, [row[0] for row in results])
+
+            invoices = [
+                Invoice(
+                    invoiceID=row[0],
+                    employeId=row[1],
+                    clientId=row[2],
+                    invoiceDate=row[3],
+                    totalPrice=row[4],
+                    products=products.get(row[0], [])
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(invoices)} invoices")
+            return invoices, next_cursor
+
+    def stream_invoices(self, filters: Optional[DocumentFilter] = None, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[list[Invoice]]:
+        """
+        Read every matching invoice, newest first, in batches through a server-side cursor,
+        only one batch and its product lines are in memory at a time.
+        :param filters: The filters of the list, None for no filter.
+        :param batch_size: The number of invoices of each batch.
+        :return: The batches, closing the generator closes the cursor.
+        """
+        query, params = document_page_query('"Invoices"', '"InvoiceID"', None, None, filters)
+
+        logging.debug(f"Streaming invoices with {filters}")
+
+        connection = self.db_connection
+        with connection.cursor(name="stream_invoices") as stream, connection.cursor() as cursor:
+            stream.execute(query, params)
+            while True:
+                results = stream.fetchmany(batch_size)
+                if not results:
+                    break
+                products = self._get_invoices_products(cursor, [row[0] for row in results])
+                yield [
+                    Invoice(
+                        invoiceID=row[0],
+                        employeId=row[1],
+                        clientId=row[2],
+                        invoiceDate=row[3],
+                        totalPrice=row[4],
+                        products=products.get(row[0], [])
+                    )
+                    for row in results
+                ]
+
+    def _get_invoices_products(self, cursor: psycopg2.extensions.cursor, invoice_ids: list[str]) -> dict[str, list[tuple[Product, int]]]:
+        """
+        Retrieve the product lines of several invoices with one query for the lines and one for the products.
+        :param cursor: The cursor of the running operation.
+        :param invoice_ids: The IDs of the invoices.
+        :return: The (product, quantity) lines of each invoice, keyed by invoice ID.
+        """
+        lines = dict[str, list[tuple[Product, int]]]()
+        if not invoice_ids:
+            return lines
+
+        cursor.execute(INVOICE_LINES_QUERY, (invoice_ids,))
+        rows = cursor.fetchall()
+
+        products = self.product_dao.get_products_by_ids(row[1] for row in rows)
+        for invoice_id, product_id, quantity in rows:
+            lines.setdefault(invoice_id, []).append((products[product_id], quantity))
+        return lines
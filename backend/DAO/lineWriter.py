@@ -0,0 +1,177 @@
+import io
+import logging
+import os
+
+import psycopg2.extensions
+import psycopg2.extras
+
+from DAO.product import Product
+
+# Document ID column of each line table, the other two columns are always "ProductID" and "Quantity"
+LINE_TABLES = {
+    "ProdOfe": "OfferID",
+    "ProdOrd": "OrderID",
+    "ProdDn": "DeliveryNoteID",
+    "ProdInv": "InvoiceID",
+}
+# Documents with at least this many lines are written with COPY instead of a multi-row INSERT
+LINE_COPY_THRESHOLD = int(os.getenv("LINE_COPY_THRESHOLD", "1000"))
+# PostgreSQL accepts at most 65535 parameters per statement, three per line
+MAX_INSERT_LINES = 65535 // 3
+
+
+def merge_lines(lines: list[tuple[Product, int]]) -> tuple[list[int], list[int]]:
+    """
+    The product IDs and quantities of a list of lines, a product listed twice gets the sum of its quantities
+    because a line table holds one row per product.
+    """
+    quantities = dict[int, int]()
+    for product, quantity in lines:
+        quantities[product.productId] = quantities.get(product.productId, 0) + quantity
+    return list(quantities.keys()), list(quantities.values())
+
+def line_rows(document_id: str, lines: list[tuple[Product, int]]) -> list[tuple[str, int, int]]:
+    """
+    Build the (document ID, product ID, quantity) rows of the lines of a document, merged like upsert_lines does.
+    """
+    product_ids, quantities = merge_lines(lines)
+    return [(document_id, product_id, quantity) for product_id, quantity in zip(product_ids, quantities)]
+
+def use_copy(rows: list[tuple[str, int, int]], copy_threshold: int) -> bool:
+    """
+    Whether a set of rows is written with COPY rather than a single INSERT.
+    """
+    return len(rows) >= copy_threshold or len(rows) > MAX_INSERT_LINES
+
+def insert_lines_query(table: str) -> str:
+    """
+    The multi-row INSERT of a line table, VALUES takes one (document ID, product ID, quantity) tuple per line.
+    """
+    return f'INSERT INTO "{table}" ("{LINE_TABLES[table]}", "ProductID", "Quantity") VALUES %s;'
+
+def copy_lines_query(table: str) -> str:
+    """
+    The COPY of a line table, in the column order of line_rows.
+    """
+    return f'COPY "{table}" ("{LINE_TABLES[table]}", "ProductID", "Quantity") FROM STDIN;'
+
+def _copy_value(value) -> str:
+    """
+    Format a value for the text format of COPY.
+    """
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+def copy_lines_data(rows: list[tuple[str, int, int]]) -> str:
+    """
+    Format rows as the tab separated text read by COPY FROM STDIN.
+    """
+    return "".join("\t".join(_copy_value(value) for value in row) + "\n" for row in rows)
+
+def write_lines(cursor: psycopg2.extensions.cursor, table: str, document_id: str, lines: list[tuple[Product, int]],
+                copy_threshold: int = LINE_COPY_THRESHOLD) -> None:
+    """
+    Insert the product lines of a document with one statement whatever their number.
+    Usual documents use a multi-row INSERT, the large ones a COPY, which skips the parsing of the parameters.
+    The caller commits.
+    :param cursor: The cursor of the running operation.
+    :param table: The line table, one of LINE_TABLES.
+    :param document_id: The ID of the document.
+    :param lines: The (product, quantity) lines.
+    :param copy_threshold: The number of lines from which COPY is used.
+    """
+    rows = line_rows(document_id, lines)
+    if not rows:
+        return
+
+    if use_copy(rows, copy_threshold):
+        logging.debug(f"Copying {len(rows)} lines into {table}")
+        cursor.copy_expert(copy_lines_query(table), io.StringIO(copy_lines_data(rows)))
+    else:
+        logging.debug(f"Inserting {len(rows)} lines into {table}")
+        psycopg2.extras.execute_values(cursor, insert_lines_query(table), rows, page_size=len(rows))
+
+
+class LineChanges:
+    """
+    The lines of a document touched by upsert_lines, as (product ID, quantity) pairs with the new quantity,
+    or the removed one for deleted lines.
+    """
+
+    def __init__(self, inserted: list[tuple[int, int]], updated: list[tuple[int, int]], deleted: list[tuple[int, int]]):
+        self.inserted = inserted
+        self.updated = updated
+        self.deleted = deleted
+
+    @classmethod
+    def from_rows(cls, rows: list[tuple[str, int, int]]) -> "LineChanges":
+        """
+        Build the changes from the (action, product ID, quantity) rows of upsert_lines_query.
+        """
+        changes = cls([], [], [])
+        for action, product_id, quantity in rows:
+            getattr(changes, action).append((product_id, quantity))
+        return changes
+
+    def is_empty(self) -> bool:
+        """
+        True when the stored lines were already the requested ones.
+        """
+        return not (self.inserted or self.updated or self.deleted)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, LineChanges) and (self.inserted, self.updated, self.deleted) == (other.inserted, other.updated, other.deleted)
+
+    def __repr__(self):
+        return f"LineChanges(inserted={self.inserted}, updated={self.updated}, deleted={self.deleted})"
+
+
+def upsert_lines_query(table: str) -> str:
+    """
+    Replace the lines of a document with a single statement that only writes the rows that differ:
+    lines no longer listed are deleted, new products inserted and changed quantities updated.
+    It relies on the ("ProductID", document ID) primary key of the line tables.
+    Parameters: product IDs, quantities, document ID, document ID.
+    :return: The query, it returns one (action, product ID, quantity) row per changed line.
+    """
+    document_column = LINE_TABLES[table]
+    return f"""
+    WITH new_lines AS (
+        SELECT * FROM unnest(%s::integer[], %s::integer[]) AS n("ProductID", "Quantity")
+    ),
+    deleted AS (
+        DELETE FROM "{table}" l
+        WHERE l."{document_column}" = %s
+          AND NOT EXISTS (SELECT 1 FROM new_lines n WHERE n."ProductID" = l."ProductID")
+        RETURNING l."ProductID", l."Quantity"
+    ),
+    upserted AS (
+        INSERT INTO "{table}" AS l ("{document_column}", "ProductID", "Quantity")
+        SELECT %s, n."ProductID", n."Quantity" FROM new_lines n
+        ON CONFLICT ("ProductID", "{document_column}") DO UPDATE SET "Quantity" = EXCLUDED."Quantity"
+        WHERE l."Quantity" IS DISTINCT FROM EXCLUDED."Quantity"
+        RETURNING l."ProductID", l."Quantity", l.xmax = 0 AS inserted
+    )
+    SELECT 'deleted', "ProductID", "Quantity" FROM deleted
+    UNION ALL
+    SELECT CASE WHEN inserted THEN 'inserted' ELSE 'updated' END, "ProductID", "Quantity" FROM upserted
+    ORDER BY 2;
+    """
+
+def upsert_lines(cursor: psycopg2.extensions.cursor, table: str, document_id: str, lines: list[tuple[Product, int]]) -> LineChanges:
+    """
+    Make the stored lines of a document match lines without deleting and inserting the unchanged ones again,
+    which would leave dead tuples and index entries behind on every edit.
+    The caller commits.
+    :param cursor: The cursor of the running operation.
+    :param table: The line table, one of LINE_TABLES.
+    :param document_id: The ID of the document.
+    :param lines: The new (product, quantity) lines.
+    :return: The lines inserted, updated and deleted.
+    """
+    product_ids, quantities = merge_lines(lines)
+    cursor.execute(upsert_lines_query(table), (product_ids, quantities, document_id, document_id))
+    changes = LineChanges.from_rows(cursor.fetchall())
+    logging.debug(f"Lines of {document_id} in {table}: {changes}")
+    return changes
@@ -3,9 +3,8 @@ from typing import Optional, List
 from pydantic import BaseModel
 
 from DAO.product import Product  
-from DAO.clientDAO import ClientDAO
 from DAO.client import Client
-from DAO.employeDAO import EmployeDAO
+from nameLoader import get_name_loader
 from DAO.employe import Employe
 
 class ProductInOffer(BaseModel):
@@ -40,10 +39,10 @@ class Offer:
                 f"products={self.products})")
         
     def get_offer_client(self) -> Client:
-        return ClientDAO().get_client_by_id(self.clientID)
+        return get_name_loader().get_client(self.clientID)
     
     def get_offer_employe(self) -> Employe:
-        return EmployeDAO().get_employee_by_id(self.employeID)
+        return get_name_loader().get_employe(self.employeID)
     
     def calculatePrice(self, products: List[tuple[Product, int]]) -> float:
         total = 0.0
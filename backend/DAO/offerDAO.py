@@ -1,22 +1,90 @@
+import json
 import logging
+import os
 
 from fastapi import HTTPException
 
+import psycopg2
+import psycopg2.extensions
 from connect import get_db_connection 
+from documentFilter import DocumentFilter
+from pagination import STREAM_BATCH_SIZE, document_page_query, split_page
+from typing import Iterator, Optional
 from DAO.offer import Offer
-from DAO.productDAO import ProductDAO
+from DAO.lineWriter import LineChanges, upsert_lines, write_lines
 from DAO.product import Product
 
 
+# Product lines of a set of offers joined with their product details
+OFFER_PRODUCTS_QUERY = """
+SELECT po."OfferID", po."Quantity",
+       p."ProductID", p."Name", p."Description", p."Stock", p."MaxStock", p."MinStock", p."PurchasePrice", p."SellPrice"
+FROM "ProdOfe" po
+JOIN "Products" p ON p."ProductID" = po."ProductID"
+WHERE po."OfferID" = ANY(%s)
+ORDER BY po."OfferID";
+"""
+
+# Offer creation in one call to the create_offer database function of migration 0002
+CREATE_OFFER_FUNCTION_QUERY = """
+SELECT public.create_offer(%s, %s::integer, %s::jsonb);
+"""
+
+def use_create_offer_function() -> bool:
+    """
+    Whether offers are created by the create_offer database function (OFFER_CREATE_MODE=function)
+    instead of the header and line inserts of the DAO (default).
+    """
+    return os.getenv("OFFER_CREATE_MODE", "python").lower() == "function"
+
+def offer_lines_json(lines: list[tuple[int, int]]) -> str:
+    """
+    Format (product ID, quantity) lines as the jsonb argument of the create_offer function.
+    """
+    return json.dumps([{"id": product_id, "quantity": quantity} for product_id, quantity in lines])
+
+def create_offer_error(sqlstate: str, detail: Optional[str]) -> HTTPException:
+    """
+    Translate an error raised by the create_offer function into the response of the API.
+    """
+    if sqlstate == "P0002":
+        return HTTPException(status_code=404, detail=f"Products not found: {detail}")
+    if sqlstate.startswith("22"):
+        return HTTPException(status_code=400, detail="Invalid offer lines")
+    return HTTPException(status_code=500, detail="Failed to create offer.")
+
+def offer_line_from_row(row: tuple) -> tuple[Product, int]:
+    """
+    Build a (product, quantity) line from a row of OFFER_PRODUCTS_QUERY.
+    """
+    product = Product(
+        productId=row[2],
+        name=row[3],
+        description=row[4],
+        stock=row[5],
+        maxStock=row[6],
+        minStock=row[7],
+        purchasePrice=row[8],
+        sellPrice=row[9]
+    )
+    return product, row[1]
+
+
 class OfferDAO:
     def __init__(self):
         """
         Initialize the DAO with a database connection.
         :param db_connection: A database connection object.
         """
-        self.db_connection = get_db_connection()
         self.logger = logging.getLogger("appLogger")
 
+    @property
+    def db_connection(self) -> psycopg2.extensions.connection:
+        """
+        Pooled connection of the current request.
+        """
+        return get_db_connection()
+
     def create_offer(self, offer: Offer)-> Offer:
         """
         Insert a new offer into the database.
@@ -36,24 +104,14 @@ class OfferDAO:
                 offer.date,
                 offer.TotalPrice
             ))
-            offer_id = cursor.fetchone()
-            if offer_id is None:
+            result = cursor.fetchone()
+            if result is None:
                 self.logger.error("No offer ID returned from the database.")
                 raise HTTPException(status_code=500, detail="Failed to create offer.")
+            offer_id = result[0]
 
             # Insert products into ProdOfe table
-            for productTup in offer.products:
-                prod_query = """
-                INSERT INTO "ProdOfe" ("OfferID", "ProductID", "Quantity")
-                VALUES (%s, %s, %s);
-                """
-                product, quantity = productTup
-                
-                cursor.execute(prod_query, (
-                    offer_id,
-                    product.productId,
-                    quantity
-                ))
+            write_lines(cursor, "ProdOfe", offer_id, offer.products)
 
             self.db_connection.commit()
             logging.info(f"Offer created with ID: {offer_id}")
@@ -69,6 +127,31 @@ class OfferDAO:
 
  
 
+    def create_offer_in_database(self, employe_id: str, client_id: str, lines: list[tuple[int, int]]) -> str:
+        """
+        Insert a new offer with a single call to the create_offer database function, which checks the products,
+        computes the total price from their sell prices and inserts the header and the lines.
+        :param employe_id: The ID of the employee creating the offer.
+        :param client_id: The ID of the client.
+        :param lines: The (product ID, quantity) lines.
+        :return: The ID of the new offer.
+        :raises HTTPException: 404 if a product does not exist, 400 if the lines are not valid.
+        """
+        logging.debug(f"Creating offer in the database for client {client_id}")
+
+        with self.db_connection.cursor() as cursor:
+            try:
+                cursor.execute(CREATE_OFFER_FUNCTION_QUERY, (employe_id, client_id, offer_lines_json(lines)))
+            except psycopg2.Error as e:
+                self.db_connection.rollback()
+                self.logger.error(f"Failed to create offer: {e}")
+                raise create_offer_error(e.pgcode or "", e.diag.message_detail)
+            offer_id = cursor.fetchone()[0]
+
+            self.db_connection.commit()
+            logging.info(f"Offer created with ID: {offer_id}")
+            return offer_id
+
     def get_offer_by_id(self, offer_id: str)-> Offer:
         """
         Retrieve an offer by its ID, including its products.
@@ -86,25 +169,8 @@ class OfferDAO:
             result = cursor.fetchone()
             if result:
                 # Fetch products related to the offer
-                prod_query = """
-                SELECT "ProductID", "Quantity"
-                FROM "ProdOfe"
-                WHERE "OfferID" = %s;
-                """
-                cursor.execute(prod_query, (offer_id,))
-                
-                product_dao = ProductDAO()
-                products = list[tuple[Product, int]]()
-                
-                for prod_row in cursor.fetchall():
-                    product_id = prod_row[0]
-                    quantity = prod_row[1]
-                    
-                    # Fetch product details from ProductDAO
-                    product = product_dao.get_product_by_id(product_id)
-                    products.append((product, quantity))
-                
-                
+                products = self._get_offers_products(cursor, [offer_id])
+
                 # Create an offer object
                 offer = Offer(
                     offerID=result[0],
@@ -112,7 +178,7 @@ class OfferDAO:
                     clientId=result[2],
                     offer_date=result[3],
                     TotalPrice=result[4],
-                    products=products
+                    products=products.get(offer_id, [])
                 )
                 # Return the offer object
                 logging.info(f"Offer found: {offer}")
@@ -121,11 +187,12 @@ class OfferDAO:
                 self.logger.error(f"Offer with ID {offer_id} not found.")
                 raise HTTPException(status_code=404, detail="Offer not found.")
 
-    def update_offer(self, updated_offer: Offer)-> bool:
+    def update_offer(self, updated_offer: Offer)-> Optional[LineChanges]:
         """
         Update an existing offer in the database.
-        :param updated_data: A dictionary containing the updated offer details.
-        :return: True if the update was successful, False otherwise.
+        Only the product lines that differ from the stored ones are written.
+        :param updated_offer: The offer with its updated details.
+        :return: The lines inserted, updated and deleted, None if the offer does not exist.
         """
         query = """
         UPDATE "Offers"
@@ -143,30 +210,17 @@ class OfferDAO:
                 updated_offer.TotalPrice,
                 updated_offer.offerID
             ))
+            if cursor.rowcount == 0:
+                self.db_connection.rollback()
+                self.logger.error(f"Offer with ID {updated_offer.offerID} not found.")
+                return None
 
             # Update products in ProdOfe table
-            delete_query = """
-            DELETE FROM "ProdOfe" 
-            WHERE "OfferID" = %s;
-            """
-            cursor.execute(delete_query, (updated_offer.offerID,))
-
-            for productTup in updated_offer.products:
-                prod_query = """
-                INSERT INTO "ProdOfe" ("OfferID", "ProductID", "Quantity")
-                VALUES (%s, %s, %s);
-                """
-                product, quantity = productTup
-                
-                cursor.execute(prod_query, (
-                    updated_offer.offerID,
-                    product.productId,
-                    quantity
-                ))
+            changes = upsert_lines(cursor, "ProdOfe", updated_offer.offerID, updated_offer.products)
 
             self.db_connection.commit()
-            logging.info(f"Offer updated with ID: {updated_offer.offerID}")
-            return cursor.rowcount > 0
+            logging.info(f"Offer updated with ID: {updated_offer.offerID}, {changes}")
+            return changes
 
     def delete_offer(self, offer_id: int)-> bool:
         """
@@ -195,6 +249,7 @@ class OfferDAO:
     def get_all_offers(self)-> list[Offer]:
         """
         Retrieve all offers from the database, including their products.
+        Headers and product lines are loaded with two queries whatever the number of offers.
         :return: A list of dictionaries containing offer details.
         """
         query = """
@@ -208,39 +263,100 @@ class OfferDAO:
             cursor.execute(query)
             results = cursor.fetchall()
 
-            offers = list[Offer]()
-            # Iterate through each offer and fetch its products
-            for row in results:
-                prod_query = """
-                SELECT "ProductID", "Quantity"
-                FROM "ProdOfe"
-                WHERE "OfferID" = %s;
-                """
-                cursor.execute(prod_query, (row[0],))
-                
-                product_dao = ProductDAO()
-                products = list[tuple[Product, int]]()
-    
-                for prod_row in cursor.fetchall():
-                    product_id = prod_row[0]
-                    quantity = prod_row[1]
-                    
-                    # Fetch product details from ProductDAO
-                    product = product_dao.get_product_by_id(product_id)
-                    products.append((product, quantity))
-                    
-                # Create an offer object
-                offers.append(
+            products = self._get_offers_products(cursor, [row[0] for row in results])
+
+            offers = [
+                Offer(
+                    offerID=row[0],
+                    employeId=row[1],
+                    clientId=row[2],
+                    offer_date=row[3],
+                    TotalPrice=row[4],
+                    products=products.get(row[0], [])
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved all {len(offers)} offers")
+            return offers
+
+    def get_offers_page(self, limit: Optional[int], after: Optional[str] = None, filters: Optional[DocumentFilter] = None) -> tuple[list[Offer], Optional[str]]:
+        """
+        Retrieve one page of offers, newest first, including their products.
+        :param limit: The maximum number of offers, None for every matching one.
+        :param after: The cursor of the previous page, None for the first page.
+        :param filters: The filters of the list, None for no filter.
+        :return: The offers and the cursor of the next page, None on the last page.
+        """
+        query, params = document_page_query('"Offers"', '"OfferID"', limit, after, filters)
+
+        logging.debug(f"Retrieving {limit} offers after {after} with {filters}")
+
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(query, params)
+            results, next_cursor = split_page(cursor.fetchall(), limit, lambda row: (row[3], row[0]))
+
+            products = self._get_offers_products(cursor, [row[0] for row in results])
+
+            offers = [
+                Offer(
+                    offerID=row[0],
+                    employeId=row[1],
+                    clientId=row[2],
+                    offer_date=row[3],
+                    TotalPrice=row[4],
+                    products=products.get(row[0], [])
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(offers)} offers")
+            return offers, next_cursor
+
+    def stream_offers(self, filters: Optional[DocumentFilter] = None, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[list[Offer]]:
+        """
+        Read every matching offer, newest first, in batches through a server-side cursor,
+        only one batch and its product lines are in memory at a time.
+        :param filters: The filters of the list, None for no filter.
+        :param batch_size: The number of offers of each batch.
+        :return: The batches, closing the generator closes the cursor.
+        """
+        query, params = document_page_query('"Offers"', '"OfferID"', None, None, filters)
+
+        logging.debug(f"Streaming offers with {filters}")
+
+        connection = self.db_connection
+        with connection.cursor(name="stream_offers") as stream, connection.cursor() as cursor:
+            stream.execute(query, params)
+            while True:
+                results = stream.fetchmany(batch_size)
+                if not results:
+                    break
+                products = self._get_offers_products(cursor, [row[0] for row in results])
+                yield [
                     Offer(
                         offerID=row[0],
                         employeId=row[1],
                         clientId=row[2],
                         offer_date=row[3],
                         TotalPrice=row[4],
-                        products=products
+                        products=products.get(row[0], [])
                     )
-                )
-            
-            logging.info(f"Retrieved all {len(offers)} offers")
-            return offers
-        
\ No newline at end of file
+                    for row in results
+                ]
+
+    def _get_offers_products(self, cursor: psycopg2.extensions.cursor, offer_ids: list[str]) -> dict[str, list[tuple[Product, int]]]:
+        """
+        Retrieve the product lines of several offers with a single query.
+        :param cursor: The cursor of the running operation.
+        :param offer_ids: The IDs of the offers.
+        :return: The (product, quantity) lines of each offer, keyed by offer ID.
+        """
+        lines = dict[str, list[tuple[Product, int]]]()
+        if not offer_ids:
+            return lines
+
+        cursor.execute(OFFER_PRODUCTS_QUERY, (offer_ids,))
+        for row in cursor.fetchall():
+            lines.setdefault(row[0], []).append(offer_line_from_row(row))
+        return lines
@@ -2,8 +2,7 @@ from pydantic import BaseModel
 from datetime import date  
 from typing import Optional, List, Tuple  
 
-from DAO.employeDAO import EmployeDAO
-from DAO.clientDAO import ClientDAO
+from nameLoader import get_name_loader
 from DAO.product import Product
 from DAO.client import Client
 from DAO.employe import Employe
@@ -45,10 +44,10 @@ class Order:
         return total
     
     def get_order_client(self) -> Client:
-        return ClientDAO().get_client_by_id(self.clientId)
+        return get_name_loader().get_client(self.clientId)
     
     def get_order_employe(self) -> Employe:
-        return EmployeDAO().get_employee_by_id(self.employeId)
+        return get_name_loader().get_employe(self.employeId)
     
     def get_json(self) -> OrderModel:
         return OrderModel(
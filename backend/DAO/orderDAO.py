@@ -1,29 +1,50 @@
 from fastapi import HTTPException
 import logging
 
+import psycopg2.extensions
 from connect import get_db_connection
 from DAO.order import Order
+from DAO.lineWriter import write_lines
 from DAO.product import Product
+from documentFilter import DocumentFilter
+from pagination import STREAM_BATCH_SIZE, document_page_query, split_page
+from typing import Iterator, Optional
 from DAO.productDAO import ProductDAO
 
+# Product lines of a set of orders, looked up by the index on "OrderID"
+ORDER_LINES_QUERY = """
+SELECT "OrderID", "ProductID", "Quantity"
+FROM "ProdOrd"
+WHERE "OrderID" = ANY(%s);
+"""
+
 class OrderDAO:
     def __init__(self):
         """
         Initialize the DAO with a database connection.
         :param db_connection: A database connection object.
         """
-        self.db_connection = get_db_connection()
         self.logger = logging.getLogger("appLogger")
+        self.product_dao = ProductDAO()
+
+    @property
+    def db_connection(self) -> psycopg2.extensions.connection:
+        """
+        Pooled connection of the current request.
+        """
+        return get_db_connection()
 
-    def create_order(self, order: Order) -> None:
+    def create_order(self, order: Order) -> bool:
         """
         Insert a new order into the database.
         :param order: An Order object containing order details.
-        :return: The ID of the newly created order.
+        :return: True if it was created, False if an order with the same ID already exists.
         """
         query = """
         INSERT INTO "Orders" ("OrderID", "EmployeID", "ClientID", "Date", "TotalPrice")
         VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT ("OrderID") DO NOTHING
+        RETURNING "OrderID";
         """
 
         logging.debug(f"Creating order: {order}")
@@ -36,23 +57,17 @@ class OrderDAO:
                 order.date,
                 order.totalPrice
             ))
+            if cursor.fetchone() is None:
+                self.db_connection.rollback()
+                self.logger.error(f"Order with ID {order.orderID} already exists.")
+                return False
 
             # Insert products into ProdOrd table
-            for productTup in order.products:
-                # Assuming product is a dictionary with 'Product' and 'quantity'
-                prod_query = """
-                INSERT INTO "ProdOrd" ("OrderID", "ProductID", "Quantity")
-                VALUES (%s, %s, %s);
-                """
-                product, quantity = productTup  # Unpack the tuple
-                cursor.execute(prod_query, (
-                    order.orderID,
-                    product.productId,
-                    quantity
-                ))
+            write_lines(cursor, "ProdOrd", order.orderID, order.products)
 
             self.db_connection.commit()
             logging.info(f"Order created with ID: {order.orderID}")
+            return True
         
     def get_order_by_id(self, order_id: str) -> Order:
         """
@@ -73,24 +88,8 @@ class OrderDAO:
             result = cursor.fetchone()
             if result:
 
-                # Retrieve products for this order
-                product_dao = ProductDAO()
-                product_query = """
-                SELECT "ProductID", "Quantity"
-                    FROM "ProdOrd"
-                    WHERE "OrderID" = %s;
-                """
-                cursor.execute(product_query, (order_id,))
-                products = list[tuple[Product, int]]()
-                
-                for row in cursor.fetchall():
-                    product_id, quantity = row
-                    product = product_dao.get_product_by_id(product_id)
-                    if product:
-                        products.append((product, quantity))
-                    else:
-                        logging.error(f"Product with ID {product_id} not found.")
-                        raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found.")
+                products = self._get_orders_products(cursor, [order_id]).get(order_id, [])
+
                 # Create and return the Order object
                 order = Order(
                     orderID=result[0],
@@ -128,27 +127,17 @@ class OrderDAO:
                 updated_order.totalPrice,
                 updated_order.orderID
             ))
+            updated = cursor.rowcount > 0
             
             # Update products in ProdOrd table
             delete_query = """ DELETE FROM "ProdOrd" WHERE "OrderID" = %s; """
             cursor.execute(delete_query, (updated_order.orderID,))
             
-            for productTup in updated_order.products:
-                # Assuming product is a dictionary with 'Product' and 'quantity'
-                prod_query = """
-                INSERT INTO ProdOrd ("OrderID", productID, quantity)
-                VALUES (%s, %s, %s);
-                """
-                product, quantity = productTup
-                cursor.execute(prod_query, (
-                    updated_order.orderID,
-                    product.productId,
-                    quantity
-                ))
+            write_lines(cursor, "ProdOrd", updated_order.orderID, updated_order.products)
 
             self.db_connection.commit()
             logging.info(f"Order updated with ID: {updated_order.orderID}")
-            return cursor.rowcount > 0
+            return updated
             
     def delete_order(self, order_id: int) -> bool:
         """
@@ -193,62 +182,103 @@ class OrderDAO:
         with self.db_connection.cursor() as cursor:
             cursor.execute(query)
             results = cursor.fetchall()
+            products = self._get_orders_products(cursor, [row[0] for row in results])
+
             orders = list[Order]()
             for row in results:
                 order_id, employe_id, client_id, order_date, total_Price = row
-                
-                # Retrieve products for this order
-                product_dao = ProductDAO()
-                product_query = """
-                SELECT "ProductID", "Quantity"
-                    FROM "ProdOrd"
-                    WHERE "OrderID" = %s;
-                """
-                cursor.execute(product_query, (order_id,))
-                products = list[tuple[Product, int]]()
-                
-                for row in cursor.fetchall():
-                    product_id, quantity = row
-                    product = product_dao.get_product_by_id(product_id)
-                    if product:
-                        products.append((product, quantity))
-                    else:
-                        logging.error(f"Product with ID {product_id} not found.")
-                        raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found.")
-                
-                # Create and append the Order object to the list
                 order = Order(
                     orderID=order_id,
                     employeId=employe_id,
                     clientId=client_id,
                     orderDate=order_date,
                     totalPrice=total_Price,
-                    products=products
+                    products=products.get(order_id, [])
                 )
-                
                 orders.append(order)
-            
+
             logging.info(f"Retrieved all {len(orders)} orders")
             return orders
         
-    def check_order_exists(self, order_id: str) -> bool:
-        """
-        Check if an order exists in the database.
-        :param order_id: The ID of the order to check.
-        :return: True if the order exists, False otherwise.
+    def get_orders_page(self, limit: Optional[int], after: Optional[str] = None, filters: Optional[DocumentFilter] = None) -> tuple[list[Order], Optional[str]]:
         """
-        query = """
-        SELECT COUNT(*)
-        FROM "Orders"
-        WHERE "OrderID" = %s;
+        Retrieve one page of orders, newest first, including their products.
+        :param limit: The maximum number of orders, None for every matching one.
+        :param after: The cursor of the previous page, None for the first page.
+        :param filters: The filters of the list, None for no filter.
+        :return: The orders and the cursor of the next page, None on the last page.
         """
+        query, params = document_page_query('"Orders"', '"OrderID"', limit, after, filters)
 
-        logging.debug(f"Checking if order exists with ID: {order_id}")
+        logging.debug(f"Retrieving {limit} orders after {after} with {filters}")
 
         with self.db_connection.cursor() as cursor:
-            cursor.execute(query, (order_id,))
-            result = cursor.fetchone()
-            if result is None:
-                return False
-            else:
-                return result[0] > 0
\ No newline at end of file
+            cursor.execute(query, params)
+            results, next_cursor = split_page(cursor.fetchall(), limit, lambda row: (row[3], row[0]))
+            products = self._get_orders_products(cursor, [row[0] for row in results])
+
+            orders = [
+                Order(
+                    orderID=row[0],
+                    employeId=row[1],
+                    clientId=row[2],
+                    orderDate=row[3],
+                    totalPrice=row[4],
+                    products=products.get(row[0], [])
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(orders)} orders")
+            return orders, next_cursor
+
+    def stream_orders(self, filters: Optional[DocumentFilter] = None, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[list[Order]]:
+        """
+        Read every matching order, newest first, in batches through a server-side cursor,
+        only one batch and its product lines are in memory at a time.
+        :param filters: The filters of the list, None for no filter.
+        :param batch_size: The number of orders of each batch.
+        :return: The batches, closing the generator closes the cursor.
+        """
+        query, params = document_page_query('"Orders"', '"OrderID"', None, None, filters)
+
+        logging.debug(f"Streaming orders with {filters}")
+
+        connection = self.db_connection
+        with connection.cursor(name="stream_orders") as stream, connection.cursor() as cursor:
+            stream.execute(query, params)
+            while True:
+                results = stream.fetchmany(batch_size)
+                if not results:
+                    break
+                products = self._get_orders_products(cursor, [row[0] for row in results])
+                yield [
+                    Order(
+                        orderID=row[0],
+                        employeId=row[1],
+                        clientId=row[2],
+                        orderDate=row[3],
+                        totalPrice=row[4],
+                        products=products.get(row[0], [])
+                    )
+                    for row in results
+                ]
+
+    def _get_orders_products(self, cursor: psycopg2.extensions.cursor, order_ids: list[str]) -> dict[str, list[tuple[Product, int]]]:
+        """
+        Retrieve the product lines of several orders with one query for the lines and one for the products.
+        :param cursor: The cursor of the running operation.
+        :param order_ids: The IDs of the orders.
+        :return: The (product, quantity) lines of each order, keyed by order ID.
+        """
+        lines = dict[str, list[tuple[Product, int]]]()
+        if not order_ids:
+            return lines
+
+        cursor.execute(ORDER_LINES_QUERY, (order_ids,))
+        rows = cursor.fetchall()
+
+        products = self.product_dao.get_products_by_ids(row[1] for row in rows)
+        for order_id, product_id, quantity in rows:
+            lines.setdefault(order_id, []).append((products[product_id], quantity))
+        return lines
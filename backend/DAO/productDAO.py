@@ -1,7 +1,46 @@
 import logging
 from fastapi import HTTPException
 from DAO.product import Product
+import psycopg2.extensions
 from connect import get_db_connection
+from cache import TTLCache, load_cache_env
+from typing import Iterable, Iterator, Optional
+from pagination import STREAM_BATCH_SIZE, id_page_query, split_page
+
+# Products are read far more often than written, the sync and async DAOs share these caches.
+# PRODUCT_CACHE_SIZE=0 disables them.
+PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL = load_cache_env("PRODUCT_CACHE", 1000, 60.0)
+product_cache = TTLCache[int, Product]("product", PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL)
+catalog_cache = TTLCache[str, list[Product]]("product_catalog", min(PRODUCT_CACHE_SIZE, 1), PRODUCT_CACHE_TTL)
+CATALOG_KEY = "all"
+
+def product_from_row(row: tuple, cache: bool = True) -> Product:
+    """
+    Build a product from a row of the Products table and cache it.
+    :param cache: False for rows read in bulk, they would evict the products the other requests use.
+    """
+    product = Product(
+        productId=row[0],
+        name=row[1],
+        description=row[2],
+        stock=row[3],
+        maxStock=row[4],
+        minStock=row[5],
+        purchasePrice=row[7],
+        sellPrice=row[8]
+    )
+    if cache:
+        product_cache.set(product.productId, product)
+    return product
+
+def invalidate_product(product_id: int | None = None) -> None:
+    """
+    Drop a written product from the caches, the catalog is always dropped.
+    :param product_id: The ID of the product, None for a new product.
+    """
+    if product_id is not None:
+        product_cache.invalidate(int(product_id))
+    catalog_cache.invalidate(CATALOG_KEY)
 
 class ProductDAO:
     def __init__(self):
@@ -9,9 +48,15 @@ class ProductDAO:
         Initialize the ProductDAO with a database connection.
         :param db_connection: A database connection object.
         """
-        self.db_connection = get_db_connection()
         self.logger = logging.getLogger("appLogger")
 
+    @property
+    def db_connection(self) -> psycopg2.extensions.connection:
+        """
+        Pooled connection of the current request.
+        """
+        return get_db_connection()
+
     def create_product(self, product: Product) -> Product:
         """
         Insert a new product into the database.
@@ -36,6 +81,7 @@ class ProductDAO:
                 product.purchasePrice, product.sellPrice
             ))
             self.db_connection.commit()
+            invalidate_product()
             result = cursor.fetchone()
             if result is None:
                 self.logger.error("No product ID returned from the database.")
@@ -51,6 +97,10 @@ class ProductDAO:
         Retrieve a product by its ID.
         :param product_id: The ID of the product to retrieve.
         """
+        product = product_cache.get(int(product_id))
+        if product is not None:
+            return product
+
         cursor = self.db_connection.cursor()
         logging.debug(f"Retrieving product with ID: {product_id}")
 
@@ -63,22 +113,43 @@ class ProductDAO:
             result = cursor.fetchone()
             if result:
                 logging.info(f"Product found: {result}")
-                return Product(
-                    productId=result[0],
-                    name=result[1],
-                    description=result[2],
-                    stock=result[3],
-                    maxStock=result[4],
-                    minStock=result[5],
-                    purchasePrice=result[7],
-                    sellPrice=result[8]
-                )
+                return product_from_row(result)
             else:
                 self.logger.error(f"Product with ID {product_id} not found.")
                 raise HTTPException(status_code=404, detail="Product not found.")
         finally:
             cursor.close()
 
+    def get_products_by_ids(self, product_ids: Iterable[int]) -> dict[int, Product]:
+        """
+        Retrieve several products with a single query.
+        :param product_ids: The IDs of the products to retrieve, duplicates are allowed.
+        :return: A dictionary of the products keyed by their ID.
+        """
+        ids = list(dict.fromkeys(int(product_id) for product_id in product_ids))
+        products = {product_id: product for product_id in ids if (product := product_cache.get(product_id)) is not None}
+        uncached = [product_id for product_id in ids if product_id not in products]
+        if not uncached:
+            return products
+
+        query = """SELECT *
+                FROM "Products"
+                WHERE "ProductID" = ANY(%s);"""
+
+        logging.debug(f"Retrieving {len(uncached)} products by ID")
+
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(query, (uncached,))
+            products.update((row[0], product_from_row(row)) for row in cursor.fetchall())
+
+        missing = [product_id for product_id in ids if product_id not in products]
+        if missing:
+            self.logger.error(f"Products with IDs {missing} not found.")
+            raise HTTPException(status_code=404, detail=f"Products not found: {', '.join(map(str, missing))}")
+
+        logging.info(f"Retrieved {len(products)} products by ID")
+        return products
+
     def update_product(self,product: Product) -> Product:
         """
         Update an existing product in the database.
@@ -105,6 +176,7 @@ class ProductDAO:
             ))
 
             self.db_connection.commit()
+            invalidate_product(product.productId)
             if cursor.rowcount == 0:
                 self.logger.error(f"Product with ID {product.productId} not found.")
                 raise HTTPException(status_code=404, detail="Product not found.")
@@ -132,6 +204,7 @@ class ProductDAO:
             cursor.execute(query, (product_id,))
             
             self.db_connection.commit()
+            invalidate_product(product_id)
             logging.info(f"Product with ID {product_id} deleted successfully.")
             if cursor.rowcount == 0:
                 self.logger.error(f"Product with ID {product_id} not found.")
@@ -148,6 +221,10 @@ class ProductDAO:
         Retrieve all products from the database.
         :return: A list of Product objects.
         """
+        products = catalog_cache.get(CATALOG_KEY)
+        if products is not None:
+            return list(products)
+
         cursor = self.db_connection.cursor()
         logging.debug("Retrieving all products")
 
@@ -159,23 +236,47 @@ class ProductDAO:
             results = cursor.fetchall()
 
             logging.info(f"Retrieved all {len(results)} products")
-            return [
-
-                Product(
-                    productId=row[0],
-                    name=row[1],
-                    description=row[2],
-                    stock=row[3],
-                    maxStock=row[4],
-                    minStock=row[5],
-                    purchasePrice=row[7],
-                    sellPrice=row[8]
-                )
-                for row in results
-            ]
+            products = [product_from_row(row, cache=False) for row in results]
+            catalog_cache.set(CATALOG_KEY, products)
+            return list(products)
         except Exception as e:
             self.logger.error(f"Error retrieving all products: {e}")
             raise HTTPException(status_code=500, detail="Failed to retrieve products.")
         finally:
             cursor.close()
-        
\ No newline at end of file
+
+    def get_products_page(self, limit: int, after: Optional[str] = None) -> tuple[list[Product], Optional[str]]:
+        """
+        Retrieve one page of products, ordered by ID.
+        :param limit: The maximum number of products.
+        :param after: The cursor of the previous page, None for the first page.
+        :return: The products and the cursor of the next page, None on the last page.
+        """
+        query, params = id_page_query('"Products"', '"ProductID"', limit, after)
+
+        logging.debug(f"Retrieving {limit} products after {after}")
+
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(query, params)
+            results, next_cursor = split_page(cursor.fetchall(), limit, lambda row: (row[0],))
+            products = [product_from_row(row, cache=False) for row in results]
+
+            logging.info(f"Retrieved a page of {len(products)} products")
+            return products, next_cursor
+
+    def stream_products(self, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[list[Product]]:
+        """
+        Read every product, ordered by ID, in batches through a server-side cursor.
+        The products read are not cached.
+        :param batch_size: The number of products of each batch.
+        :return: The batches, closing the generator closes the cursor.
+        """
+        logging.debug("Streaming products")
+
+        with self.db_connection.cursor(name="stream_products") as stream:
+            stream.execute('SELECT * FROM "Products" ORDER BY "ProductID";')
+            while True:
+                results = stream.fetchmany(batch_size)
+                if not results:
+                    break
+                yield [product_from_row(row, cache=False) for row in results]
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+from fastapi import HTTPException
+
+from connect import load_database_env, load_pool_env
+
+# psycopg3 counterpart of connect.py, used by the asyncDAO package when DATABASE_DRIVER=async
+
+
+class AsyncDatabasePool:
+    _instance: Optional[AsyncConnectionPool] = None
+    # Requests arriving before the pool is open wait for the first one to open it
+    _lock = asyncio.Lock()
+
+    @classmethod
+    async def get_instance(cls) -> AsyncConnectionPool:
+        if cls._instance is not None:
+            return cls._instance
+
+        async with cls._lock:
+            if cls._instance is None:
+                DATABASE, USER, PASSWORD, HOST = load_database_env()
+                min_size, max_size, timeout = load_pool_env()
+
+                pool = AsyncConnectionPool(
+                    make_conninfo(dbname=DATABASE, user=USER, password=PASSWORD, host=HOST),
+                    min_size=min_size,
+                    max_size=max_size,
+                    timeout=timeout,
+                    open=False
+                )
+                await pool.open()
+                cls._instance = pool
+                logging.info(f"Async database pool opened (min={min_size}, max={max_size}, timeout={timeout}s)")
+            return cls._instance
+
+    @classmethod
+    async def close_instance(cls) -> None:
+        if cls._instance is not None:
+            await cls._instance.close()
+            cls._instance = None
+
+
+class AsyncRequestConnection:
+    """
+    Async connection owned by one request, checked out on first use.
+    """
+
+    def __init__(self, pool: AsyncConnectionPool):
+        self.pool = pool
+        self.connection: Optional[psycopg.AsyncConnection] = None
+
+    async def get(self) -> psycopg.AsyncConnection:
+        if self.connection is None:
+            try:
+                self.connection = await self.pool.getconn()
+            except PoolTimeout:
+                logging.error("No async database connection available")
+                raise HTTPException(status_code=503, detail="Database busy, try again later")
+        return self.connection
+
+    async def release(self) -> None:
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            # the pool rolls back any transaction left open
+            await self.pool.putconn(connection)
+
+
+_request_connection: ContextVar[Optional[AsyncRequestConnection]] = ContextVar("async_request_connection", default=None)
+
+
+async def get_async_db() -> AsyncIterator[None]:
+    """
+    FastAPI dependency that gives every request its own async pooled connection.
+    """
+    async with bind_async_db_connection():
+        yield
+
+
+@asynccontextmanager
+async def bind_async_db_connection() -> AsyncIterator[None]:
+    """
+    Bind an async pooled connection, checked out on first use, to the current context until the block ends.
+    """
+    holder = AsyncRequestConnection(await AsyncDatabasePool.get_instance())
+    token = _request_connection.set(holder)
+    try:
+        yield
+    finally:
+        _request_connection.reset(token)
+        await holder.release()
+
+
+@asynccontextmanager
+async def async_db_session() -> AsyncIterator[psycopg.AsyncConnection]:
+    """
+    Bind an async pooled connection to the current context outside of a request (scripts, benchmarks).
+    """
+    holder = AsyncRequestConnection(await AsyncDatabasePool.get_instance())
+    token = _request_connection.set(holder)
+    try:
+        yield await holder.get()
+    finally:
+        _request_connection.reset(token)
+        await holder.release()
+
+
+async def get_async_db_connection() -> psycopg.AsyncConnection:
+    """
+    Async connection bound to the current request.
+    """
+    holder = _request_connection.get()
+    if holder is None:
+        raise RuntimeError("No async database connection bound, use the get_async_db dependency")
+    return await holder.get()
+
+
+def get_async_pool_stats() -> dict[str, float]:
+    if AsyncDatabasePool._instance is None:
+        return {}
+    return dict(AsyncDatabasePool._instance.get_stats())
+
+async def open_async_db_pool() -> None:
+    await AsyncDatabasePool.get_instance()
+
+async def close_async_db_pool() -> None:
+    await AsyncDatabasePool.close_instance()
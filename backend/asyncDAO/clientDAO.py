@@ -0,0 +1,192 @@
+import logging
+
+from fastapi import HTTPException
+
+from asyncConnect import get_async_db_connection
+from DAO.client import Client
+from pagination import id_page_query, split_page
+from typing import Optional
+
+class AsyncClientDAO:
+    def __init__(self):
+        """
+        Initialize the async ClientDAO, mirror of DAO.clientDAO.ClientDAO on psycopg3.
+        """
+        self.logger = logging.getLogger("appLogger")
+
+    async def create_client(self, client: Client) -> Client:
+        """
+        Insert a new client into the database.
+        :param client: A Client object containing client details.
+        :return: The client with its new ID.
+        """
+        query = """
+        INSERT INTO "Clients" ("CompanyName", "CIF", "Address", "Email", "Phone", "Contact")
+        values (%s, %s, %s, %s, %s, %s) RETURNING "ClientID";
+        """
+
+        logging.debug(f"Creating client: {client}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                client.CompanyName,
+                client.CIF,
+                client.address,
+                client.email,
+                client.phone,
+                client.contact
+            ))
+            result = await cursor.fetchone()
+            if result is None:
+                self.logger.error("Failed to insert client and retrieve its ID.")
+                raise HTTPException(status_code=500, detail="Failed to create client.")
+            await db_connection.commit()
+
+            client.clientID = result[0]
+
+            logging.info(f"Client created with ID: {client.clientID}")
+            return client
+
+    async def get_client_by_id(self, client_id: str) -> Client:
+        """
+        Retrieve a client by its ID.
+        :param client_id: The ID of the client.
+        :return: A Client object containing the client details.
+        """
+        query = """
+                SELECT * FROM "Clients" WHERE "ClientID" = %s
+                """
+
+        logging.debug(f"Retrieving client with ID: {client_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (client_id,))
+            row = await cursor.fetchone()
+            if row:
+                logging.info(f"Client found: {row}")
+                return Client(
+                    clientID=row[0],
+                    CompanyName=row[1],
+                    CIF=row[2],
+                    address=row[3],
+                    email=row[4],
+                    phone=row[5],
+                    contact=row[6]
+                )
+            else:
+                self.logger.error(f"Client with ID {client_id} not found.")
+                raise HTTPException(status_code=404, detail=f"Client with ID {client_id} not found.")
+
+    async def get_all_clients(self) -> list[Client]:
+        """
+        Retrieve all clients from the database.
+        :return: A list of Client objects.
+        """
+        query = """
+                SELECT * FROM "Clients"
+                """
+
+        logging.debug("Retrieving all clients")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query)
+            clients = [
+                Client(
+                    clientID=row[0],
+                    CompanyName=row[1],
+                    CIF=row[2],
+                    address=row[3],
+                    email=row[4],
+                    phone=row[5],
+                    contact=row[6]
+                )
+                for row in await cursor.fetchall()
+            ]
+
+            logging.info(f"Retrieved {len(clients)} clients")
+            return clients
+
+    async def get_clients_page(self, limit: int, after: Optional[str] = None) -> tuple[list[Client], Optional[str]]:
+        """
+        Retrieve one page of clients, ordered by ID.
+        :param limit: The maximum number of clients.
+        :param after: The cursor of the previous page, None for the first page.
+        :return: The clients and the cursor of the next page, None on the last page.
+        """
+        query, params = id_page_query('"Clients"', '"ClientID"', limit, after)
+
+        logging.debug(f"Retrieving {limit} clients after {after}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, params)
+            results, next_cursor = split_page(await cursor.fetchall(), limit, lambda row: (row[0],))
+            clients = [
+                Client(
+                    clientID=row[0],
+                    CompanyName=row[1],
+                    CIF=row[2],
+                    address=row[3],
+                    email=row[4],
+                    phone=row[5],
+                    contact=row[6]
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(clients)} clients")
+            return clients, next_cursor
+
+    async def update_client(self, client: Client) -> Client:
+        """
+        Update an existing client in the database.
+        :param client: A Client object containing updated client details.
+        :return: The updated client.
+        """
+        query = """
+        UPDATE "Clients"
+        SET "CompanyName" = %s, "CIF" = %s, "Address" = %s, "Email" = %s, "Phone" = %s, "Contact" = %s
+        WHERE "ClientID" = %s;
+        """
+
+        logging.debug(f"Updating client: {client}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                client.CompanyName,
+                client.CIF,
+                client.address,
+                client.email,
+                client.phone,
+                client.contact,
+                client.clientID
+            ))
+            await db_connection.commit()
+
+            logging.info(f"Client with ID {client.clientID} updated")
+            if cursor.rowcount == 0:
+                self.logger.error(f"Failed to update client with ID {client.clientID}.")
+                raise HTTPException(status_code=404, detail=f"Client with ID {client.clientID} not found.")
+            return client
+
+    async def delete_client(self, client_id: int) -> bool:
+        """
+        Delete a client from the database.
+        :param client_id: The ID of the client to delete.
+        :return: True if the deletion was successful, False otherwise.
+        """
+        query = """DELETE FROM "Clients" WHERE "ClientID" = %s
+        """
+
+        logging.debug(f"Deleting client with ID: {client_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (client_id,))
+            await db_connection.commit()
+            logging.info(f"Client with ID {client_id} deleted")
+            return cursor.rowcount > 0
@@ -0,0 +1,257 @@
+import logging
+
+from fastapi import HTTPException
+
+from asyncConnect import get_async_db_connection
+from asyncDAO.lineWriter import write_lines
+from asyncDAO.productDAO import AsyncProductDAO
+from DAO.deliveryNote import DeliveryNote
+from DAO.deliveryNoteDAO import DELIVERY_NOTE_LINES_QUERY
+from DAO.product import Product
+from documentFilter import DocumentFilter
+from pagination import STREAM_BATCH_SIZE, document_page_query, split_page
+from typing import AsyncIterator, Optional
+
+class AsyncDeliveryNoteDAO:
+    def __init__(self):
+        """
+        Initialize the async DeliveryNoteDAO, mirror of DAO.deliveryNoteDAO.DeliveryNoteDAO on psycopg3.
+        """
+        self.logger = logging.getLogger("appLogger")
+        self.product_dao = AsyncProductDAO()
+
+    async def _get_delivery_notes_products(self, cursor, delivery_note_ids: list[str]) -> dict[str, list[tuple[Product, int]]]:
+        """
+        Retrieve the product lines of several delivery notes with one query for the lines and one for the products.
+        :return: The (product, quantity) lines of each delivery note, keyed by delivery note ID.
+        """
+        lines = dict[str, list[tuple[Product, int]]]()
+        if not delivery_note_ids:
+            return lines
+
+        await cursor.execute(DELIVERY_NOTE_LINES_QUERY, (delivery_note_ids,))
+        rows = await cursor.fetchall()
+
+        products = await self.product_dao.get_products_by_ids(row[1] for row in rows)
+        for delivery_note_id, product_id, quantity in rows:
+            lines.setdefault(delivery_note_id, []).append((products[product_id], quantity))
+        return lines
+
+    async def create_delivery_note(self, delivery_note: DeliveryNote) -> bool:
+        """
+        Insert a new delivery note into the database.
+        :param delivery_note: A DeliveryNote object containing delivery note details.
+        :return: True if it was created, False if a delivery note with the same ID already exists.
+        """
+        query = """
+        INSERT INTO "DeliveryNotes" ("DeliveryNoteID", "EmployeID", "ClientID", "Date", "TotalPrice")
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT ("DeliveryNoteID") DO NOTHING
+        RETURNING "DeliveryNoteID";
+        """
+
+        logging.debug(f"Creating delivery note: {delivery_note}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                delivery_note.deliveryNoteID,
+                delivery_note.employeId,
+                delivery_note.clientId,
+                delivery_note.date,
+                delivery_note.totalPrice
+            ))
+            if await cursor.fetchone() is None:
+                await db_connection.rollback()
+                self.logger.error(f"Delivery note with ID {delivery_note.deliveryNoteID} already exists.")
+                return False
+
+            # Insert products into ProdDn table
+            await write_lines(cursor, "ProdDn", delivery_note.deliveryNoteID, delivery_note.products)
+
+            await db_connection.commit()
+            logging.info(f"Delivery note created with ID: {delivery_note.deliveryNoteID}")
+            return True
+
+    async def get_delivery_note_by_id(self, delivery_note_id: str) -> DeliveryNote:
+        """
+        Retrieve a delivery note by its ID, including its products.
+        :param delivery_note_id: The ID of the delivery note.
+        :return: The delivery note.
+        """
+        query = """
+        SELECT *
+        FROM "DeliveryNotes"
+        WHERE "DeliveryNoteID" = %s;
+        """
+
+        logging.debug(f"Retrieving delivery note with ID: {delivery_note_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (delivery_note_id,))
+            result = await cursor.fetchone()
+            if result:
+                delivery_note = DeliveryNote(
+                    deliveryNoteID=result[0],
+                    employeId=result[1],
+                    clientId=result[2],
+                    deliveryNoteDate=result[3],
+                    totalPrice=result[4],
+                    products=(await self._get_delivery_notes_products(cursor, [delivery_note_id])).get(delivery_note_id, [])
+                )
+
+                logging.info(f"Delivery note found: {delivery_note}")
+                return delivery_note
+            else:
+                self.logger.error(f"Delivery note with ID {delivery_note_id} not found.")
+                raise HTTPException(status_code=404, detail=f"Delivery note with ID {delivery_note_id} not found.")
+
+    async def update_delivery_note(self, updated_delivery_note: DeliveryNote) -> bool:
+        """
+        Update an existing delivery note in the database.
+        :param updated_delivery_note: A DeliveryNote object containing updated delivery note details.
+        :return: True if the update was successful, False otherwise.
+        """
+        query = """
+        UPDATE "DeliveryNotes"
+        SET "EmployeID" = %s, "ClientID" = %s, "Date" = %s, "TotalPrice" = %s
+        WHERE "DeliveryNoteID" = %s;
+        """
+        delete_query = """ DELETE FROM "ProdDn" WHERE "DeliveryNoteID" = %s; """
+
+        logging.debug(f"Updating delivery note: {updated_delivery_note}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                updated_delivery_note.employeId,
+                updated_delivery_note.clientId,
+                updated_delivery_note.date,
+                updated_delivery_note.totalPrice,
+                updated_delivery_note.deliveryNoteID
+            ))
+            updated = cursor.rowcount > 0
+
+            # Update products in ProdDn table
+            await cursor.execute(delete_query, (updated_delivery_note.deliveryNoteID,))
+            await write_lines(cursor, "ProdDn", updated_delivery_note.deliveryNoteID, updated_delivery_note.products)
+
+            await db_connection.commit()
+            logging.info(f"Delivery note updated with ID: {updated_delivery_note.deliveryNoteID}")
+            return updated
+
+    async def delete_delivery_note(self, delivery_note_id: str) -> bool:
+        """
+        Delete a delivery note from the database.
+        :param delivery_note_id: The ID of the delivery note to delete.
+        :return: True if the deletion was successful, False otherwise.
+        """
+        logging.debug(f"Deleting delivery note with ID: {delivery_note_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute("""DELETE FROM "ProdDn" WHERE "DeliveryNoteID" = %s;""", (delivery_note_id,))
+            await cursor.execute("""DELETE FROM "DeliveryNotes" WHERE "DeliveryNoteID" = %s;""", (delivery_note_id,))
+
+            await db_connection.commit()
+            logging.info(f"Delivery note with ID {delivery_note_id} deleted")
+            return cursor.rowcount > 0
+
+    async def get_all_delivery_notes(self) -> list[DeliveryNote]:
+        """
+        Retrieve all delivery_notes from the database.
+        :return: A list of DeliveryNote objects.
+        """
+        query = """
+        SELECT *
+        FROM "DeliveryNotes";
+        """
+
+        logging.debug("Retrieving all delivery_notes")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query)
+            results = await cursor.fetchall()
+
+            products = await self._get_delivery_notes_products(cursor, [row[0] for row in results])
+
+            delivery_notes = list[DeliveryNote]()
+            for delivery_note_id, employe_id, client_id, delivery_note_date, total_price in results:
+                delivery_notes.append(DeliveryNote(
+                    deliveryNoteID=delivery_note_id,
+                    employeId=employe_id,
+                    clientId=client_id,
+                    deliveryNoteDate=delivery_note_date,
+                    totalPrice=total_price,
+                    products=products.get(delivery_note_id, [])
+                ))
+
+            logging.info(f"Retrieved all {len(delivery_notes)} delivery_notes")
+            return delivery_notes
+
+    async def get_delivery_notes_page(self, limit: Optional[int], after: Optional[str] = None, filters: Optional[DocumentFilter] = None) -> tuple[list[DeliveryNote], Optional[str]]:
+        """
+        Retrieve one page of delivery notes, newest first, including their products.
+        :param limit: The maximum number of delivery notes, None for every matching one.
+        :param after: The cursor of the previous page, None for the first page.
+        :param filters: The filters of the list, None for no filter.
+        :return: The delivery notes and the cursor of the next page, None on the last page.
+        """
+        query, params = document_page_query('"DeliveryNotes"', '"DeliveryNoteID"', limit, after, filters)
+
+        logging.debug(f"Retrieving {limit} delivery notes after {after} with {filters}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, params)
+            results, next_cursor = split_page(await cursor.fetchall(), limit, lambda row: (row[3], row[0]))
+            products = await self._get_delivery_notes_products(cursor, [row[0] for row in results])
+
+            delivery_notes = [
+                DeliveryNote(
+                    deliveryNoteID=row[0],
+                    employeId=row[1],
+                    clientId=row[2],
+                    deliveryNoteDate=row[3],
+                    totalPrice=row[4],
+                    products=products.get(row[0], [])
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(delivery_notes)} delivery notes")
+            return delivery_notes, next_cursor
+
+    async def stream_delivery_notes(self, filters: Optional[DocumentFilter] = None, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[list[DeliveryNote]]:
+        """
+        Read every matching delivery note, newest first, in batches through a server-side cursor,
+        only one batch and its product lines are in memory at a time.
+        :param filters: The filters of the list, None for no filter.
+        :param batch_size: The number of delivery notes of each batch.
+        :return: The batches, closing the generator closes the cursor.
+        """
+        query, params = document_page_query('"DeliveryNotes"', '"DeliveryNoteID"', None, None, filters)
+
+        logging.debug(f"Streaming delivery notes with {filters}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor(name="stream_delivery_notes") as stream, db_connection.cursor() as cursor:
+            await stream.execute(query, params)
+            while True:
+                results = await stream.fetchmany(batch_size)
+                if not results:
+                    break
+                products = await self._get_delivery_notes_products(cursor, [row[0] for row in results])
+                yield [
+                    DeliveryNote(
+                        deliveryNoteID=row[0],
+                        employeId=row[1],
+                        clientId=row[2],
+                        deliveryNoteDate=row[3],
+                        totalPrice=row[4],
+                        products=products.get(row[0], [])
+                    )
+                    for row in results
+                ]
@@ -0,0 +1,173 @@
+import logging
+
+from asyncConnect import get_async_db_connection
+from DAO.employe import Employe
+from DAO.employeDAO import employe_cache
+from pagination import id_page_query, split_page
+from typing import Optional
+
+class AsyncEmployeDAO:
+    def __init__(self):
+        """
+        Initialize the async EmployeDAO, mirror of DAO.employeDAO.EmployeDAO on psycopg3.
+        """
+        self.logger = logging.getLogger("appLogger")
+
+    async def get_all_employees(self) -> list[Employe]:
+        """
+        Retrieve all employees from the database.
+        :return: A list of Employee objects.
+        """
+        query = """
+                SELECT * FROM "Employes"
+                """
+
+        logging.debug("Retrieving all employees")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query)
+            employees = [
+                Employe(
+                    employe_id=row[0],
+                    name=row[1],
+                    family_name=row[2],
+                    email=row[3],
+                    rol=row[4]
+                )
+                for row in await cursor.fetchall()
+            ]
+
+            logging.info(f"Retrieved {len(employees)} employees")
+            return employees
+
+    async def get_employees_page(self, limit: int, after: Optional[str] = None) -> tuple[list[Employe], Optional[str]]:
+        """
+        Retrieve one page of employees, ordered by ID.
+        :param limit: The maximum number of employees.
+        :param after: The cursor of the previous page, None for the first page.
+        :return: The employees and the cursor of the next page, None on the last page.
+        """
+        query, params = id_page_query('"Employes"', '"EmployeID"', limit, after, id_type=str)
+
+        logging.debug(f"Retrieving {limit} employees after {after}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, params)
+            results, next_cursor = split_page(await cursor.fetchall(), limit, lambda row: (row[0],))
+            employees = [
+                Employe(
+                    employe_id=row[0],
+                    name=row[1],
+                    family_name=row[2],
+                    email=row[3],
+                    rol=row[4]
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(employees)} employees")
+            return employees, next_cursor
+
+    async def get_employee_by_id(self, employe_id: str) -> Employe:
+        """
+        Retrieve an employee by their ID.
+        :param employe_id: The ID of the employee to retrieve.
+        :return: An Employee object.
+        """
+        employe = employe_cache.get(str(employe_id))
+        if employe is not None:
+            return employe
+
+        query = """SELECT * FROM "Employes" WHERE "EmployeID" = %s"""
+
+        logging.debug(f"Retrieving employee with ID: {employe_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (employe_id,))
+            row = await cursor.fetchone()
+            if row:
+                employe = Employe(
+                    employe_id=row[0],
+                    name=row[1],
+                    family_name=row[2],
+                    email=row[3],
+                    rol=row[4]
+                )
+                employe_cache.set(str(employe_id), employe)
+                return employe
+            else:
+                self.logger.error(f"Employee with ID {employe_id} not found.")
+                raise ValueError(f"Employee with ID {employe_id} not found.")
+
+    async def add_employee(self, employe_id: str, name: str, family_name: str, email: str, rol: int = 0) -> Employe:
+        """
+        Add a new employee to the database.
+        :return: The newly added employee.
+        """
+        query = """
+        INSERT INTO "Employes" ("EmployeID", "Name", "Family_name", "Email", "Rol")
+        VALUES (%s, %s, %s, %s, %s);
+        """
+
+        logging.debug(f"Adding employee with ID: {employe_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (employe_id, name, family_name, email, rol))
+            await db_connection.commit()
+            employe_cache.invalidate(str(employe_id))
+            logging.info(f"Employee added with ID: {employe_id}")
+            return Employe(employe_id=employe_id, name=name, family_name=family_name, email=email, rol=rol)
+
+    async def update_employee(self, employe_id: str, name: str, family_name: str, email: str, rol: int = 0) -> Employe:
+        """
+        Update an existing employee in the database.
+        :return: The updated employee.
+        """
+        query = """
+        UPDATE "Employes"
+        SET "Name" = %s, "Family_name" = %s, "Email" = %s, "Rol" = %s
+        WHERE "EmployeID" = %s;
+        """
+
+        logging.debug(f"Updating employee with ID: {employe_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (name, family_name, email, rol, employe_id))
+            await db_connection.commit()
+            employe_cache.invalidate(str(employe_id))
+            logging.info(f"Employee with ID {employe_id} updated")
+            return Employe(employe_id=employe_id, name=name, family_name=family_name, email=email, rol=rol)
+
+    async def delete_employee(self, employee_id: int) -> bool:
+        """
+        Delete an employee from the database.
+        :param employee_id: The ID of the employee to delete.
+        :return: True if the deletion was successful, False otherwise.
+        """
+        query = """DELETE FROM "Employes" WHERE "EmployeID" = %s"""
+
+        logging.debug(f"Deleting employee with ID: {employee_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (employee_id,))
+            await db_connection.commit()
+            employe_cache.invalidate(str(employee_id))
+            logging.info(f"Employee with ID {employee_id} deleted")
+            return cursor.rowcount > 0
+
+    async def retriveOrCreate(self, employe_id: str, name: str, family_name: str, email: str) -> Employe:
+        """
+        Create a new employee if they do not already exist in the database.
+        :return: The existing or newly created employee.
+        """
+        try:
+            return await self.get_employee_by_id(employe_id)
+        except ValueError:
+            logging.debug(f"Employee with ID {employe_id} does not exist, creating new employee.")
+            return await self.add_employee(employe_id=employe_id, name=name, family_name=family_name, email=email)
@@ -0,0 +1,257 @@
+import logging
+
+from fastapi import HTTPException
+
+from asyncConnect import get_async_db_connection
+from asyncDAO.lineWriter import write_lines
+from asyncDAO.productDAO import AsyncProductDAO
+from DAO.invoice import Invoice
+from DAO.invoiceDAO import INVOICE_LINES_QUERY
+from DAO.product import Product
+from documentFilter import DocumentFilter
+from pagination import STREAM_BATCH_SIZE, document_page_query, split_page
+from typing import AsyncIterator, Optional
+
+class AsyncInvoiceDAO:
+    def __init__(self):
+        """
+        Initialize the async InvoiceDAO, mirror of DAO.invoiceDAO.InvoiceDAO on psycopg3.
+        """
+        self.logger = logging.getLogger("appLogger")
+        self.product_dao = AsyncProductDAO()
+
+    async def _get_invoices_products(self, cursor, invoice_ids: list[str]) -> dict[str, list[tuple[Product, int]]]:
+        """
+        Retrieve the product lines of several invoices with one query for the lines and one for the products.
+        :return: The (product, quantity) lines of each invoice, keyed by invoice ID.
+        """
+        lines = dict[str, list[tuple[Product, int]]]()
+        if not invoice_ids:
+            return lines
+
+        await cursor.execute(INVOICE_LINES_QUERY, (invoice_ids,))
+        rows = await cursor.fetchall()
+
+        products = await self.product_dao.get_products_by_ids(row[1] for row in rows)
+        for invoice_id, product_id, quantity in rows:
+            lines.setdefault(invoice_id, []).append((products[product_id], quantity))
+        return lines
+
+    async def create_invoice(self, invoice: Invoice) -> bool:
+        """
+        Insert a new invoice into the database.
+        :param invoice: An Invoice object containing invoice details.
+        :return: True if it was created, False if an invoice with the same ID already exists.
+        """
+        query = """
+        INSERT INTO "Invoices" ("InvoiceID", "EmployeID", "ClientID", "Date", "TotalPrice")
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT ("InvoiceID") DO NOTHING
+        RETURNING "InvoiceID";
+        """
+
+        logging.debug(f"Creating invoice: {invoice}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                invoice.invoiceID,
+                invoice.employeId,
+                invoice.clientId,
+                invoice.date,
+                invoice.totalPrice
+            ))
+            if await cursor.fetchone() is None:
+                await db_connection.rollback()
+                self.logger.error(f"Invoice with ID {invoice.invoiceID} already exists.")
+                return False
+
+            # Insert products into ProdInv table
+            await write_lines(cursor, "ProdInv", invoice.invoiceID, invoice.products)
+
+            await db_connection.commit()
+            logging.info(f"Invoice created with ID: {invoice.invoiceID}")
+            return True
+
+    async def get_invoice_by_id(self, invoice_id: str) -> Invoice:
+        """
+        Retrieve an invoice by its ID, including its products.
+        :param invoice_id: The ID of the invoice.
+        :return: The invoice.
+        """
+        query = """
+        SELECT *
+        FROM "Invoices"
+        WHERE "InvoiceID" = %s;
+        """
+
+        logging.debug(f"Retrieving invoice with ID: {invoice_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (invoice_id,))
+            result = await cursor.fetchone()
+            if result:
+                invoice = Invoice(
+                    invoiceID=result[0],
+                    employeId=result[1],
+                    clientId=result[2],
+                    invoiceDate=result[3],
+                    totalPrice=result[4],
+                    products=(await self._get_invoices_products(cursor, [invoice_id])).get(invoice_id, [])
+                )
+
+                logging.info(f"Invoice found: {invoice}")
+                return invoice
+            else:
+                self.logger.error(f"Invoice with ID {invoice_id} not found.")
+                raise HTTPException(status_code=404, detail="Invoice not found")
+
+    async def update_invoice(self, updated_invoice: Invoice) -> bool:
+        """
+        Update an existing invoice in the database.
+        :param updated_invoice: An Invoice object containing updated invoice details.
+        :return: True if the update was successful, False otherwise.
+        """
+        query = """
+        UPDATE "Invoices"
+        SET "EmployeID" = %s, "ClientID" = %s, "Date" = %s, "TotalPrice" = %s
+        WHERE "InvoiceID" = %s;
+        """
+        delete_query = """ DELETE FROM "ProdInv" WHERE "InvoiceID" = %s; """
+
+        logging.debug(f"Updating invoice: {updated_invoice}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                updated_invoice.employeId,
+                updated_invoice.clientId,
+                updated_invoice.date,
+                updated_invoice.totalPrice,
+                updated_invoice.invoiceID
+            ))
+            updated = cursor.rowcount > 0
+
+            # Update products in ProdInv table
+            await cursor.execute(delete_query, (updated_invoice.invoiceID,))
+            await write_lines(cursor, "ProdInv", updated_invoice.invoiceID, updated_invoice.products)
+
+            await db_connection.commit()
+            logging.info(f"Invoice updated with ID: {updated_invoice.invoiceID}")
+            return updated
+
+    async def delete_invoice(self, invoice_id: str) -> bool:
+        """
+        Delete an invoice from the database.
+        :param invoice_id: The ID of the invoice to delete.
+        :return: True if the deletion was successful, False otherwise.
+        """
+        logging.debug(f"Deleting invoice with ID: {invoice_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute("""DELETE FROM "ProdInv" WHERE "InvoiceID" = %s;""", (invoice_id,))
+            await cursor.execute("""DELETE FROM "Invoices" WHERE "InvoiceID" = %s;""", (invoice_id,))
+
+            await db_connection.commit()
+            logging.info(f"Invoice with ID {invoice_id} deleted")
+            return cursor.rowcount > 0
+
+    async def get_all_invoices(self) -> list[Invoice]:
+        """
+        Retrieve all invoices from the database.
+        :return: A list of Invoice objects.
+        """
+        query = """
+        SELECT *
+        FROM "Invoices";
+        """
+
+        logging.debug("Retrieving all invoices")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query)
+            results = await cursor.fetchall()
+
+            products = await self._get_invoices_products(cursor, [row[0] for row in results])
+
+            invoices = list[Invoice]()
+            for invoice_id, employe_id, client_id, invoice_date, total_price in results:
+                invoices.append(Invoice(
+                    invoiceID=invoice_id,
+                    employeId=employe_id,
+                    clientId=client_id,
+                    invoiceDate=invoice_date,
+                    totalPrice=total_price,
+                    products=products.get(invoice_id, [])
+                ))
+
+            logging.info(f"Retrieved all {len(invoices)} invoices")
+            return invoices
+
+    async def get_invoices_page(self, limit: Optional[int], after: Optional[str] = None, filters: Optional[DocumentFilter] = None) -> tuple[list[Invoice], Optional[str]]:
+        """
+        Retrieve one page of invoices, newest first, including their products.
+        :param limit: The maximum number of invoices, None for every matching one.
+        :param after: The cursor of the previous page, None for the first page.
+        :param filters: The filters of the list, None for no filter.
+        :return: The invoices and the cursor of the next page, None on the last page.
+        """
+        query, params = document_page_query('"Invoices"', '"InvoiceID"', limit, after, filters)
+
+        logging.debug(f"Retrieving {limit} invoices after {after} with {filters}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, params)
+            results, next_cursor = split_page(await cursor.fetchall(), limit, lambda row: (row[3], row[0]))
+            products = await self._get_invoices_products(cursor, [row[0] for row in results])
+
+            invoices = [
+                Invoice(
+                    invoiceID=row[0],
+                    employeId=row[1],
+                    clientId=row[2],
+                    invoiceDate=row[3],
+                    totalPrice=row[4],
+                    products=products.get(row[0], [])
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(invoices)} invoices")
+            return invoices, next_cursor
+
+    async def stream_invoices(self, filters: Optional[DocumentFilter] = None, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[list[Invoice]]:
+        """
+        Read every matching invoice, newest first, in batches through a server-side cursor,
+        only one batch and its product lines are in memory at a time.
+        :param filters: The filters of the list, None for no filter.
+        :param batch_size: The number of invoices of each batch.
+        :return: The batches, closing the generator closes the cursor.
+        """
+        query, params = document_page_query('"Invoices"', '"InvoiceID"', None, None, filters)
+
+        logging.debug(f"Streaming invoices with {filters}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor(name="stream_invoices") as stream, db_connection.cursor() as cursor:
+            await stream.execute(query, params)
+            while True:
+                results = await stream.fetchmany(batch_size)
+                if not results:
+                    break
+                products = await self._get_invoices_products(cursor, [row[0] for row in results])
+                yield [
+                    Invoice(
+                        invoiceID=row[0],
+                        employeId=row[1],
+                        clientId=row[2],
+                        invoiceDate=row[3],
+                        totalPrice=row[4],
+                        products=products.get(row[0], [])
+                    )
+                    for row in results
+                ]
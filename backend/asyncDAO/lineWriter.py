@@ -0,0 +1,48 @@
+import logging
+
+from DAO.lineWriter import LINE_COPY_THRESHOLD, LINE_TABLES, LineChanges, copy_lines_query, line_rows, merge_lines, upsert_lines_query, use_copy
+from DAO.product import Product
+
+
+def values_lines_query(table: str, count: int) -> str:
+    """
+    The multi-row INSERT of a line table with the placeholders of count lines, psycopg3 has no execute_values.
+    """
+    values = ", ".join(["(%s, %s, %s)"] * count)
+    return f'INSERT INTO "{table}" ("{LINE_TABLES[table]}", "ProductID", "Quantity") VALUES {values};'
+
+async def write_lines(cursor, table: str, document_id: str, lines: list[tuple[Product, int]],
+                      copy_threshold: int = LINE_COPY_THRESHOLD) -> None:
+    """
+    Insert the product lines of a document with one statement, mirror of DAO.lineWriter.write_lines on psycopg3.
+    The caller commits.
+    :param cursor: The cursor of the running operation.
+    :param table: The line table, one of LINE_TABLES.
+    :param document_id: The ID of the document.
+    :param lines: The (product, quantity) lines.
+    :param copy_threshold: The number of lines from which COPY is used.
+    """
+    rows = line_rows(document_id, lines)
+    if not rows:
+        return
+
+    if use_copy(rows, copy_threshold):
+        logging.debug(f"Copying {len(rows)} lines into {table}")
+        async with cursor.copy(copy_lines_query(table)) as copy:
+            for row in rows:
+                await copy.write_row(row)
+    else:
+        logging.debug(f"Inserting {len(rows)} lines into {table}")
+        await cursor.execute(values_lines_query(table, len(rows)), [value for row in rows for value in row])
+
+async def upsert_lines(cursor, table: str, document_id: str, lines: list[tuple[Product, int]]) -> LineChanges:
+    """
+    Make the stored lines of a document match lines, mirror of DAO.lineWriter.upsert_lines on psycopg3.
+    The caller commits.
+    :return: The lines inserted, updated and deleted.
+    """
+    product_ids, quantities = merge_lines(lines)
+    await cursor.execute(upsert_lines_query(table), (product_ids, quantities, document_id, document_id))
+    changes = LineChanges.from_rows(await cursor.fetchall())
+    logging.debug(f"Lines of {document_id} in {table}: {changes}")
+    return changes
@@ -0,0 +1,289 @@
+import logging
+
+from fastapi import HTTPException
+import psycopg
+
+from asyncConnect import get_async_db_connection
+from asyncDAO.lineWriter import upsert_lines, write_lines
+from DAO.lineWriter import LineChanges
+from DAO.offer import Offer
+from DAO.offerDAO import CREATE_OFFER_FUNCTION_QUERY, OFFER_PRODUCTS_QUERY, create_offer_error, offer_line_from_row, offer_lines_json
+from DAO.product import Product
+from documentFilter import DocumentFilter
+from pagination import STREAM_BATCH_SIZE, document_page_query, split_page
+from typing import AsyncIterator, Optional
+
+
+class AsyncOfferDAO:
+    def __init__(self):
+        """
+        Initialize the async OfferDAO, mirror of DAO.offerDAO.OfferDAO on psycopg3.
+        """
+        self.logger = logging.getLogger("appLogger")
+
+    async def _get_offers_products(self, cursor, offer_ids: list[str]) -> dict[str, list[tuple[Product, int]]]:
+        """
+        Retrieve the product lines of several offers with a single query.
+        :return: The (product, quantity) lines of each offer, keyed by offer ID.
+        """
+        lines = dict[str, list[tuple[Product, int]]]()
+        if not offer_ids:
+            return lines
+
+        await cursor.execute(OFFER_PRODUCTS_QUERY, (offer_ids,))
+        for row in await cursor.fetchall():
+            lines.setdefault(row[0], []).append(offer_line_from_row(row))
+        return lines
+
+    async def create_offer(self, offer: Offer) -> Offer:
+        """
+        Insert a new offer into the database.
+        :param offer: The offer to insert.
+        :return: The offer with its new ID.
+        """
+        query = """
+        INSERT INTO "Offers" ("EmployeID", "ClientID", "Date", "TotalPrice")
+        VALUES (%s, %s, %s, %s)
+        RETURNING "OfferID";
+        """
+
+        logging.debug(f"Creating offer")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                offer.employeID,
+                offer.clientID,
+                offer.date,
+                offer.TotalPrice
+            ))
+            result = await cursor.fetchone()
+            if result is None:
+                self.logger.error("No offer ID returned from the database.")
+                raise HTTPException(status_code=500, detail="Failed to create offer.")
+            offer_id = result[0]
+
+            # Insert products into ProdOfe table
+            await write_lines(cursor, "ProdOfe", offer_id, offer.products)
+
+            await db_connection.commit()
+            logging.info(f"Offer created with ID: {offer_id}")
+            return Offer(
+                offerID=str(offer_id),
+                employeId=offer.employeID,
+                clientId=offer.clientID,
+                offer_date=offer.date,
+                TotalPrice=offer.TotalPrice,
+                products=offer.products
+            )
+
+    async def create_offer_in_database(self, employe_id: str, client_id: str, lines: list[tuple[int, int]]) -> str:
+        """
+        Insert a new offer with a single call to the create_offer database function.
+        :param employe_id: The ID of the employee creating the offer.
+        :param client_id: The ID of the client.
+        :param lines: The (product ID, quantity) lines.
+        :return: The ID of the new offer.
+        :raises HTTPException: 404 if a product does not exist, 400 if the lines are not valid.
+        """
+        logging.debug(f"Creating offer in the database for client {client_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            try:
+                await cursor.execute(CREATE_OFFER_FUNCTION_QUERY, (employe_id, client_id, offer_lines_json(lines)))
+            except psycopg.Error as e:
+                await db_connection.rollback()
+                self.logger.error(f"Failed to create offer: {e}")
+                raise create_offer_error(e.sqlstate or "", e.diag.message_detail)
+            offer_id = (await cursor.fetchone())[0]
+
+            await db_connection.commit()
+            logging.info(f"Offer created with ID: {offer_id}")
+            return offer_id
+
+    async def get_offer_by_id(self, offer_id: str) -> Offer:
+        """
+        Retrieve an offer by its ID, including its products.
+        :param offer_id: The ID of the offer.
+        :return: The offer.
+        """
+        query = """
+        SELECT * FROM "Offers" WHERE "OfferID" = %s;
+        """
+
+        logging.debug(f"Retrieving offer with ID: {offer_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (offer_id,))
+            result = await cursor.fetchone()
+            if result:
+                products = await self._get_offers_products(cursor, [offer_id])
+                offer = Offer(
+                    offerID=result[0],
+                    employeId=result[1],
+                    clientId=result[2],
+                    offer_date=result[3],
+                    TotalPrice=result[4],
+                    products=products.get(offer_id, [])
+                )
+                logging.info(f"Offer found: {offer}")
+                return offer
+            else:
+                self.logger.error(f"Offer with ID {offer_id} not found.")
+                raise HTTPException(status_code=404, detail="Offer not found.")
+
+    async def update_offer(self, updated_offer: Offer) -> Optional[LineChanges]:
+        """
+        Update an existing offer in the database.
+        Only the product lines that differ from the stored ones are written.
+        :param updated_offer: The offer with its updated details.
+        :return: The lines inserted, updated and deleted, None if the offer does not exist.
+        """
+        query = """
+        UPDATE "Offers"
+        SET "EmployeID" = %s, "ClientID" = %s, "Date" = %s, "TotalPrice" = %s
+        WHERE "OfferID" = %s;
+        """
+
+        logging.debug(f"Updating offer: {updated_offer}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                updated_offer.employeID,
+                updated_offer.clientID,
+                updated_offer.date,
+                updated_offer.TotalPrice,
+                updated_offer.offerID
+            ))
+            if cursor.rowcount == 0:
+                await db_connection.rollback()
+                self.logger.error(f"Offer with ID {updated_offer.offerID} not found.")
+                return None
+
+            # Update products in ProdOfe table
+            changes = await upsert_lines(cursor, "ProdOfe", updated_offer.offerID, updated_offer.products)
+
+            await db_connection.commit()
+            logging.info(f"Offer updated with ID: {updated_offer.offerID}, {changes}")
+            return changes
+
+    async def delete_offer(self, offer_id: str) -> bool:
+        """
+        Delete an offer from the database.
+        :param offer_id: The ID of the offer to delete.
+        :return: True if the deletion was successful, False otherwise.
+        """
+        logging.debug(f"Deleting offer with ID: {offer_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute("""DELETE FROM "ProdOfe" WHERE "OfferID" = %s;""", (offer_id,))
+            await cursor.execute("""DELETE FROM "Offers" WHERE "OfferID" = %s;""", (offer_id,))
+
+            await db_connection.commit()
+            logging.info(f"Offer with ID {offer_id} deleted")
+            return cursor.rowcount > 0
+
+    async def get_all_offers(self) -> list[Offer]:
+        """
+        Retrieve all offers from the database, including their products.
+        Headers and product lines are loaded with two queries whatever the number of offers.
+        :return: A list of offers.
+        """
+        query = """
+        SELECT *
+        FROM "Offers";
+        """
+
+        logging.debug("Retrieving all offers")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query)
+            results = await cursor.fetchall()
+
+            products = await self._get_offers_products(cursor, [row[0] for row in results])
+
+            offers = [
+                Offer(
+                    offerID=row[0],
+                    employeId=row[1],
+                    clientId=row[2],
+                    offer_date=row[3],
+                    TotalPrice=row[4],
+                    products=products.get(row[0], [])
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved all {len(offers)} offers")
+            return offers
+
+    async def get_offers_page(self, limit: Optional[int], after: Optional[str] = None, filters: Optional[DocumentFilter] = None) -> tuple[list[Offer], Optional[str]]:
+        """
+        Retrieve one page of offers, newest first, including their products.
+        :param limit: The maximum number of offers, None for every matching one.
+        :param after: The cursor of the previous page, None for the first page.
+        :param filters: The filters of the list, None for no filter.
+        :return: The offers and the cursor of the next page, None on the last page.
+        """
+        query, params = document_page_query('"Offers"', '"OfferID"', limit, after, filters)
+
+        logging.debug(f"Retrieving {limit} offers after {after} with {filters}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, params)
+            results, next_cursor = split_page(await cursor.fetchall(), limit, lambda row: (row[3], row[0]))
+
+            products = await self._get_offers_products(cursor, [row[0] for row in results])
+
+            offers = [
+                Offer(
+                    offerID=row[0],
+                    employeId=row[1],
+                    clientId=row[2],
+                    offer_date=row[3],
+                    TotalPrice=row[4],
+                    products=products.get(row[0], [])
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(offers)} offers")
+            return offers, next_cursor
+
+    async def stream_offers(self, filters: Optional[DocumentFilter] = None, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[list[Offer]]:
+        """
+        Read every matching offer, newest first, in batches through a server-side cursor,
+        only one batch and its product lines are in memory at a time.
+        :param filters: The filters of the list, None for no filter.
+        :param batch_size: The number of offers of each batch.
+        :return: The batches, closing the generator closes the cursor.
+        """
+        query, params = document_page_query('"Offers"', '"OfferID"', None, None, filters)
+
+        logging.debug(f"Streaming offers with {filters}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor(name="stream_offers") as stream, db_connection.cursor() as cursor:
+            await stream.execute(query, params)
+            while True:
+                results = await stream.fetchmany(batch_size)
+                if not results:
+                    break
+                products = await self._get_offers_products(cursor, [row[0] for row in results])
+                yield [
+                    Offer(
+                        offerID=row[0],
+                        employeId=row[1],
+                        clientId=row[2],
+                        offer_date=row[3],
+                        TotalPrice=row[4],
+                        products=products.get(row[0], [])
+                    )
+                    for row in results
+                ]
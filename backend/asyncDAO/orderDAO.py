@@ -0,0 +1,257 @@
+import logging
+
+from fastapi import HTTPException
+
+from asyncConnect import get_async_db_connection
+from asyncDAO.lineWriter import write_lines
+from asyncDAO.productDAO import AsyncProductDAO
+from DAO.order import Order
+from DAO.orderDAO import ORDER_LINES_QUERY
+from DAO.product import Product
+from documentFilter import DocumentFilter
+from pagination import STREAM_BATCH_SIZE, document_page_query, split_page
+from typing import AsyncIterator, Optional
+
+class AsyncOrderDAO:
+    def __init__(self):
+        """
+        Initialize the async OrderDAO, mirror of DAO.orderDAO.OrderDAO on psycopg3.
+        """
+        self.logger = logging.getLogger("appLogger")
+        self.product_dao = AsyncProductDAO()
+
+    async def _get_orders_products(self, cursor, order_ids: list[str]) -> dict[str, list[tuple[Product, int]]]:
+        """
+        Retrieve the product lines of several orders with one query for the lines and one for the products.
+        :return: The (product, quantity) lines of each order, keyed by order ID.
+        """
+        lines = dict[str, list[tuple[Product, int]]]()
+        if not order_ids:
+            return lines
+
+        await cursor.execute(ORDER_LINES_QUERY, (order_ids,))
+        rows = await cursor.fetchall()
+
+        products = await self.product_dao.get_products_by_ids(row[1] for row in rows)
+        for order_id, product_id, quantity in rows:
+            lines.setdefault(order_id, []).append((products[product_id], quantity))
+        return lines
+
+    async def create_order(self, order: Order) -> bool:
+        """
+        Insert a new order into the database.
+        :param order: An Order object containing order details.
+        :return: True if it was created, False if an order with the same ID already exists.
+        """
+        query = """
+        INSERT INTO "Orders" ("OrderID", "EmployeID", "ClientID", "Date", "TotalPrice")
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT ("OrderID") DO NOTHING
+        RETURNING "OrderID";
+        """
+
+        logging.debug(f"Creating order: {order}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                order.orderID,
+                order.employeId,
+                order.clientId,
+                order.date,
+                order.totalPrice
+            ))
+            if await cursor.fetchone() is None:
+                await db_connection.rollback()
+                self.logger.error(f"Order with ID {order.orderID} already exists.")
+                return False
+
+            # Insert products into ProdOrd table
+            await write_lines(cursor, "ProdOrd", order.orderID, order.products)
+
+            await db_connection.commit()
+            logging.info(f"Order created with ID: {order.orderID}")
+            return True
+
+    async def get_order_by_id(self, order_id: str) -> Order:
+        """
+        Retrieve an order by its ID, including its products.
+        :param order_id: The ID of the order.
+        :return: The order.
+        """
+        query = """
+        SELECT *
+        FROM "Orders"
+        WHERE "OrderID" = %s;
+        """
+
+        logging.debug(f"Retrieving order with ID: {order_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (order_id,))
+            result = await cursor.fetchone()
+            if result:
+                order = Order(
+                    orderID=result[0],
+                    employeId=result[1],
+                    clientId=result[2],
+                    orderDate=result[3],
+                    totalPrice=result[4],
+                    products=(await self._get_orders_products(cursor, [order_id])).get(order_id, [])
+                )
+
+                logging.info(f"Order found: {order}")
+                return order
+            else:
+                self.logger.error(f"Order with ID {order_id} not found.")
+                raise HTTPException(status_code=404, detail="Order not found")
+
+    async def update_order(self, updated_order: Order) -> bool:
+        """
+        Update an existing order in the database.
+        :param updated_order: An Order object containing updated order details.
+        :return: True if the update was successful, False otherwise.
+        """
+        query = """
+        UPDATE "Orders"
+        SET "EmployeID" = %s, "ClientID" = %s, "Date" = %s, "TotalPrice" = %s
+        WHERE "OrderID" = %s;
+        """
+        delete_query = """ DELETE FROM "ProdOrd" WHERE "OrderID" = %s; """
+
+        logging.debug(f"Updating order: {updated_order}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                updated_order.employeId,
+                updated_order.clientId,
+                updated_order.date,
+                updated_order.totalPrice,
+                updated_order.orderID
+            ))
+            updated = cursor.rowcount > 0
+
+            # Update products in ProdOrd table
+            await cursor.execute(delete_query, (updated_order.orderID,))
+            await write_lines(cursor, "ProdOrd", updated_order.orderID, updated_order.products)
+
+            await db_connection.commit()
+            logging.info(f"Order updated with ID: {updated_order.orderID}")
+            return updated
+
+    async def delete_order(self, order_id: str) -> bool:
+        """
+        Delete an order from the database.
+        :param order_id: The ID of the order to delete.
+        :return: True if the deletion was successful, False otherwise.
+        """
+        logging.debug(f"Deleting order with ID: {order_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute("""DELETE FROM "ProdOrd" WHERE "OrderID" = %s;""", (order_id,))
+            await cursor.execute("""DELETE FROM "Orders" WHERE "OrderID" = %s;""", (order_id,))
+
+            await db_connection.commit()
+            logging.info(f"Order with ID {order_id} deleted")
+            return cursor.rowcount > 0
+
+    async def get_all_orders(self) -> list[Order]:
+        """
+        Retrieve all orders from the database.
+        :return: A list of Order objects.
+        """
+        query = """
+        SELECT *
+        FROM "Orders";
+        """
+
+        logging.debug("Retrieving all orders")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query)
+            results = await cursor.fetchall()
+
+            products = await self._get_orders_products(cursor, [row[0] for row in results])
+
+            orders = list[Order]()
+            for order_id, employe_id, client_id, order_date, total_price in results:
+                orders.append(Order(
+                    orderID=order_id,
+                    employeId=employe_id,
+                    clientId=client_id,
+                    orderDate=order_date,
+                    totalPrice=total_price,
+                    products=products.get(order_id, [])
+                ))
+
+            logging.info(f"Retrieved all {len(orders)} orders")
+            return orders
+
+    async def get_orders_page(self, limit: Optional[int], after: Optional[str] = None, filters: Optional[DocumentFilter] = None) -> tuple[list[Order], Optional[str]]:
+        """
+        Retrieve one page of orders, newest first, including their products.
+        :param limit: The maximum number of orders, None for every matching one.
+        :param after: The cursor of the previous page, None for the first page.
+        :param filters: The filters of the list, None for no filter.
+        :return: The orders and the cursor of the next page, None on the last page.
+        """
+        query, params = document_page_query('"Orders"', '"OrderID"', limit, after, filters)
+
+        logging.debug(f"Retrieving {limit} orders after {after} with {filters}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, params)
+            results, next_cursor = split_page(await cursor.fetchall(), limit, lambda row: (row[3], row[0]))
+            products = await self._get_orders_products(cursor, [row[0] for row in results])
+
+            orders = [
+                Order(
+                    orderID=row[0],
+                    employeId=row[1],
+                    clientId=row[2],
+                    orderDate=row[3],
+                    totalPrice=row[4],
+                    products=products.get(row[0], [])
+                )
+                for row in results
+            ]
+
+            logging.info(f"Retrieved a page of {len(orders)} orders")
+            return orders, next_cursor
+
+    async def stream_orders(self, filters: Optional[DocumentFilter] = None, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[list[Order]]:
+        """
+        Read every matching order, newest first, in batches through a server-side cursor,
+        only one batch and its product lines are in memory at a time.
+        :param filters: The filters of the list, None for no filter.
+        :param batch_size: The number of orders of each batch.
+        :return: The batches, closing the generator closes the cursor.
+        """
+        query, params = document_page_query('"Orders"', '"OrderID"', None, None, filters)
+
+        logging.debug(f"Streaming orders with {filters}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor(name="stream_orders") as stream, db_connection.cursor() as cursor:
+            await stream.execute(query, params)
+            while True:
+                results = await stream.fetchmany(batch_size)
+                if not results:
+                    break
+                products = await self._get_orders_products(cursor, [row[0] for row in results])
+                yield [
+                    Order(
+                        orderID=row[0],
+                        employeId=row[1],
+                        clientId=row[2],
+                        orderDate=row[3],
+                        totalPrice=row[4],
+                        products=products.get(row[0], [])
+                    )
+                    for row in results
+                ]
@@ -0,0 +1,217 @@
+import logging
+from fastapi import HTTPException
+
+from asyncConnect import get_async_db_connection
+from DAO.product import Product
+from DAO.productDAO import product_from_row, invalidate_product, product_cache, catalog_cache, CATALOG_KEY
+from typing import AsyncIterator, Iterable, Optional
+from pagination import STREAM_BATCH_SIZE, id_page_query, split_page
+
+class AsyncProductDAO:
+    def __init__(self):
+        """
+        Initialize the async ProductDAO, mirror of DAO.productDAO.ProductDAO on psycopg3.
+        """
+        self.logger = logging.getLogger("appLogger")
+
+    async def create_product(self, product: Product) -> Product:
+        """
+        Insert a new product into the database.
+        :param product: A Product object containing product details.
+        :return: The newly created product.
+        """
+        query = """
+        INSERT INTO "Products" ("Name", "Description", "Stock", "MaxStock", "MinStock", "PurchasePrice", "SellPrice")
+        VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING "ProductID";
+        """
+
+        logging.debug(f"Creating product: {product}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                product.name, product.description, product.stock,
+                product.maxStock, product.minStock,
+                product.purchasePrice, product.sellPrice
+            ))
+            result = await cursor.fetchone()
+            await db_connection.commit()
+            invalidate_product()
+            if result is None:
+                self.logger.error("No product ID returned from the database.")
+                raise HTTPException(status_code=500, detail="Failed to create product.")
+
+            logging.info(f"Product created with ID: {result[0]}")
+            return product
+
+    async def get_product_by_id(self, product_id: int) -> Product:
+        """
+        Retrieve a product by its ID.
+        :param product_id: The ID of the product to retrieve.
+        """
+        product = product_cache.get(int(product_id))
+        if product is not None:
+            return product
+
+        query = """SELECT *
+                FROM "Products"
+                WHERE "ProductID" = %s;"""
+
+        logging.debug(f"Retrieving product with ID: {product_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (product_id,))
+            result = await cursor.fetchone()
+            if result:
+                logging.info(f"Product found: {result}")
+                return product_from_row(result)
+            else:
+                self.logger.error(f"Product with ID {product_id} not found.")
+                raise HTTPException(status_code=404, detail="Product not found.")
+
+    async def get_products_by_ids(self, product_ids: Iterable[int]) -> dict[int, Product]:
+        """
+        Retrieve several products with a single query.
+        :param product_ids: The IDs of the products to retrieve, duplicates are allowed.
+        :return: A dictionary of the products keyed by their ID.
+        """
+        ids = list(dict.fromkeys(int(product_id) for product_id in product_ids))
+        products = {product_id: product for product_id in ids if (product := product_cache.get(product_id)) is not None}
+        uncached = [product_id for product_id in ids if product_id not in products]
+        if not uncached:
+            return products
+
+        query = """SELECT *
+                FROM "Products"
+                WHERE "ProductID" = ANY(%s);"""
+
+        logging.debug(f"Retrieving {len(uncached)} products by ID")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (uncached,))
+            products.update((row[0], product_from_row(row)) for row in await cursor.fetchall())
+
+        missing = [product_id for product_id in ids if product_id not in products]
+        if missing:
+            self.logger.error(f"Products with IDs {missing} not found.")
+            raise HTTPException(status_code=404, detail=f"Products not found: {', '.join(map(str, missing))}")
+
+        logging.info(f"Retrieved {len(products)} products by ID")
+        return products
+
+    async def update_product(self, product: Product) -> Product:
+        """
+        Update an existing product in the database.
+        :param product: The product with its updated details.
+        :return: The updated product.
+        """
+        query = """
+        UPDATE "Products"
+        SET "Name" = %s, "Description" = %s, "Stock" = %s, "MaxStock" = %s, "MinStock" = %s, "PurchasePrice" = %s, "SellPrice" = %s
+        WHERE "ProductID" = %s;
+        """
+
+        logging.debug(f"Updating product with ID: {product.productId}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (
+                product.name, product.description, product.stock,
+                product.maxStock, product.minStock,
+                product.purchasePrice, product.sellPrice,
+                product.productId
+            ))
+            await db_connection.commit()
+            invalidate_product(product.productId)
+            if cursor.rowcount == 0:
+                self.logger.error(f"Product with ID {product.productId} not found.")
+                raise HTTPException(status_code=404, detail="Product not found.")
+
+            logging.info(f"Product with ID {product.productId} updated successfully.")
+            return product
+
+    async def delete_product(self, product_id: int) -> bool:
+        """
+        Delete a product from the database.
+        :param product_id: The ID of the product to delete.
+        :return: True if the deletion was successful.
+        """
+        query = """DELETE FROM "Products" WHERE "ProductID" = %s;"""
+
+        logging.debug(f"Deleting product with ID: {product_id}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, (product_id,))
+            await db_connection.commit()
+            invalidate_product(product_id)
+            if cursor.rowcount == 0:
+                self.logger.error(f"Product with ID {product_id} not found.")
+                raise HTTPException(status_code=404, detail="Product not found.")
+            logging.info(f"Product with ID {product_id} deleted successfully.")
+            return cursor.rowcount > 0
+
+    async def get_all_products(self) -> list[Product]:
+        """
+        Retrieve all products from the database.
+        :return: A list of Product objects.
+        """
+        products = catalog_cache.get(CATALOG_KEY)
+        if products is not None:
+            return list(products)
+
+        query = """
+                SELECT * FROM "Products"
+                """
+
+        logging.debug("Retrieving all products")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query)
+            results = await cursor.fetchall()
+
+            logging.info(f"Retrieved all {len(results)} products")
+            products = [product_from_row(row, cache=False) for row in results]
+            catalog_cache.set(CATALOG_KEY, products)
+            return list(products)
+
+    async def get_products_page(self, limit: int, after: Optional[str] = None) -> tuple[list[Product], Optional[str]]:
+        """
+        Retrieve one page of products, ordered by ID.
+        :param limit: The maximum number of products.
+        :param after: The cursor of the previous page, None for the first page.
+        :return: The products and the cursor of the next page, None on the last page.
+        """
+        query, params = id_page_query('"Products"', '"ProductID"', limit, after)
+
+        logging.debug(f"Retrieving {limit} products after {after}")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor() as cursor:
+            await cursor.execute(query, params)
+            results, next_cursor = split_page(await cursor.fetchall(), limit, lambda row: (row[0],))
+            products = [product_from_row(row, cache=False) for row in results]
+
+            logging.info(f"Retrieved a page of {len(products)} products")
+            return products, next_cursor
+
+    async def stream_products(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[list[Product]]:
+        """
+        Read every product, ordered by ID, in batches through a server-side cursor.
+        The products read are not cached.
+        :param batch_size: The number of products of each batch.
+        :return: The batches, closing the generator closes the cursor.
+        """
+        logging.debug("Streaming products")
+
+        db_connection = await get_async_db_connection()
+        async with db_connection.cursor(name="stream_products") as stream:
+            await stream.execute('SELECT * FROM "Products" ORDER BY "ProductID";')
+            while True:
+                results = await stream.fetchmany(batch_size)
+                if not results:
+                    break
+                yield [product_from_row(row, cache=False) for row in results]
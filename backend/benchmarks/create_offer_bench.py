@@ -0,0 +1,98 @@
+"""
+Latency of offer creation, DAO inserts vs the create_offer database function (migration 0002).
+
+Needs a reachable database configured like the backend (ps.env / DATABASE_* variables) with the migrations applied,
+at least one employee, one client and --lines products. The offers it creates are deleted at the end.
+
+    PYTHONPATH=backend python backend/benchmarks/create_offer_bench.py --offers 200 --lines 10
+
+Modes:
+    python      product lookup, then header and lines inserted by OfferDAO.create_offer, how the router works by default
+    function    one call to OfferDAO.create_offer_in_database (OFFER_CREATE_MODE=function)
+"""
+import argparse
+import statistics
+import sys
+import os
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from connect import db_session, close_db_pool
+from DAO.offer import Offer
+from DAO.offerDAO import OfferDAO
+from DAO.productDAO import ProductDAO, product_cache
+
+
+def _fixtures(lines: int) -> tuple[str, int, list[int]]:
+    """
+    An employee, a client and the IDs of the products the offers are made of.
+    """
+    with db_session() as connection, connection.cursor() as cursor:
+        cursor.execute('SELECT "EmployeID" FROM "Employes" LIMIT 1;')
+        employe = cursor.fetchone()
+        cursor.execute('SELECT "ClientID" FROM "Clients" LIMIT 1;')
+        client = cursor.fetchone()
+        cursor.execute('SELECT "ProductID" FROM "Products" ORDER BY "ProductID" LIMIT %s;', (lines,))
+        products = [row[0] for row in cursor.fetchall()]
+    if employe is None or client is None or len(products) < lines:
+        raise SystemExit(f"The database needs an employee, a client and {lines} products")
+    return employe[0], client[0], products
+
+
+def _run(mode: str, offers: int, employe: str, client: int, product_ids: list[int]) -> tuple[dict[str, float], list[str]]:
+    offer_dao = OfferDAO()
+    product_dao = ProductDAO()
+    lines = [(product_id, 1 + i % 5) for i, product_id in enumerate(product_ids)]
+    created = list[str]()
+    latencies = list[float]()
+
+    for _ in range(offers):
+        # The product cache would hide the lookup the python mode pays on a cold request
+        product_cache.clear()
+        start = time.perf_counter()
+        with db_session():
+            if mode == "python":
+                products = product_dao.get_products_by_ids(product_ids)
+                offer = offer_dao.create_offer(Offer(employe, str(client), [(products[product_id], quantity) for product_id, quantity in lines]))
+                created.append(offer.offerID)
+            else:
+                created.append(offer_dao.create_offer_in_database(employe, str(client), lines))
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "offers_per_s": offers / sum(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1] * 1000,
+    }, created
+
+
+def _cleanup(offer_ids: list[str]) -> None:
+    with db_session() as connection, connection.cursor() as cursor:
+        cursor.execute('DELETE FROM "ProdOfe" WHERE "OfferID" = ANY(%s);', (offer_ids,))
+        cursor.execute('DELETE FROM "Offers" WHERE "OfferID" = ANY(%s);', (offer_ids,))
+        connection.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--offers", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=["python", "function"])
+    args = parser.parse_args()
+
+    employe, client, product_ids = _fixtures(args.lines)
+    print(f"offers={args.offers} lines={args.lines}")
+    created = list[str]()
+    try:
+        for mode in args.modes:
+            result, offer_ids = _run(mode, args.offers, employe, client, product_ids)
+            created.extend(offer_ids)
+            print(f"{mode:>10}: " + "  ".join(f"{key}={value:.1f}" for key, value in result.items()))
+    finally:
+        _cleanup(created)
+        close_db_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Throughput of the DAO layer under concurrent requests, sync path vs async driver.
+
+Needs a reachable database configured like the backend (ps.env / DATABASE_* variables).
+
+    PYTHONPATH=backend python backend/benchmarks/dao_driver_bench.py --concurrency 20 --requests 400
+
+Modes:
+    blocking    sync DAO called inside the coroutine, how the routers used to work
+    threadpool  sync DAO through run_dao (runs in the threadpool)
+    async       psycopg3 DAO through run_dao
+
+Besides requests per second it reports the worst event loop lag seen by an unrelated
+coroutine, which is what other API calls experience while the DAOs are busy.
+
+The product caches are disabled (PRODUCT_CACHE_SIZE=0), otherwise every request after the
+first would read the catalog from memory and no driver would be measured.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import os
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# Read when DAO.productDAO is imported, before ps.env which does not override it
+os.environ["PRODUCT_CACHE_SIZE"] = "0"
+
+from starlette.concurrency import run_in_threadpool
+
+from connect import db_session, run_dao, close_db_pool
+from asyncConnect import async_db_session, close_async_db_pool
+from DAO.offerDAO import OfferDAO
+from DAO.productDAO import ProductDAO
+from asyncDAO.offerDAO import AsyncOfferDAO
+from asyncDAO.productDAO import AsyncProductDAO
+
+TARGETS = {
+    "products": (ProductDAO, AsyncProductDAO, "get_all_products"),
+    "offers": (OfferDAO, AsyncOfferDAO, "get_all_offers"),
+}
+
+
+async def _measure_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """
+    Tick every millisecond and record how late each tick is.
+    """
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def _run(mode: str, target: str, concurrency: int, requests: int) -> dict[str, float]:
+    sync_class, async_class, method_name = TARGETS[target]
+    sync_method = getattr(sync_class(), method_name)
+    async_method = getattr(async_class(), method_name)
+
+    def sync_request() -> None:
+        with db_session():
+            sync_method()
+
+    async def one_request() -> None:
+        if mode == "blocking":
+            sync_request()
+        elif mode == "threadpool":
+            await run_in_threadpool(sync_request)
+        else:
+            async with async_db_session():
+                await run_dao(async_method)
+
+    remaining = requests
+    latencies = list[float]()
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await one_request()
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    lags = list[float]()
+    lag_task = asyncio.create_task(_measure_lag(stop, lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await lag_task
+
+    return {
+        "requests_per_s": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1] * 1000,
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=TARGETS, default="products")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--modes", nargs="+", default=["blocking", "threadpool", "async"])
+    args = parser.parse_args()
+
+    print(f"target={args.target} concurrency={args.concurrency} requests={args.requests}")
+    for mode in args.modes:
+        result = await _run(mode, args.target, args.concurrency, args.requests)
+        print(f"{mode:>10}: " + "  ".join(f"{key}={value:.1f}" for key, value in result.items()))
+
+    close_db_pool()
+    await close_async_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
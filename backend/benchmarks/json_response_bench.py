@@ -0,0 +1,107 @@
+"""
+Time to serialize list responses, FastAPI's default path vs orjson vs the trusted responses of the list routes.
+
+Runs in memory, no database needed. The lists are built like the DAOs build them.
+
+    PYTHONPATH=backend python backend/benchmarks/json_response_bench.py --rows 10000
+
+Modes:
+    default     response_model validation and serialization, then JSONResponse (json module), how the routes used to work
+    orjson      the same validation, rendered by the ORJSONResponse default class (needs orjson)
+    trusted     trusted_json_response, no validation, pydantic-core writes the bytes, what the list routes return now
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import os
+import time
+from datetime import date
+from typing import Any, Callable
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from jsonResponse import trusted_json_response
+from DAO.offer import OfferModel, ProductInOffer
+from DAO.product import Product
+
+
+def _offers(rows: int, lines: int) -> list[OfferModel]:
+    return [
+        OfferModel(
+            offerID=f"of-{i:06d}",
+            employeID="108234567890123456789",
+            employeName="John Doe",
+            clientID=str(i % 100),
+            clientName=f"Company {i % 100}",
+            date=date(2025, 1, 1 + i % 28),
+            totalPrice=float(i),
+            products=[ProductInOffer(id=j, name=f"Product {j}", quantity=1 + j % 5) for j in range(lines)]
+        )
+        for i in range(rows)
+    ]
+
+
+def _products(rows: int) -> list[dict[str, str]]:
+    return [
+        Product(productId=i, name=f"Product {i}", description=f"Description of product {i}", stock=100, minStock=10,
+                maxStock=500, purchasePrice=5.5, sellPrice=10.25).get_product_JSON()
+        for i in range(rows)
+    ]
+
+
+def _fastapi(content: Any, content_type: Any, response_class: type[JSONResponse]) -> Callable[[], bytes]:
+    # The response field FastAPI builds from the return annotation of a route
+    field = create_model_field(name="Response", type_=content_type, mode="serialization")
+
+    def render() -> bytes:
+        serialized = asyncio.run(serialize_response(field=field, response_content=content))
+        return response_class(serialized).body
+    return render
+
+
+def _time(render: Callable[[], bytes], repeat: int) -> dict[str, float]:
+    times = list[float]()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = render()
+        times.append(time.perf_counter() - start)
+    return {"median_ms": statistics.median(times) * 1000, "min_ms": min(times) * 1000, "MB": len(body) / 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--lines", type=int, default=5, help="product lines of every offer")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    lists = {
+        "offers": (_offers(args.rows, args.lines), list[OfferModel]),
+        "products": (_products(args.rows), list[dict[str, str]]),
+    }
+    try:
+        import orjson  # noqa: F401
+        has_orjson = True
+    except ImportError:
+        has_orjson = False
+
+    print(f"rows={args.rows} lines={args.lines}")
+    for name, (content, content_type) in lists.items():
+        modes = {"default": _fastapi(content, content_type, JSONResponse)}
+        if has_orjson:
+            modes["orjson"] = _fastapi(content, content_type, ORJSONResponse)
+        modes["trusted"] = lambda: trusted_json_response(content, content_type).body
+        for mode, render in modes.items():
+            result = _time(render, args.repeat)
+            print(f"{name:>9} {mode:>8}: " + "  ".join(f"{key}={value:.1f}" for key, value in result.items()))
+        if not has_orjson:
+            print(f"{name:>9}   orjson: skipped, orjson is not installed")
+
+
+if __name__ == "__main__":
+    main()
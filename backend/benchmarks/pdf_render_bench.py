@@ -0,0 +1,90 @@
+"""
+CPU time of a document PDF render, setup per call vs the shared engine.
+
+Runs in memory, no database needed.
+
+    PYTHONPATH=backend python backend/benchmarks/pdf_render_bench.py --renders 200 --lines 10
+
+Modes:
+    per-call    a DocumentPDFEngine per render: stylesheet, logo read from disk and table styles built every time,
+                what the four pdf modules used to do
+    shared      the engine built once at startup, what the PDF routes use now
+
+Scaling with the length of the product table, which flows over as many pages as needed:
+
+    PYTHONPATH=backend python backend/benchmarks/pdf_render_bench.py --scaling 250,500,1000,2000 --renders 5
+"""
+import argparse
+import statistics
+import sys
+import os
+import time
+from datetime import date
+from typing import Callable
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from pdf.documentPDF import DocumentPDFEngine, PDFDocument, PDFLine, render_document_pdf
+
+
+def _document(lines: int) -> PDFDocument:
+    return PDFDocument(
+        documentType="invoice",
+        documentID="inv-000001",
+        date=date(2025, 5, 1),
+        employeName="John Doe",
+        clientName="Test Company",
+        clientAddress="Main Street 1",
+        clientPhone="600000000",
+        totalPrice=10.25 * lines,
+        lines=[PDFLine(productId=i, name=f"Product {i}", description=f"Description of product {i}", quantity=1 + i % 5,
+                       unitPrice=10.25) for i in range(lines)]
+    )
+
+
+def _run(render: Callable[[PDFDocument], bytes], document: PDFDocument, renders: int) -> dict[str, float]:
+    # process_time, the render is CPU-bound
+    times = list[float]()
+    for _ in range(renders):
+        start = time.process_time()
+        render(document)
+        times.append(time.process_time() - start)
+    return {
+        "renders_per_s": renders / sum(times),
+        "p50_ms": statistics.median(times) * 1000,
+        "p95_ms": statistics.quantiles(times, n=20)[-1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=10)
+    parser.add_argument("--scaling", type=str, default=None, help="comma separated line counts, shared engine only")
+    args = parser.parse_args()
+
+    if args.scaling:
+        render_document_pdf(_document(1))
+        print(f"renders={args.renders}")
+        for lines in [int(lines) for lines in args.scaling.split(",")]:
+            result = _run(render_document_pdf, _document(lines), args.renders)
+            pages = render_document_pdf(_document(lines)).count(b"/Type /Page\n")
+            print(f"lines={lines:>6} pages={pages:>4}: p50_ms={result['p50_ms']:.1f}  "
+                  f"us_per_line={result['p50_ms'] * 1000 / lines:.1f}")
+        return
+
+    document = _document(args.lines)
+    modes = {
+        "per-call": lambda document: DocumentPDFEngine().render(document),
+        "shared": render_document_pdf,
+    }
+    print(f"renders={args.renders} lines={args.lines}")
+    for mode, render in modes.items():
+        # Warm up, the first render loads the fonts
+        render(document)
+        result = _run(render, document, args.renders)
+        print(f"{mode:>10}: " + "  ".join(f"{key}={value:.1f}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
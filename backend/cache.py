@@ -0,0 +1,159 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+logger = logging.getLogger("appLogger")
+
+env_path = os.path.join(os.path.dirname(__file__), "../ps.env")
+
+# Every cache of the process, by name, so /metrics can report them
+_caches = dict[str, "TTLCache"]()
+
+
+def load_cache_env(prefix: str, default_size: int, default_ttl: float) -> tuple[int, float]:
+    """
+    Load the size and TTL of a cache from the environment.
+    :param prefix: Prefix of the variables, e.g. PRODUCT_CACHE reads PRODUCT_CACHE_SIZE and PRODUCT_CACHE_TTL.
+    :param default_size: Size used when the variable is not set, 0 disables the cache.
+    :param default_ttl: TTL in seconds used when the variable is not set.
+    :return: The size and TTL.
+    """
+    load_dotenv(env_path)
+
+    size = int(os.getenv(f"{prefix}_SIZE", default_size))
+    ttl = float(os.getenv(f"{prefix}_TTL", default_ttl))
+    return size, ttl
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread safe in-memory cache bounded by size (least recently used entries are evicted first)
+    and by age of the entries.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Create a cache and register it for the metrics.
+        :param name: Name of the cache in the metrics.
+        :param max_size: Maximum number of entries, 0 disables the cache.
+        :param ttl: Default lifetime of an entry in seconds.
+        :param clock: Monotonic clock, replaceable in tests.
+        """
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+
+        self._entries = OrderedDict[K, tuple[float, V]]()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+        _caches[name] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Get a value from the cache.
+        :param key: The key of the value.
+        :return: The value, or None when it is not cached or has expired.
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entries if the cache is full.
+        :param key: The key of the value.
+        :param value: The value.
+        :param ttl: Lifetime of this entry in seconds, the cache TTL when not given.
+        """
+        if not self.enabled:
+            return
+
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """
+        Remove a value from the cache.
+        :param key: The key of the value.
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        """
+        Remove every value from the cache.
+        """
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the counters of the cache.
+        :return: A dictionary with the size and hit/miss/eviction counters.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+
+def get_cache_stats() -> dict[str, dict[str, float]]:
+    """
+    Get the counters of every cache of the process.
+    :return: The statistics of each cache, keyed by cache name.
+    """
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,193 @@
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from google.auth import exceptions, jwt
+from google.auth.transport import requests as google_requests
+
+logger = logging.getLogger("appLogger")
+
+# Endpoint used by google.oauth2.id_token.verify_oauth2_token, {key id: x509 certificate}
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class CertificateStore:
+    """
+    Local copy of the keys Google signs ID tokens with.
+
+    The keys are fetched once and kept for the max-age of the Cache-Control header of the response.
+    Shortly before they expire they are refreshed in a background thread, so token verification
+    is local CPU work. The source can be a URL or a local JSON file with the same {key id: certificate}
+    format, which is how tests run offline.
+    """
+
+    def __init__(self, source: str = GOOGLE_CERTS_URL, default_max_age: float = 3600.0, refresh_margin: float = 300.0,
+                 min_refresh_interval: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Create a store, nothing is fetched until the first verification.
+        :param source: URL or path of a JSON file with the certificates.
+        :param default_max_age: Lifetime of the certificates when the source gives none.
+        :param refresh_margin: Seconds before the expiration when the background refresh starts.
+        :param min_refresh_interval: Minimum seconds between two refreshes forced by an unknown key ID.
+        :param clock: Monotonic clock, replaceable in tests.
+        """
+        self.source = source
+        self.default_max_age = default_max_age
+        self.refresh_margin = refresh_margin
+        self.min_refresh_interval = min_refresh_interval
+        self._clock = clock
+
+        self._certs = dict[str, str]()
+        self._fetched_at = 0.0
+        self._refresh_at = 0.0
+        self._expires_at = 0.0
+
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._request: Optional[google_requests.Request] = None
+
+        self._fetches = 0
+        self._failures = 0
+        self._background_refreshes = 0
+
+    def _fetch(self) -> tuple[dict[str, str], float]:
+        """
+        Read the certificates from the source.
+        :return: The certificates by key ID and their lifetime in seconds.
+        """
+        if not self.source.startswith(("http://", "https://")):
+            path = self.source.removeprefix("file://")
+            with open(path, encoding="utf-8") as file:
+                return json.load(file), self.default_max_age
+
+        if self._request is None:
+            # One transport for the life of the store, its session keeps the connection open
+            self._request = google_requests.Request()
+
+        response = self._request(url=self.source, method="GET")
+        if response.status != 200:
+            raise exceptions.TransportError(f"Could not fetch certificates at {self.source}: {response.status}")
+
+        max_age = self.default_max_age
+        match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+        if match:
+            max_age = float(match.group(1)) - float(response.headers.get("Age", 0))
+        return json.loads(response.data.decode("utf-8")), max_age
+
+    def refresh(self) -> dict[str, str]:
+        """
+        Fetch the certificates now.
+        If the fetch fails, the certificates already loaded are kept and the error is raised.
+        :return: The certificates by key ID.
+        """
+        try:
+            certs, max_age = self._fetch()
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+            logger.error(f"Failed to refresh certificates from {self.source}: {e}")
+            raise
+
+        now = self._clock()
+        with self._lock:
+            self._certs = certs
+            self._fetches += 1
+            self._fetched_at = now
+            self._expires_at = now + max_age
+            self._refresh_at = now + max(max_age - self.refresh_margin, max_age / 2)
+
+        logger.info(f"Loaded {len(certs)} certificates, valid for {max_age:.0f} s")
+        return certs
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+            with self._lock:
+                self._background_refreshes += 1
+        except Exception:
+            # Already logged, the current certificates stay until they expire
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def get_certs(self) -> dict[str, str]:
+        """
+        Get the current certificates, fetching them only when there are none or they have expired.
+        :return: The certificates by key ID.
+        """
+        now = self._clock()
+        with self._lock:
+            certs = self._certs
+            expired = not certs or now >= self._expires_at
+            start_refresh = not expired and now >= self._refresh_at and not self._refreshing
+            if start_refresh:
+                self._refreshing = True
+
+        if expired:
+            try:
+                return self.refresh()
+            except Exception:
+                if not certs:
+                    raise
+                # Better an old key than rejecting every request
+                logger.warning("Using expired certificates")
+                return certs
+
+        if start_refresh:
+            threading.Thread(target=self._refresh_in_background, name="certificate-refresh", daemon=True).start()
+        return certs
+
+    def _certs_for(self, token: str) -> dict[str, str]:
+        """
+        Get the certificates for a token, refreshing once if it is signed with an unknown key.
+        """
+        certs = self.get_certs()
+        kid = jwt.decode_header(token).get("kid")
+        if kid is None or kid in certs:
+            return certs
+
+        with self._lock:
+            recently_fetched = self._clock() - self._fetched_at < self.min_refresh_interval
+        if recently_fetched:
+            return certs
+
+        # Google rotated its keys before our copy expired
+        logger.info(f"Unknown key ID {kid}, refreshing certificates")
+        return self.refresh()
+
+    def verify(self, token: str, audience: Optional[str]) -> dict[str, Any]:
+        """
+        Verify a Google ID token with the local certificates, like google.oauth2.id_token.verify_oauth2_token.
+        :param token: The token.
+        :param audience: The client ID the token must be issued for.
+        :return: The claims of the token.
+        :raises ValueError: If the token is invalid or expired.
+        :raises exceptions.GoogleAuthError: If the issuer is not Google.
+        """
+        claims = jwt.decode(token, certs=self._certs_for(token), audience=audience)
+
+        if claims["iss"] not in GOOGLE_ISSUERS:
+            raise exceptions.GoogleAuthError(f"Wrong issuer. 'iss' should be one of the following: {GOOGLE_ISSUERS}")
+        return claims
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the counters of the store.
+        :return: A dictionary with the number of keys, fetches and seconds left before they expire.
+        """
+        now = self._clock()
+        with self._lock:
+            return {
+                "keys": len(self._certs),
+                "fetches": self._fetches,
+                "failures": self._failures,
+                "background_refreshes": self._background_refreshes,
+                "expires_in": max(self._expires_at - now, 0.0),
+            }
@@ -1,14 +1,22 @@
 import psycopg2
 import os
+import inspect
+import threading
+import time
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from dotenv import load_dotenv
 
-from typing import Optional
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
 import psycopg2.extensions
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
 
 env_path = os.path.join(os.path.dirname(__file__), "../ps.env")
 load_dotenv(env_path)
 
-    
+
 def load_database_env() -> list[str]:
     DATABASE = os.getenv("DATABASE_NAME")
     if not DATABASE:
@@ -24,31 +32,266 @@ def load_database_env() -> list[str]:
         raise ValueError("DATABASE_HOST environment variable not set")
     return [DATABASE, USER, PASSWORD, HOST]
 
-class DatabaseConnection:
-    _instance: Optional[psycopg2.extensions.connection] = None
+def use_async_driver() -> bool:
+    """
+    True when DATABASE_DRIVER=async, the routers then use the psycopg3 DAOs of asyncDAO.
+    """
+    return os.getenv("DATABASE_DRIVER", "sync").lower() == "async"
+
+def load_pool_env() -> tuple[int, int, float]:
+    """
+    Read the pool sizing from the environment.
+    :return: (min size, max size, checkout timeout in seconds)
+    """
+    min_size = int(os.getenv("DATABASE_POOL_MIN", "1"))
+    max_size = int(os.getenv("DATABASE_POOL_MAX", "10"))
+    timeout = float(os.getenv("DATABASE_POOL_TIMEOUT", "5"))
+    if min_size < 0 or max_size < 1 or min_size > max_size:
+        raise ValueError("DATABASE_POOL_MIN/DATABASE_POOL_MAX must satisfy 0 <= min <= max and max >= 1")
+    return min_size, max_size, timeout
+
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when no connection could be checked out before the timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    Thread safe psycopg2 pool with a bounded checkout wait and usage statistics.
+    """
+
+    def __init__(self, min_size: int, max_size: int, timeout: float, **connect_kwargs: str):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self._connect_kwargs = connect_kwargs
+
+        # Returned connections are kept for the next checkout, up to max_size.
+        # psycopg2's ThreadedConnectionPool would close every one above minconn and reconnect on the next request.
+        self._idle = list[psycopg2.extensions.connection]()
+        for _ in range(min_size):
+            self._idle.append(psycopg2.connect(**connect_kwargs))
+        # A slot per open connection, idle or checked out, callers wait for a free one
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def getconn(self) -> psycopg2.extensions.connection:
+        """
+        Check out a connection, waiting up to the pool timeout for a free one.
+        :return: A connection owned by the caller until putconn is called.
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._timeouts += 1
+            logging.error(f"No database connection available after {self.timeout}s")
+            raise PoolTimeoutError(f"No database connection available after {self.timeout}s")
+
+        try:
+            connection = self._take_idle()
+            if connection is None:
+                # Opened on demand, outside the lock
+                connection = psycopg2.connect(**self._connect_kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return connection
+
+    def _take_idle(self) -> Optional[psycopg2.extensions.connection]:
+        with self._lock:
+            while self._idle:
+                connection = self._idle.pop()
+                # Closed while idle (server restart), dropped and replaced by a new one
+                if not connection.closed:
+                    return connection
+        return None
+
+    def putconn(self, connection: psycopg2.extensions.connection) -> None:
+        """
+        Return a connection to the pool, rolling back any transaction left open.
+        :param connection: A connection obtained from getconn.
+        """
+        try:
+            broken = bool(connection.closed)
+            if not broken and connection.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    broken = True
+            with self._lock:
+                keep = not broken and not self._closed
+                if keep:
+                    self._idle.append(connection)
+            if not keep and not connection.closed:
+                connection.close()
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def closeall(self) -> None:
+        """
+        Close every idle connection of the pool, the ones checked out are closed when they are returned.
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, list[psycopg2.extensions.connection]()
+        for connection in idle:
+            connection.close()
+
+    def stats(self) -> dict[str, float]:
+        """
+        Occupancy and wait-time statistics of the pool.
+        """
+        with self._lock:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "wait_time_total_ms": round(self._wait_total * 1000, 3),
+                "wait_time_max_ms": round(self._wait_max * 1000, 3),
+                "wait_time_avg_ms": round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+            }
+
+
+class DatabasePool:
+    _instance: Optional[ConnectionPool] = None
+    _lock = threading.Lock()
 
     @classmethod
-    def get_instance(cls) -> psycopg2.extensions.connection:
-
-        DATABASE, USER, PASSWORD, HOST = load_database_env()
-
-        if cls._instance is None:
-            cls._instance = psycopg2.connect(
-                dbname=DATABASE,
-                user=USER,
-                password=PASSWORD,
-                host=HOST
-            )
-        return cls._instance
-    
+    def get_instance(cls) -> ConnectionPool:
+
+        with cls._lock:
+            if cls._instance is None:
+                DATABASE, USER, PASSWORD, HOST = load_database_env()
+                min_size, max_size, timeout = load_pool_env()
+
+                cls._instance = ConnectionPool(
+                    min_size,
+                    max_size,
+                    timeout,
+                    dbname=DATABASE,
+                    user=USER,
+                    password=PASSWORD,
+                    host=HOST
+                )
+                logging.info(f"Database pool opened (min={min_size}, max={max_size}, timeout={timeout}s)")
+            return cls._instance
+
     @classmethod
     def close_instance(cls) -> None:
-        if cls._instance is not None:
-            cls._instance.close()
-            cls._instance = None
+        with cls._lock:
+            if cls._instance is not None:
+                cls._instance.closeall()
+                cls._instance = None
+
+
+class RequestConnection:
+    """
+    Connection owned by one request (or session), checked out on first use.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self.connection: Optional[psycopg2.extensions.connection] = None
+
+    def get(self) -> psycopg2.extensions.connection:
+        if self.connection is None:
+            self.connection = self.pool.getconn()
+        return self.connection
+
+    def release(self) -> None:
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            self.pool.putconn(connection)
+
+
+_request_connection: ContextVar[Optional[RequestConnection]] = ContextVar("request_connection", default=None)
+
+
+async def get_db() -> AsyncIterator[None]:
+    """
+    FastAPI dependency that gives every request its own pooled connection.
+    The connection is checked out the first time a DAO needs it and returned when the request ends.
+    """
+    async with bind_db_connection():
+        yield
+
+
+@asynccontextmanager
+async def bind_db_connection() -> AsyncIterator[None]:
+    """
+    Bind a pooled connection, checked out on first use, to the current context until the block ends.
+    Besides get_db, streamed responses use it: their body is sent after the request dependencies are closed.
+    """
+    holder = RequestConnection(DatabasePool.get_instance())
+    token = _request_connection.set(holder)
+    try:
+        yield
+    finally:
+        _request_connection.reset(token)
+        await run_in_threadpool(holder.release)
+
+
+@contextmanager
+def db_session() -> Iterator[psycopg2.extensions.connection]:
+    """
+    Bind a pooled connection to the current context outside of a request (scripts, benchmarks, startup).
+    """
+    holder = RequestConnection(DatabasePool.get_instance())
+    token = _request_connection.set(holder)
+    try:
+        yield holder.get()
+    finally:
+        _request_connection.reset(token)
+        holder.release()
+
 
 def get_db_connection() -> psycopg2.extensions.connection:
-    return DatabaseConnection.get_instance()
+    """
+    Connection bound to the current request or session.
+    """
+    holder = _request_connection.get()
+    if holder is None:
+        raise RuntimeError("No database connection bound, use the get_db dependency or db_session()")
+    try:
+        return holder.get()
+    except PoolTimeoutError:
+        raise HTTPException(status_code=503, detail="Database busy, try again later")
+
+def get_pool_stats() -> dict[str, float]:
+    return DatabasePool.get_instance().stats()
+
+def open_db_pool() -> None:
+    DatabasePool.get_instance()
+
+def close_db_pool() -> None:
+    DatabasePool.close_instance()
 
-def close_db_connection() -> None:
-    DatabaseConnection.close_instance()
+async def run_dao(method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Call a DAO method from a request handler without blocking the event loop.
+    Async DAO methods are awaited, sync ones run in the threadpool with the request connection still bound.
+    """
+    if inspect.iscoroutinefunction(method):
+        return await method(*args, **kwargs)
+    return await run_in_threadpool(method, *args, **kwargs)
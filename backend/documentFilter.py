@@ -0,0 +1,61 @@
+from datetime import date
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+
+class DocumentFilter(BaseModel):
+    """
+    Filters of the offer, order, delivery note and invoice lists, a field left to None is not applied.
+    The four document tables share the "ClientID", "EmployeID", "Date" and "TotalPrice" columns.
+    """
+    clientID: Optional[int] = None
+    employeID: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    min_totalPrice: Optional[float] = None
+    max_totalPrice: Optional[float] = None
+
+    def is_empty(self) -> bool:
+        """
+        True when no filter is set.
+        """
+        return all(value is None for value in self.model_dump().values())
+
+    def check(self) -> None:
+        """
+        Reject empty ranges before they reach the database.
+        :raises HTTPException: 400 if a lower bound is greater than its upper bound.
+        """
+        if self.date_from is not None and self.date_to is not None and self.date_from > self.date_to:
+            raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+        if self.min_totalPrice is not None and self.max_totalPrice is not None and self.min_totalPrice > self.max_totalPrice:
+            raise HTTPException(status_code=400, detail="min_totalPrice must not be greater than max_totalPrice")
+
+    def clauses(self) -> tuple[list[str], list[Any]]:
+        """
+        Translate the filters into parameterized conditions, values are never formatted into the SQL.
+        :return: The conditions, to be joined with AND, and their parameters in order.
+        """
+        clauses = list[str]()
+        params = list[Any]()
+        if self.clientID is not None:
+            clauses.append('"ClientID" = %s')
+            params.append(self.clientID)
+        if self.employeID is not None:
+            clauses.append('"EmployeID" = %s')
+            params.append(self.employeID)
+        if self.date_from is not None:
+            clauses.append('"Date" >= %s')
+            params.append(self.date_from)
+        if self.date_to is not None:
+            clauses.append('"Date" <= %s')
+            params.append(self.date_to)
+        if self.min_totalPrice is not None:
+            clauses.append('"TotalPrice" >= %s')
+            params.append(self.min_totalPrice)
+        if self.max_totalPrice is not None:
+            clauses.append('"TotalPrice" <= %s')
+            params.append(self.max_totalPrice)
+        return clauses, params
@@ -0,0 +1,38 @@
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+# Default response class of the app, the JSON of the routes is rendered by orjson instead of the json module
+DefaultResponse = ORJSONResponse
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Serializers by content type, built once
+_adapters = dict[Any, TypeAdapter]()
+
+
+def _adapter(content_type: Any) -> TypeAdapter:
+    adapter = _adapters.get(content_type)
+    if adapter is None:
+        adapter = _adapters[content_type] = TypeAdapter(content_type)
+    return adapter
+
+
+def trusted_json_response(content: Any, content_type: Any, response: Optional[Response] = None) -> Response:
+    """
+    Send content built by the DAOs, already of the response model type, without validating it again.
+    A route returning it skips the response_model validation and the jsonable_encoder pass of FastAPI,
+    pydantic-core writes the JSON bytes in one go.
+    :param content: The models or dicts to send.
+    :param content_type: Their type, the return annotation of the route, for example list[OfferModel].
+    :param response: The response of the route, the headers set on it (the cursor of the next page) are kept.
+    :return: The response.
+    """
+    json_response = Response(_adapter(content_type).dump_json(content), media_type=JSON_MEDIA_TYPE)
+    if response is not None:
+        for name, value in response.headers.items():
+            if name != "content-length":
+                json_response.headers[name] = value
+    return json_response
@@ -1,9 +1,16 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 import logging
 import os
 
-from connect import get_db_connection, close_db_connection
+from connect import get_db, open_db_pool, close_db_pool, use_async_driver
+from asyncConnect import get_async_db, open_async_db_pool, close_async_db_pool
+from nameLoader import name_loader_scope
+from pdf.renderPool import close_render_pool
+from pagination import NEXT_CURSOR_HEADER
+from jsonResponse import DefaultResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
@@ -14,12 +21,24 @@ import routers.offer as offer
 import routers.order as order
 import routers.deliveryNote as deliveryNote
 import routers.invoice as invoice
+import routers.metrics as metrics
 
 env_path = os.path.join(os.path.dirname(__file__), "../ps.env")
 load_dotenv(env_path)
 PORT = os.getenv("PORT")
 FRONTEND_URL = os.getenv("FRONTEND_URL")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # open the async pool in the server event loop, before the first request
+    if use_async_driver():
+        await open_async_db_pool()
+    yield
+    # the async pool lives in the server event loop, close it before the loop stops
+    await close_async_db_pool()
+    # stop the PDF worker processes
+    close_render_pool()
+
 #TODO: change prints with logger (branch database)
 if __name__ == "__main__":
 
@@ -28,12 +47,16 @@ if __name__ == "__main__":
     logger = logging.getLogger("appLogger")
     logger.setLevel(logging.DEBUG)
     
-    #open database connection
-    connector = get_db_connection()
-    logging.info("Database connection opened")
+    #open database pool
+    open_db_pool()
+    logging.info("Database pool opened")
 
-    #get app instance
-    app = FastAPI()
+    #get app instance, every request gets its own pooled connection and name loader
+    dependencies = [Depends(get_db), Depends(name_loader_scope)]
+    if use_async_driver():
+        dependencies.append(Depends(get_async_db))
+        logging.info("Routers use the async database driver")
+    app = FastAPI(dependencies=dependencies, lifespan=lifespan, default_response_class=DefaultResponse)
     logging.info("FastAPI app instance created")
     
     if FRONTEND_URL is None:
@@ -46,6 +69,7 @@ if __name__ == "__main__":
         allow_credentials=True,
         allow_methods=["*"],  # Allow all HTTP methods
         allow_headers=["*"],  # Allow all headers
+        expose_headers=[NEXT_CURSOR_HEADER],  # cursor of the next page of the list endpoints
     )
     
     app.include_router(user.router, prefix="/user", tags=["user"])
@@ -55,6 +79,7 @@ if __name__ == "__main__":
     app.include_router(order.router, prefix="/order", tags=["order"])
     app.include_router(deliveryNote.router, prefix="/deliverynote", tags=["deliveryNote"])
     app.include_router(invoice.router, prefix="/invoice", tags=["invoice"])
+    app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
     logging.info("Routers included in FastAPI app")
     
     #change PORT to int
@@ -67,5 +92,5 @@ if __name__ == "__main__":
     #start the server
     uvicorn.run(app, host="0.0.0.0", port=int(PORT))
     
-    #close database connection
-    close_db_connection()
\ No newline at end of file
+    #close database pool
+    close_db_pool()
\ No newline at end of file
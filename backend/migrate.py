@@ -0,0 +1,52 @@
+"""
+Apply the schema migrations of backend/migrations to the database configured for the backend (ps.env / DATABASE_*).
+
+    python backend/migrate.py status
+    python backend/migrate.py apply [--to VERSION]
+
+Applied migrations are recorded in the schema_version table. Scripts with CONCURRENTLY operations
+run outside a transaction, so indexes are built without blocking writes.
+"""
+import argparse
+import logging
+import os
+import sys
+
+import psycopg2
+
+from connect import load_database_env
+from migrations.runner import MigrationError, MigrationRunner
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Database schema migrations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status", help="list the migrations and whether they are applied")
+    apply_parser = subparsers.add_parser("apply", help="apply the pending migrations")
+    apply_parser.add_argument("--to", type=int, default=None, help="last version to apply")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("appLogger").setLevel(logging.INFO)
+
+    DATABASE, USER, PASSWORD, HOST = load_database_env()
+    connection = psycopg2.connect(dbname=DATABASE, user=USER, password=PASSWORD, host=HOST)
+    try:
+        runner = MigrationRunner(connection, lock_timeout=os.getenv("MIGRATION_LOCK_TIMEOUT", "5s"))
+        if args.command == "status":
+            for migration, applied in runner.status():
+                mode = "" if migration.transactional else " (no transaction)"
+                print(f"{'applied' if applied else 'pending'}  {migration.version:04d}_{migration.name}{mode}")
+        else:
+            applied = runner.migrate(args.to)
+            print(f"{len(applied)} migrations applied" if applied else "Database schema is up to date")
+    except MigrationError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,23 @@
+-- Indexes for the document lookups of the DAOs.
+-- CONCURRENTLY builds them without locking writes, the runner applies the script outside a transaction.
+
+-- The line tables are read by document ID, but their primary keys lead with "ProductID".
+-- "ProdOfe" already has "fki_offerID".
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "ProdOrd_OrderID_idx" ON public."ProdOrd" USING btree ("OrderID");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "ProdDn_DeliveryNoteID_idx" ON public."ProdDn" USING btree ("DeliveryNoteID");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "ProdInv_InvoiceID_idx" ON public."ProdInv" USING btree ("InvoiceID");
+
+-- Document lists are ordered by ("Date", ID) descending, a backward index scan serves every page.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Offers_Date_idx" ON public."Offers" USING btree ("Date", "OfferID");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Orders_Date_idx" ON public."Orders" USING btree ("Date", "OrderID");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "DeliveryNotes_Date_idx" ON public."DeliveryNotes" USING btree ("Date", "DeliveryNoteID");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Invoices_Date_idx" ON public."Invoices" USING btree ("Date", "InvoiceID");
+
+-- Lists filtered by client or employee, already in page order.
+-- "Orders" keeps "fki_ClientID" and "fki_EmployeID".
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Offers_ClientID_Date_idx" ON public."Offers" USING btree ("ClientID", "Date", "OfferID");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Offers_EmployeID_Date_idx" ON public."Offers" USING btree ("EmployeID", "Date", "OfferID");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "DeliveryNotes_ClientID_Date_idx" ON public."DeliveryNotes" USING btree ("ClientID", "Date", "DeliveryNoteID");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "DeliveryNotes_EmployeID_Date_idx" ON public."DeliveryNotes" USING btree ("EmployeID", "Date", "DeliveryNoteID");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Invoices_ClientID_Date_idx" ON public."Invoices" USING btree ("ClientID", "Date", "InvoiceID");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "Invoices_EmployeID_Date_idx" ON public."Invoices" USING btree ("EmployeID", "Date", "InvoiceID");
@@ -0,0 +1,55 @@
+-- Create an offer in one round trip: the header and its lines are inserted by the database, which also checks the
+-- products and prices the lines with "Products"."SellPrice".
+-- p_lines is a JSON array of {"id": product ID, "quantity": units}, a product listed twice gets the sum of its
+-- quantities because "ProdOfe" holds one row per product.
+-- Errors: 22023 (invalid_parameter_value) for an empty list or a quantity below 1, P0002 (no_data_found) with the
+-- IDs of unknown products in the DETAIL.
+-- Returns the new "OfferID", generated by the set_offer_id trigger.
+CREATE OR REPLACE FUNCTION public.create_offer(p_employe character varying, p_client integer, p_lines jsonb,
+                                               p_date date DEFAULT CURRENT_DATE)
+    RETURNS character varying
+    LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_offer_id character varying;
+    v_products integer[];
+    v_quantities integer[];
+    v_missing integer[];
+    v_total numeric;
+BEGIN
+    IF p_lines IS NULL OR jsonb_typeof(p_lines) <> 'array' OR jsonb_array_length(p_lines) = 0 THEN
+        RAISE EXCEPTION 'At least one product is required' USING ERRCODE = 'invalid_parameter_value';
+    END IF;
+
+    SELECT array_agg(l.id ORDER BY l.id), array_agg(l.quantity ORDER BY l.id) INTO v_products, v_quantities
+    FROM (
+        SELECT r.id, sum(r.quantity)::integer AS quantity
+        FROM jsonb_to_recordset(p_lines) AS r(id integer, quantity integer)
+        GROUP BY r.id
+    ) l;
+
+    IF EXISTS (SELECT 1 FROM unnest(v_products, v_quantities) AS l(id, quantity)
+               WHERE l.id IS NULL OR l.quantity IS NULL OR l.quantity <= 0) THEN
+        RAISE EXCEPTION 'Product quantity must be greater than 0' USING ERRCODE = 'invalid_parameter_value';
+    END IF;
+
+    SELECT array_agg(l.id ORDER BY l.id) FILTER (WHERE p."ProductID" IS NULL), sum(p."SellPrice" * l.quantity)
+    INTO v_missing, v_total
+    FROM unnest(v_products, v_quantities) AS l(id, quantity)
+    LEFT JOIN public."Products" p ON p."ProductID" = l.id;
+
+    IF v_missing IS NOT NULL THEN
+        RAISE EXCEPTION 'Product not found' USING ERRCODE = 'no_data_found', DETAIL = array_to_string(v_missing, ',');
+    END IF;
+
+    INSERT INTO public."Offers" ("EmployeID", "ClientID", "Date", "TotalPrice")
+    VALUES (p_employe, p_client, p_date, v_total)
+    RETURNING "OfferID" INTO v_offer_id;
+
+    INSERT INTO public."ProdOfe" ("OfferID", "ProductID", "Quantity")
+    SELECT v_offer_id, l.id, l.quantity
+    FROM unnest(v_products, v_quantities) AS l(id, quantity);
+
+    RETURN v_offer_id;
+END;
+$$;
@@ -0,0 +1,253 @@
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import Optional
+
+import psycopg2.extensions
+
+logger = logging.getLogger("appLogger")
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+# NNNN_description.sql, applied in the order of NNNN
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+# Statements PostgreSQL refuses to run inside a transaction block
+_NON_TRANSACTIONAL = re.compile(r"\bCONCURRENTLY\b", re.IGNORECASE)
+_CONCURRENT_INDEX = re.compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+("[^"]+"|\w+)', re.IGNORECASE)
+# Key of the advisory lock held while migrating, two deployments never migrate at the same time
+ADVISORY_LOCK_KEY = 7301943
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS public.schema_version (
+    version integer PRIMARY KEY,
+    name character varying NOT NULL,
+    checksum character(64) NOT NULL,
+    applied_at timestamp with time zone NOT NULL DEFAULT now(),
+    duration_ms integer NOT NULL
+);
+"""
+
+
+class MigrationError(Exception):
+    """
+    Raised when the migrations on disk and the ones recorded in the database disagree, or a migration fails.
+    """
+
+
+class Migration:
+    """
+    One SQL script of the migrations directory.
+    """
+
+    def __init__(self, version: int, name: str, sql: str):
+        self.version = version
+        self.name = name
+        self.sql = sql
+        self.checksum = hashlib.sha256(sql.encode("utf-8")).hexdigest()
+
+    @property
+    def transactional(self) -> bool:
+        """
+        False for scripts with CONCURRENTLY operations, they are run statement by statement in autocommit.
+        """
+        return not _NON_TRANSACTIONAL.search(strip_comments(self.sql))
+
+    def __repr__(self) -> str:
+        return f"Migration({self.version:04d}_{self.name})"
+
+
+def strip_comments(sql: str) -> str:
+    """
+    Remove the -- comment lines of a script.
+    """
+    return "\n".join(line for line in sql.splitlines() if not line.lstrip().startswith("--"))
+
+def split_statements(sql: str) -> list[str]:
+    """
+    Split a script on the semicolons that end its statements, ignoring the ones inside quotes and $$ bodies.
+    :param sql: The script.
+    :return: The statements, without empty ones.
+    """
+    statements = list[str]()
+    current = list[str]()
+    quote: Optional[str] = None
+    i = 0
+    while i < len(sql):
+        char = sql[i]
+        if quote is not None:
+            if sql.startswith(quote, i):
+                current.append(quote)
+                i += len(quote)
+                quote = None
+                continue
+        elif sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = len(sql) if end == -1 else end
+            continue
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "$":
+            match = re.match(r"\$\w*\$", sql[i:])
+            if match:
+                quote = match.group(0)
+                current.append(quote)
+                i += len(quote)
+                continue
+        elif char == ";":
+            statements.append("".join(current).strip())
+            current = []
+            i += 1
+            continue
+        current.append(char)
+        i += 1
+    statements.append("".join(current).strip())
+    return [statement for statement in statements if statement]
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> list[Migration]:
+    """
+    Read the migration scripts of a directory.
+    :param directory: The directory with the NNNN_description.sql scripts.
+    :return: The migrations ordered by version.
+    :raises MigrationError: If two scripts share a version.
+    """
+    migrations = dict[int, Migration]()
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Duplicated migration version {version:04d}: {filename}")
+        with open(os.path.join(directory, filename), encoding="utf-8") as file:
+            migrations[version] = Migration(version, match.group(2), file.read())
+    return [migrations[version] for version in sorted(migrations)]
+
+
+class MigrationRunner:
+    """
+    Apply the pending migrations of a directory to a database and record them in the schema_version table.
+    """
+
+    def __init__(self, connection: psycopg2.extensions.connection, directory: str = MIGRATIONS_DIR, lock_timeout: str = "5s"):
+        """
+        :param connection: A connection reserved to the runner, it is switched between transactions and autocommit.
+        :param directory: The directory with the migration scripts.
+        :param lock_timeout: How long a statement waits for a table lock before failing, so a migration
+                             never queues every request behind it.
+        """
+        self.connection = connection
+        self.migrations = load_migrations(directory)
+        self.lock_timeout = lock_timeout
+
+    def _execute(self, query: str, params: Optional[tuple] = None) -> list[tuple]:
+        with self.connection.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall() if cursor.description else []
+
+    def applied(self) -> dict[int, tuple[str, str]]:
+        """
+        Get the migrations recorded in the database.
+        :return: The name and checksum of each applied migration, by version.
+        """
+        self.connection.autocommit = True
+        self._execute(SCHEMA_VERSION_TABLE)
+        rows = self._execute("SELECT version, name, checksum FROM public.schema_version ORDER BY version;")
+        return {version: (name, checksum) for version, name, checksum in rows}
+
+    def pending(self) -> list[Migration]:
+        """
+        Get the migrations not applied yet.
+        :raises MigrationError: If an applied migration was modified on disk.
+        """
+        applied = self.applied()
+        for migration in self.migrations:
+            recorded = applied.get(migration.version)
+            if recorded is not None and recorded[1] != migration.checksum:
+                raise MigrationError(f"Migration {migration.version:04d}_{migration.name} changed after it was applied, add a new one instead")
+        return [migration for migration in self.migrations if migration.version not in applied]
+
+    def status(self) -> list[tuple[Migration, bool]]:
+        """
+        :return: Every migration on disk and whether it is applied.
+        """
+        pending = {migration.version for migration in self.pending()}
+        return [(migration, migration.version not in pending) for migration in self.migrations]
+
+    def migrate(self, target: Optional[int] = None) -> list[Migration]:
+        """
+        Apply the pending migrations in order.
+        :param target: The last version to apply, None for all of them.
+        :return: The migrations applied.
+        """
+        self.connection.autocommit = True
+        self._execute("SELECT pg_advisory_lock(%s);", (ADVISORY_LOCK_KEY,))
+        try:
+            self._execute("SELECT set_config('lock_timeout', %s, false);", (self.lock_timeout,))
+            applied = list[Migration]()
+            for migration in self.pending():
+                if target is not None and migration.version > target:
+                    break
+                self.apply(migration)
+                applied.append(migration)
+            return applied
+        finally:
+            self.connection.autocommit = True
+            self._execute("SELECT pg_advisory_unlock(%s);", (ADVISORY_LOCK_KEY,))
+
+    def apply(self, migration: Migration) -> None:
+        """
+        Apply one migration.
+        Transactional scripts run in a single transaction together with their schema_version row.
+        Scripts with CONCURRENTLY operations run one statement at a time, they must be idempotent
+        (IF NOT EXISTS) because a failure leaves the statements before it applied.
+        :raises MigrationError: If the migration fails.
+        """
+        logger.info(f"Applying migration {migration.version:04d}_{migration.name}")
+        start = time.perf_counter()
+        try:
+            if migration.transactional:
+                self.connection.autocommit = False
+                with self.connection.cursor() as cursor:
+                    cursor.execute(migration.sql)
+                    self._record(cursor, migration, start)
+                self.connection.commit()
+            else:
+                self.connection.autocommit = True
+                with self.connection.cursor() as cursor:
+                    for statement in split_statements(migration.sql):
+                        self._drop_invalid_index(cursor, statement)
+                        cursor.execute(statement)
+                    self._record(cursor, migration, start)
+        except psycopg2.Error as e:
+            if not self.connection.autocommit:
+                self.connection.rollback()
+            raise MigrationError(f"Migration {migration.version:04d}_{migration.name} failed: {e}") from e
+        logger.info(f"Migration {migration.version:04d}_{migration.name} applied in {time.perf_counter() - start:.1f} s")
+
+    def _drop_invalid_index(self, cursor: psycopg2.extensions.cursor, statement: str) -> None:
+        """
+        A failed CREATE INDEX CONCURRENTLY leaves an invalid index behind that IF NOT EXISTS would keep,
+        drop it so the statement builds it again.
+        """
+        match = _CONCURRENT_INDEX.search(statement)
+        if not match:
+            return
+        name = match.group(1).strip('"')
+        cursor.execute("""
+        SELECT n.nspname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relname = %s AND NOT i.indisvalid;
+        """, (name,))
+        for (schema,) in cursor.fetchall():
+            logger.warning(f"Dropping invalid index {schema}.{name} left by an interrupted migration")
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{schema}"."{name}";')
+
+    def _record(self, cursor: psycopg2.extensions.cursor, migration: Migration, start: float) -> None:
+        cursor.execute(
+            "INSERT INTO public.schema_version (version, name, checksum, duration_ms) VALUES (%s, %s, %s, %s);",
+            (migration.version, migration.name, migration.checksum, int((time.perf_counter() - start) * 1000))
+        )
+
@@ -0,0 +1,135 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from fastapi import HTTPException
+
+from connect import run_dao
+from DAO.client import Client
+from DAO.clientDAO import ClientDAO
+from DAO.employe import Employe
+from DAO.employeDAO import EmployeDAO
+
+logger = logging.getLogger("appLogger")
+
+
+class NameLoader:
+    """
+    Batching loader for the employees and clients shown next to documents.
+
+    IDs are collected with prime() and resolved by load() with one query per entity type;
+    whatever has been loaded is kept for the rest of the request.
+    """
+
+    def __init__(self):
+        self.employe_dao = EmployeDAO()
+        self.client_dao = ClientDAO()
+
+        self.employes = dict[str, Employe]()
+        self.clients = dict[str, Client]()
+        self._pending_employes = set[str]()
+        self._pending_clients = set[str]()
+
+    def prime(self, employe_ids: Iterable[str] = (), client_ids: Iterable[int | str] = ()) -> None:
+        """
+        Queue IDs for the next load, the ones already loaded are skipped.
+        :param employe_ids: The IDs of the employees.
+        :param client_ids: The IDs of the clients.
+        """
+        self._pending_employes.update(str(employe_id) for employe_id in employe_ids if str(employe_id) not in self.employes)
+        self._pending_clients.update(str(client_id) for client_id in client_ids if str(client_id) not in self.clients)
+
+    def load(self) -> None:
+        """
+        Resolve every queued ID, one query per entity type.
+        """
+        if self._pending_employes:
+            employe_ids, self._pending_employes = self._pending_employes, set[str]()
+            logger.debug(f"Loading {len(employe_ids)} employees")
+            self.employes.update(self.employe_dao.get_employees_by_ids(employe_ids))
+
+        if self._pending_clients:
+            client_ids, self._pending_clients = self._pending_clients, set[str]()
+            logger.debug(f"Loading {len(client_ids)} clients")
+            clients = self.client_dao.get_clients_by_ids(client_ids)
+            self.clients.update((str(client_id), client) for client_id, client in clients.items())
+
+    def get_employe(self, employe_id: str) -> Employe:
+        """
+        Get an employee, loading it with everything else queued if needed.
+        :param employe_id: The ID of the employee.
+        :return: The employee.
+        """
+        employe_id = str(employe_id)
+        if employe_id not in self.employes:
+            self.prime(employe_ids=[employe_id])
+            self.load()
+        if employe_id not in self.employes:
+            logger.error(f"Employee with ID {employe_id} not found.")
+            raise ValueError(f"Employee with ID {employe_id} not found.")
+        return self.employes[employe_id]
+
+    def get_client(self, client_id: int | str) -> Client:
+        """
+        Get a client, loading it with everything else queued if needed.
+        :param client_id: The ID of the client.
+        :return: The client.
+        """
+        client_id = str(client_id)
+        if client_id not in self.clients:
+            self.prime(client_ids=[client_id])
+            self.load()
+        if client_id not in self.clients:
+            logger.error(f"Client with ID {client_id} not found.")
+            raise HTTPException(status_code=404, detail=f"Client with ID {client_id} not found.")
+        return self.clients[client_id]
+
+
+_name_loader: ContextVar[Optional[NameLoader]] = ContextVar("name_loader", default=None)
+
+
+async def name_loader_scope() -> AsyncIterator[None]:
+    """
+    FastAPI dependency giving every request its own NameLoader.
+    """
+    with bind_name_loader():
+        yield
+
+
+@contextmanager
+def bind_name_loader() -> Iterator[NameLoader]:
+    """
+    Give the current context its own NameLoader until the block ends.
+    """
+    name_loader = NameLoader()
+    token = _name_loader.set(name_loader)
+    try:
+        yield name_loader
+    finally:
+        _name_loader.reset(token)
+
+
+def get_name_loader() -> NameLoader:
+    """
+    Get the NameLoader of the current request.
+    Outside a request a new loader is returned, so nothing is shared.
+    :return: The loader.
+    """
+    name_loader = _name_loader.get()
+    if name_loader is None:
+        return NameLoader()
+    return name_loader
+
+
+async def load_names(employe_ids: Iterable[str], client_ids: Iterable[int | str]) -> NameLoader:
+    """
+    Resolve the employees and clients a response needs before its documents are serialized.
+    :param employe_ids: The IDs of the employees.
+    :param client_ids: The IDs of the clients.
+    :return: The loader of the current request.
+    """
+    name_loader = get_name_loader()
+    name_loader.prime(employe_ids, client_ids)
+    await run_dao(name_loader.load)
+    return name_loader
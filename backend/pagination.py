@@ -0,0 +1,138 @@
+import base64
+import json
+import os
+from datetime import date
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, Response
+
+from documentFilter import DocumentFilter
+
+# Upper bound of the `limit` query parameter of the list endpoints
+MAX_PAGE_LIMIT = 500
+# Response header with the cursor of the next page, absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Rows read at a time by the streamed lists, a stream never holds more than one batch in memory
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+T = TypeVar("T")
+
+
+def encode_cursor(*key: Any) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+    :param key: The values of the sort key, dates are stored in ISO format.
+    :return: The cursor, safe to use in a URL.
+    """
+    values = [value.isoformat() if isinstance(value, date) else value for value in key]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """
+    Decode a cursor made by encode_cursor.
+    :param cursor: The cursor sent by the client.
+    :param size: The number of values of the sort key.
+    :return: The values of the sort key.
+    :raises HTTPException: 400 if the cursor is not valid.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def where_clause(clauses: list[str]) -> str:
+    """
+    Join the conditions of a query, an empty list gives no WHERE at all.
+    """
+    return "WHERE " + " AND ".join(clauses) if clauses else ""
+
+def document_page_query(table: str, id_column: str, limit: Optional[int], after: Optional[str],
+                        filters: Optional[DocumentFilter] = None) -> tuple[str, list[Any]]:
+    """
+    Build the query of a page of documents, newest first.
+    Documents are ordered by ("Date", ID) descending and a page starts strictly after the key of the cursor,
+    so the database reads at most limit + 1 rows whatever the size of the table.
+    Documents without a date come first, as in a backward scan of the ("Date", ID) indexes, a row comparison is
+    never true for them so a cursor on one of them continues with the rest of them and then every dated document.
+    :param table: The quoted name of the document table.
+    :param id_column: The quoted name of its ID column.
+    :param limit: The size of the page, None for every matching document.
+    :param after: The cursor of the previous page, None for the first page.
+    :param filters: The filters of the list, None for no filter.
+    :return: The query and its parameters, it returns one row more than the limit to detect the next page.
+    """
+    clauses, params = filters.clauses() if filters is not None else (list[str](), list[Any]())
+    if after is not None:
+        after_date, after_id = decode_cursor(after, 2)
+        try:
+            if after_date is None:
+                params.append(str(after_id))
+                clauses.append(f'(("Date" IS NULL AND {id_column} < %s) OR "Date" IS NOT NULL)')
+            else:
+                params.extend([date.fromisoformat(after_date), str(after_id)])
+                clauses.append(f'("Date", {id_column}) < (%s, %s)')
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # LIMIT NULL is no limit at all
+    query = f"""
+    SELECT *
+    FROM {table}
+    {where_clause(clauses)}
+    ORDER BY "Date" DESC NULLS FIRST, {id_column} DESC
+    LIMIT %s;
+    """
+    params.append(limit + 1 if limit is not None else None)
+    return query, params
+
+def id_page_query(table: str, id_column: str, limit: int, after: Optional[str], id_type: Callable[[Any], Any] = int) -> tuple[str, list[Any]]:
+    """
+    Build the query of a page of master data, ordered by ID.
+    :param table: The quoted name of the table.
+    :param id_column: The quoted name of its ID column.
+    :param limit: The size of the page.
+    :param after: The cursor of the previous page, None for the first page.
+    :param id_type: The type of the ID column.
+    :return: The query and its parameters, it returns one row more than the limit to detect the next page.
+    """
+    clauses = list[str]()
+    params = list[Any]()
+    if after is not None:
+        try:
+            params.append(id_type(decode_cursor(after, 1)[0]))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        clauses.append(f"{id_column} > %s")
+
+    query = f"""
+    SELECT *
+    FROM {table}
+    {where_clause(clauses)}
+    ORDER BY {id_column}
+    LIMIT %s;
+    """
+    params.append(limit + 1)
+    return query, params
+
+def split_page(rows: list[T], limit: Optional[int], key: Callable[[T], tuple[Any, ...]]) -> tuple[list[T], Optional[str]]:
+    """
+    Cut the extra row of a page query and build the cursor of the next page.
+    :param rows: The rows returned by the page query.
+    :param limit: The size of the page, None when the query had no limit.
+    :param key: The sort key of a row.
+    :return: The rows of the page and the cursor of the next page, None on the last page.
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
+
+def set_next_cursor(response: Optional[Response], next_cursor: Optional[str]) -> None:
+    """
+    Send the cursor of the next page in the NEXT_CURSOR_HEADER header, the body stays a plain list.
+    """
+    if response is not None and next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
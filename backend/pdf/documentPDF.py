@@ -0,0 +1,271 @@
+from datetime import date
+from io import BytesIO
+from typing import Optional
+import logging
+import os
+
+from PIL import Image
+from pydantic import BaseModel
+from reportlab import rl_config
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from DAO.product import Product
+from nameLoader import get_name_loader
+
+logger = logging.getLogger("appLogger")
+
+# Binary streams instead of ASCII85 ones: a quarter smaller, and ASCII85 is encoded in pure Python without rl_accel.
+# The setting is global to reportlab, this engine is the only PDF producer of the API.
+rl_config.useA85 = 0
+
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images", "sellcontrol.png")
+
+# Title of every document type, used in the information table and the total line
+DOCUMENT_TITLES = {
+    "offer": "Offer",
+    "order": "Order",
+    "deliveryNote": "Delivery Note",
+    "invoice": "Invoice",
+}
+
+# Layout of the page
+X_MARGIN = 30
+Y_MARGIN = 50
+LOGO_SIZE = 50
+# Pixels per point of the embedded logo, 3 is about 216 dpi
+LOGO_SCALE = 3
+INFO_WIDTH = 250
+# Space taken on the first page by the logo, the information and the client tables
+HEADER_HEIGHT = 270
+PRODUCT_COLUMNS = [60, 100, 140, 60, 80, 80]
+PRODUCT_HEADER = ["Product ID", "Product Name", "Description", "Quantity", "Unit Price", "Total Price"]
+# Every product row is one line of text, a fixed height spares measuring each row
+PRODUCT_ROW_HEIGHT = 18
+
+# Part of the key of every cached PDF, bump it when the layout changes so PDFs of the old layout are not served
+ENGINE_VERSION = 2
+
+
+class PDFLine(BaseModel):
+    productId: int
+    # Nullable columns of the Products table, printed as empty cells
+    name: Optional[str] = None
+    description: Optional[str] = None
+    quantity: int
+    unitPrice: float
+
+
+class PDFDocument(BaseModel):
+    """
+    Everything a document PDF shows, whatever the type of the document.
+    It holds no DAO object, so it can be pickled and hashed.
+    """
+    documentType: str
+    documentID: str
+    date: date
+    employeName: str
+    clientName: str
+    clientAddress: str
+    clientPhone: str
+    totalPrice: float
+    lines: list[PDFLine]
+
+    def get_filename(self) -> str:
+        return f"{self.documentID}_{self.date}.pdf"
+
+
+def pdf_document(document_type: str, document_id: str, document_date: date, employe_id: str, client_id: int | str,
+                 total_price: float, products: list[tuple[Product, int]]) -> PDFDocument:
+    """
+    Normalize a document for the PDF engine.
+    The employee and the client come from the NameLoader of the request, load_names them first to avoid a query here.
+    :param document_type: The type of the document, a key of DOCUMENT_TITLES.
+    :param document_id: The ID of the document.
+    :param document_date: The date of the document.
+    :param employe_id: The ID of the employee that created it.
+    :param client_id: The ID of the client.
+    :param total_price: The total price of the document.
+    :param products: The products of the document and their quantities.
+    :return: The normalized document.
+    """
+    name_loader = get_name_loader()
+    employe = name_loader.get_employe(employe_id)
+    client = name_loader.get_client(client_id)
+    return PDFDocument(
+        documentType=document_type,
+        documentID=document_id,
+        date=document_date,
+        employeName=employe.name or "",
+        clientName=client.CompanyName or "",
+        clientAddress=client.address or "",
+        clientPhone=str(client.phone) if client.phone is not None else "",
+        totalPrice=total_price,
+        lines=[PDFLine(productId=product.productId, name=product.name, description=product.description,
+                       quantity=quantity, unitPrice=product.sellPrice) for product, quantity in products]
+    )
+
+
+class DocumentPDFEngine:
+    """
+    Renders the PDF of any document type.
+    Styles, the logo and the table styles are built once and shared by every render.
+    """
+    def __init__(self, logo_path: str = LOGO_PATH):
+        styles = getSampleStyleSheet()
+        self.normal_style = styles["Normal"]
+        self.header_style = styles["Normal"].clone("HeaderStyle")
+        self.header_style.textColor = colors.white
+
+        # The logo is embedded again in every PDF, at the size it is drawn instead of its full resolution
+        self.logo: Optional[ImageReader] = None
+        if os.path.exists(logo_path):
+            with Image.open(logo_path) as logo:
+                logo.thumbnail((LOGO_SIZE * LOGO_SCALE, LOGO_SIZE * LOGO_SCALE))
+                logo.load()
+                self.logo = ImageReader(logo)
+        else:
+            logger.warning(f"Logo file not found at {logo_path}")
+
+        self.info_table_style = TableStyle([
+            ("GRID", (0, 1), (-1, -1), 0.5, colors.grey),  # Grid only for data rows
+            ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+            ("BACKGROUND", (0, 0), (0, 0), colors.darkblue),  # Header background color
+            ("ALIGN", (0, 0), (0, 0), "CENTER"),  # Center the header text
+        ])
+        self.client_table_style = TableStyle([
+            ("BOX", (0, 0), (-1, -1), 1, colors.black),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("LEFTPADDING", (0, 0), (-1, -1), 6),
+        ])
+        self.product_table_style = TableStyle([
+            ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ])
+        self.total_style = styles["Normal"].clone("TotalStyle", fontName="Helvetica-Bold", fontSize=14, leading=17,
+                                                  alignment=TA_RIGHT, spaceBefore=20)
+
+    def render(self, document: PDFDocument) -> bytes:
+        """
+        Render the PDF of a document in memory.
+        The product table flows over as many pages as needed, repeating its header on each of them.
+        :param document: The normalized document.
+        :return: The content of the PDF.
+        """
+        title = DOCUMENT_TITLES[document.documentType]
+        buffer = BytesIO()
+        pdf = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=X_MARGIN, rightMargin=X_MARGIN, topMargin=Y_MARGIN,
+                                bottomMargin=Y_MARGIN, title=f"{title} {document.documentID}")
+
+        # 4. Product Table
+        product_data = [PRODUCT_HEADER]
+        for line in document.lines:
+            product_data.append([
+                str(line.productId),
+                line.name or "",
+                line.description or "",
+                str(line.quantity),
+                f"{line.unitPrice:.2f} €",
+                f"{line.quantity * line.unitPrice:.2f} €"
+            ])
+        product_table = LongTable(product_data, colWidths=PRODUCT_COLUMNS, rowHeights=PRODUCT_ROW_HEIGHT, repeatRows=1,
+                                  hAlign="LEFT")
+        product_table.setStyle(self.product_table_style)
+
+        # Total Price
+        total = Paragraph(f"TOTAL {title.upper()} PRICE: {document.totalPrice:.2f} €", self.total_style)
+
+        story = [Spacer(1, HEADER_HEIGHT), product_table, total]
+        pdf.build(story,
+                  onFirstPage=lambda c, _: self._draw_header(c, document, title),
+                  onLaterPages=lambda c, _: self._draw_page_title(c, document, title),
+                  canvasmaker=NumberedCanvas)
+        return buffer.getvalue()
+
+    def _draw_header(self, c: Canvas, document: PDFDocument, title: str) -> None:
+        width, height = A4
+        y = height - Y_MARGIN
+
+        # 1. Logo and Company Info
+        if self.logo is not None:
+            c.drawImage(self.logo, X_MARGIN, y - 70, width=LOGO_SIZE, height=LOGO_SIZE, mask="auto")
+        c.setFont("Helvetica-Bold", 20)
+        c.drawString(X_MARGIN + 100, y - 30, "sellcontrol")
+
+        # 2. Document metadata
+        info_table = Table([
+            [Paragraph(f"<b>{title} Information</b>", self.header_style)],
+            [Paragraph(
+                f"<b>creation date:</b> {document.date}<br/>"
+                f"<b>{title} ID:</b> {document.documentID}<br/>"
+                f"<b>created by:</b> {document.employeName}<br/>",
+                self.normal_style)
+            ]
+        ], colWidths=[INFO_WIDTH])
+        info_table.setStyle(self.info_table_style)
+        info_table.wrapOn(c, width, height)
+        info_table.drawOn(c, width - X_MARGIN - INFO_WIDTH, y - 150)
+
+        # 3. Client Section
+        client_table = Table([
+            [Paragraph("<b>Client</b>", self.header_style)],
+            [Paragraph(
+                f"<b>Company Name:</b> {document.clientName}<br/>"
+                f"<b>Address:</b> {document.clientAddress}<br/>"
+                f"<b>Phone:</b> {document.clientPhone}",
+                self.normal_style)
+            ]
+        ], colWidths=[width / 2 - X_MARGIN])
+        client_table.setStyle(self.client_table_style)
+        client_table.wrapOn(c, width, height)
+        client_table.drawOn(c, X_MARGIN, y - 250)
+
+    def _draw_page_title(self, c: Canvas, document: PDFDocument, title: str) -> None:
+        # The following pages only recall which document they belong to
+        width, height = A4
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(X_MARGIN, height - Y_MARGIN + 15, f"sellcontrol - {title} {document.documentID}")
+
+
+class NumberedCanvas(Canvas):
+    """
+    Canvas that writes "Page n of total" at the bottom of every page.
+    The pages are kept until the document is saved, when their total is known.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pages = list[dict]()
+
+    def showPage(self):
+        self._pages.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        total = len(self._pages)
+        for page in self._pages:
+            self.__dict__.update(page)
+            self.setFont("Helvetica", 9)
+            self.drawCentredString(self._pagesize[0] / 2, Y_MARGIN / 2, f"Page {self._pageNumber} of {total}")
+            super().showPage()
+        super().save()
+
+
+# Built once when the API starts
+engine = DocumentPDFEngine()
+
+
+def render_document_pdf(document: PDFDocument) -> bytes:
+    """
+    Render the PDF of a document with the shared engine.
+    :param document: The normalized document.
+    :return: The content of the PDF.
+    """
+    return engine.render(document)
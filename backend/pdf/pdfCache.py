@@ -0,0 +1,259 @@
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from dotenv import load_dotenv
+from fastapi import Response
+from starlette.concurrency import run_in_threadpool
+
+from pdf.documentPDF import ENGINE_VERSION, PDFDocument
+from pdf.pdfResponse import pdf_response
+from pdf.renderPool import render_pdf
+
+logger = logging.getLogger("appLogger")
+
+env_path = os.path.join(os.path.dirname(__file__), "../../ps.env")
+
+
+def load_pdf_cache_env() -> tuple[int, int, str]:
+    """
+    Read the sizing of the PDF cache from the environment.
+    :return: (bytes kept in memory, bytes kept on disk, directory of the disk tier)
+    """
+    load_dotenv(env_path)
+
+    memory_size = int(float(os.getenv("PDF_CACHE_MEMORY_MB", "32")) * 1024 * 1024)
+    disk_size = int(float(os.getenv("PDF_CACHE_DISK_MB", "256")) * 1024 * 1024)
+    directory = os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "sellcontrol-pdf"))
+    return memory_size, disk_size, directory
+
+
+def pdf_key(document: PDFDocument) -> str:
+    """
+    Content address of the PDF of a document.
+    It covers the type and ID of the document, its lines, the client and the employee shown, and the version of the
+    engine, so a document that changed, or a new layout, never gets an old PDF.
+    :param document: The normalized document.
+    :return: The key, also used as ETag.
+    """
+    digest = hashlib.sha256(f"{ENGINE_VERSION}\n".encode())
+    digest.update(document.model_dump_json().encode())
+    return digest.hexdigest()
+
+
+class PDFCache:
+    """
+    Thread safe cache of rendered PDFs by content address, in memory and in a local directory.
+    Both tiers are bounded by size in bytes and evict the least recently used PDFs first.
+    A PDF found on disk is brought back to memory.
+    """
+
+    def __init__(self, memory_size: int, disk_size: int, directory: str):
+        """
+        Create the cache, PDFs left on disk by a previous run are indexed.
+        :param memory_size: Bytes kept in memory, 0 disables the memory tier.
+        :param disk_size: Bytes kept on disk, 0 disables the disk tier.
+        :param directory: Directory of the disk tier, created on the first write.
+        """
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.directory = directory
+
+        self._memory = OrderedDict[str, bytes]()
+        self._memory_bytes = 0
+        # Size of every file of the disk tier, the files themselves are read on demand
+        self._disk = OrderedDict[str, int]()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        if self.disk_size > 0:
+            self._index_disk()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def _index_disk(self) -> None:
+        if not os.path.isdir(self.directory):
+            return
+        files = list[tuple[float, str, int]]()
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-len(".pdf")], stat.st_size))
+        # Oldest first, they are the first evicted
+        for _, key, size in sorted(files):
+            self._disk[key] = size
+            self._disk_bytes += size
+        evicted = self._evict_disk()
+        self._remove_files(evicted)
+        logger.info(f"PDF cache: {len(self._disk)} PDFs found in {self.directory}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a PDF, from memory or else from disk.
+        :param key: The content address of the PDF.
+        :return: The PDF, or None when it is not cached.
+        """
+        with self._lock:
+            content = self._memory.get(key)
+            if content is not None:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                return content
+            on_disk = key in self._disk
+
+        if on_disk:
+            try:
+                with open(self._path(key), "rb") as file:
+                    content = file.read()
+            except OSError:
+                # Removed by another process sharing the directory
+                content = None
+            with self._lock:
+                if content is None:
+                    self._disk_bytes -= self._disk.pop(key, 0)
+                else:
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                    self._disk_hits += 1
+                    self._store_memory(key, content)
+                    return content
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def set(self, key: str, content: bytes) -> None:
+        """
+        Store a PDF in both tiers, evicting the least recently used PDFs to stay within their size.
+        :param key: The content address of the PDF.
+        :param content: The PDF.
+        """
+        with self._lock:
+            self._store_memory(key, content)
+            store_disk = 0 < len(content) <= self.disk_size and key not in self._disk
+
+        if not store_disk:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Written aside and renamed, a reader never sees half a file
+            fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(content)
+            os.replace(temporary, self._path(key))
+        except OSError as e:
+            logger.warning(f"PDF cache: could not write {key} to {self.directory}: {e}")
+            return
+
+        with self._lock:
+            if key not in self._disk:
+                self._disk[key] = len(content)
+                self._disk_bytes += len(content)
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+
+    def _store_memory(self, key: str, content: bytes) -> None:
+        # Called with the lock held
+        if len(content) > self.memory_size:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = content
+        self._memory_bytes += len(content)
+        while self._memory_bytes > self.memory_size:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._evictions += 1
+
+    def _evict_disk(self) -> list[str]:
+        # Called with the lock held, or before the cache is shared
+        evicted = list[str]()
+        while self._disk_bytes > self.disk_size:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def _remove_files(self, keys: list[str]) -> None:
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the counters of the cache.
+        :return: A dictionary with the size of each tier and the hit/miss/eviction counters.
+        """
+        with self._lock:
+            lookups = self._memory_hits + self._disk_hits + self._misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_max_bytes": self.memory_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_size,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": (self._memory_hits + self._disk_hits) / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+pdf_cache = PDFCache(*load_pdf_cache_env())
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag, weak validators compare equal to strong ones.
+    :param if_none_match: The If-None-Match header of the request, if any.
+    :param etag: The ETag of the current PDF.
+    :return: True when the client already has this PDF.
+    """
+    if if_none_match is None:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def cached_pdf_response(document: PDFDocument, if_none_match: Optional[str] = None) -> Response:
+    """
+    Send the PDF of a document, rendered only when it is not cached.
+    A client that already has it, per If-None-Match, gets a 304 without the PDF being read or rendered.
+    :param document: The normalized document.
+    :param if_none_match: The If-None-Match header of the request, if any.
+    :return: The response.
+    """
+    key = pdf_key(document)
+    etag = f'"{key}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+    # The disk tier reads files, off the event loop
+    content = await run_in_threadpool(pdf_cache.get, key)
+    if content is None:
+        content = await render_pdf(document)
+        await run_in_threadpool(pdf_cache.set, key, content)
+    return pdf_response(document.get_filename(), content, etag)
+
+
+def get_pdf_cache_stats() -> dict[str, float]:
+    return pdf_cache.stats()
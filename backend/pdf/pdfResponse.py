@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import Response
+
+PDF_MEDIA_TYPE = "application/pdf"
+
+
+def pdf_response(filename: str, pdf: bytes, etag: Optional[str] = None) -> Response:
+    """
+    Send a PDF rendered in memory as a download.
+    :param filename: The name the browser saves it with.
+    :param pdf: The content of the PDF, its length is sent in Content-Length.
+    :param etag: The ETag of the PDF, the browser keeps it and revalidates it with If-None-Match.
+    :return: The response.
+    """
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if etag is not None:
+        headers["ETag"] = etag
+        headers["Cache-Control"] = "private, no-cache"
+    return Response(
+        content=pdf,
+        media_type=PDF_MEDIA_TYPE,
+        headers=headers
+    )
@@ -0,0 +1,190 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from pdf.documentPDF import PDFDocument, render_document_pdf
+
+
+def load_render_pool_env() -> tuple[int, int, int]:
+    """
+    Read the sizing of the PDF render pool from the environment.
+    :return: (worker processes, renders waiting for a worker, seconds sent in Retry-After)
+    """
+    workers = int(os.getenv("PDF_WORKERS", "2"))
+    queue_size = int(os.getenv("PDF_QUEUE_SIZE", "8"))
+    retry_after = int(os.getenv("PDF_RETRY_AFTER", "2"))
+    if workers < 0 or queue_size < 0 or retry_after < 0:
+        raise ValueError("PDF_WORKERS, PDF_QUEUE_SIZE and PDF_RETRY_AFTER must be >= 0")
+    return workers, queue_size, retry_after
+
+
+class RenderQueueFullError(Exception):
+    """
+    Raised when every worker is busy and the queue of pending renders is full.
+    """
+
+
+class PDFRenderPool:
+    """
+    Renders PDFs in worker processes, off the event loop and on other cores, with a bounded number of pending renders.
+    With 0 workers the renders run in the threadpool of the API instead.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+
+        # spawn, the API process has threads (pools, threadpool) that fork would copy in an unknown state
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        # A slot per render, running or waiting for a worker
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_size)
+        self._lock = threading.Lock()
+
+        self._pending = 0
+        self._renders = 0
+        self._rejected = 0
+        self._render_total = 0.0
+        self._render_max = 0.0
+
+    async def render(self, document: PDFDocument) -> bytes:
+        """
+        Render the PDF of a document, waiting for a worker if they are all busy.
+        :param document: The normalized document.
+        :return: The content of the PDF.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            logging.warning(f"PDF render rejected, {self._pending} renders pending")
+            raise RenderQueueFullError(f"{self._pending} PDF renders pending")
+
+        start = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+
+        if self._executor is None:
+            try:
+                return await run_in_threadpool(render_document_pdf, document)
+            finally:
+                self._release(start)
+
+        try:
+            executor, future = self._submit(self._executor, document)
+        except BrokenProcessPool:
+            self._release(start)
+            raise HTTPException(status_code=500, detail="Failed to generate PDF")
+        except BaseException:
+            self._release(start)
+            raise
+        # The slot is held until the worker is done, even if the request is cancelled first
+        future.add_done_callback(lambda _: self._release(start))
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died (killed, out of memory), the executor cannot be used anymore
+            logging.error("PDF render pool broken, starting new workers")
+            self._restart(executor)
+            raise HTTPException(status_code=500, detail="Failed to generate PDF")
+
+    def _submit(self, executor: ProcessPoolExecutor, document: PDFDocument) -> tuple[ProcessPoolExecutor, Future[bytes]]:
+        try:
+            return executor, executor.submit(render_document_pdf, document)
+        except BrokenProcessPool:
+            # A worker died while idle, the executor refuses every render until it is replaced
+            logging.error("PDF render pool broken, starting new workers")
+            self._restart(executor)
+            executor = self._executor
+            return executor, executor.submit(render_document_pdf, document)
+
+    def _release(self, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._pending -= 1
+            self._renders += 1
+            self._render_total += elapsed
+            self._render_max = max(self._render_max, elapsed)
+        self._slots.release()
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # The renders that failed together restart the workers once
+            if self._executor is not broken:
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        """
+        Stop the worker processes, pending renders are cancelled.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Occupancy and render-time statistics of the pool.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "pending": self._pending,
+                "renders": self._renders,
+                "rejected": self._rejected,
+                "render_time_total_ms": round(self._render_total * 1000, 3),
+                "render_time_max_ms": round(self._render_max * 1000, 3),
+                "render_time_avg_ms": round(self._render_total * 1000 / self._renders, 3) if self._renders else 0.0,
+            }
+
+
+class RenderPool:
+    _instance: Optional[PDFRenderPool] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> PDFRenderPool:
+        with cls._lock:
+            if cls._instance is None:
+                workers, queue_size, _ = load_render_pool_env()
+                cls._instance = PDFRenderPool(workers, queue_size)
+                logging.info(f"PDF render pool started (workers={workers}, queue={queue_size})")
+            return cls._instance
+
+    @classmethod
+    def close_instance(cls) -> None:
+        with cls._lock:
+            if cls._instance is not None:
+                cls._instance.close()
+                cls._instance = None
+
+
+async def render_pdf(document: PDFDocument) -> bytes:
+    """
+    Render the PDF of a document in the render pool.
+    A full queue is answered with a 503 and a Retry-After header.
+    :param document: The normalized document.
+    :return: The content of the PDF.
+    """
+    try:
+        return await RenderPool.get_instance().render(document)
+    except RenderQueueFullError:
+        _, _, retry_after = load_render_pool_env()
+        raise HTTPException(status_code=503, detail="Too many PDFs being generated, try again later",
+                            headers={"Retry-After": str(retry_after)})
+
+def get_render_pool_stats() -> dict[str, float]:
+    return RenderPool.get_instance().stats()
+
+def close_render_pool() -> None:
+    RenderPool.close_instance()
@@ -1,26 +1,36 @@
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, HTTPException, Query, Response
 from verificator import verifyToken, verifyTokenEmployee
+from connect import run_dao, use_async_driver
+from pagination import MAX_PAGE_LIMIT, set_next_cursor
+from jsonResponse import trusted_json_response
+from typing import Annotated, Optional
 import logging
 
 from DAO.clientDAO import ClientDAO
+from asyncDAO.clientDAO import AsyncClientDAO
 from DAO.client import Client
 
 router = APIRouter()
-clientDAO = ClientDAO()
+clientDAO = AsyncClientDAO() if use_async_driver() else ClientDAO()
 logger = logging.getLogger("appLogger")
 
 @router.get("/", tags=["client"], dependencies=[Depends(verifyTokenEmployee)])
-async def get_all_clients(token: str = Depends(verifyToken)) -> list[dict[str, str]]:
+async def get_all_clients(token: str = Depends(verifyToken), limit: Annotated[Optional[int], Query(ge=1, le=MAX_PAGE_LIMIT)] = None, after: Optional[str] = None, response: Response = None) -> list[dict[str, str]]:
     """
-    Get all clients
+    Get all clients, or one page of them when a limit is given.
+    The cursor of the next page is sent in the X-Next-Cursor header.
     """
     logger.debug("Clients requested")
-    clients = clientDAO.get_all_clients()
+    if limit is None:
+        clients = await run_dao(clientDAO.get_all_clients)
+    else:
+        clients, next_cursor = await run_dao(clientDAO.get_clients_page, limit, after)
+        set_next_cursor(response, next_cursor)
     if not clients:
         return []
     clients_json = [client.getClientJSON() for client in clients]
     logger.debug(f"Clients retrieved: {clients_json}")
-    return clients_json
+    return trusted_json_response(clients_json, list[dict[str, str]], response)
 
 @router.put("/", tags=["client"], dependencies=[Depends(verifyTokenEmployee)])
 async def update_client(client: dict[str, str], token: str = Depends(verifyToken)) -> dict[str, str]:
@@ -35,12 +45,12 @@ async def update_client(client: dict[str, str], token: str = Depends(verifyToken
     contact = client["contact"]
     logger.debug(f"Client data received for update: {client}")
 
-    actual_client = clientDAO.get_client_by_id(clientId)
+    actual_client = await run_dao(clientDAO.get_client_by_id, clientId)
 
     new_client = Client(clientID=int(clientId), CompanyName=actual_client.CompanyName, CIF=actual_client.CIF, address=address, email=email, phone=int(phone), contact=contact)
 
     # Update the client
-    updated_client = clientDAO.update_client(new_client)
+    updated_client = await run_dao(clientDAO.update_client, new_client)
     logger.debug(f"Client updated: {updated_client}")
     
     return updated_client.getClientJSON()
@@ -66,7 +76,7 @@ async def create_client(client: dict[str, str], token: str = Depends(verifyToken
         raise HTTPException(status_code=400, detail="Client verification failed, missing fields")
     
     # Create the client
-    created_client = clientDAO.create_client(new_client)
+    created_client = await run_dao(clientDAO.create_client, new_client)
     logger.debug(f"Client created: {created_client}")
 
     return created_client.getClientJSON()
\ No newline at end of file
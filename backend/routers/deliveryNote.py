@@ -1,35 +1,71 @@
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, Header, HTTPException, Query, Response
 from verificator import verifyTokenEmployee
-from fastapi.responses import FileResponse
-import os
+from connect import run_dao, use_async_driver
+from pagination import MAX_PAGE_LIMIT, set_next_cursor
+from jsonResponse import trusted_json_response
+from documentFilter import DocumentFilter
+from datetime import date
+from typing import Annotated, Optional
+from nameLoader import load_names
+from streaming import ndjson_response
 import logging
 
 
 from DAO.deliveryNoteDAO import DeliveryNoteDAO
+from asyncDAO.deliveryNoteDAO import AsyncDeliveryNoteDAO
 from DAO.productDAO import ProductDAO
+from asyncDAO.productDAO import AsyncProductDAO
 from DAO.orderDAO import OrderDAO
+from asyncDAO.orderDAO import AsyncOrderDAO
 from DAO.deliveryNote import DeliveryNote
 from DAO.deliveryNote import DeliveryNoteModel
-import pdf.deliveryNotePDF  as deliveryNotePDF
+from pdf.documentPDF import pdf_document
+from pdf.pdfCache import cached_pdf_response
 
 router = APIRouter()
-orderDAO = OrderDAO()
-deliveryNoteDAO = DeliveryNoteDAO()
-productDAO = ProductDAO()
+orderDAO = AsyncOrderDAO() if use_async_driver() else OrderDAO()
+deliveryNoteDAO = AsyncDeliveryNoteDAO() if use_async_driver() else DeliveryNoteDAO()
+productDAO = AsyncProductDAO() if use_async_driver() else ProductDAO()
 logger = logging.getLogger("appLogger")
 
+async def delivery_notes_json(delivery_notes: list[DeliveryNote]) -> list[DeliveryNoteModel]:
+    """
+    Load the employee and client names of the delivery notes and serialize them.
+    """
+    await load_names([delivery_note.employeId for delivery_note in delivery_notes], [delivery_note.clientId for delivery_note in delivery_notes])
+    return [delivery_note.get_json() for delivery_note in delivery_notes]
+
 @router.get("/", tags=["deliveryNote"], dependencies=[Depends(verifyTokenEmployee)])
-async def get_all_delivery_notes(token: str = Depends(verifyTokenEmployee)) -> list[DeliveryNoteModel]:
+async def get_all_delivery_notes(token: str = Depends(verifyTokenEmployee),
+                                 limit: Annotated[Optional[int], Query(ge=1, le=MAX_PAGE_LIMIT)] = None, after: Optional[str] = None,
+                                 clientID: Optional[int] = None, employeID: Optional[str] = None,
+                                 date_from: Optional[date] = None, date_to: Optional[date] = None,
+                                 min_totalPrice: Optional[float] = None, max_totalPrice: Optional[float] = None,
+                                 stream: bool = False,
+                                 response: Response = None) -> list[DeliveryNoteModel]:
     """
-    Get all delivery notes
+    Get all delivery notes, or one page of them when a limit is given.
+    The cursor of the next page is sent in the X-Next-Cursor header.
+    clientID, employeID, date_from/date_to and min/max_totalPrice filter the list in the database.
+    With stream=true the whole filtered list is sent as NDJSON, one document per line, read in batches from a
+    server-side cursor. limit and after are ignored.
     """
     logger.debug("Delivery notes requested")
-    delivery_notes = deliveryNoteDAO.get_all_delivery_notes()
+    filters = DocumentFilter(clientID=clientID, employeID=employeID, date_from=date_from, date_to=date_to,
+                             min_totalPrice=min_totalPrice, max_totalPrice=max_totalPrice)
+    filters.check()
+    if stream:
+        return ndjson_response(lambda: deliveryNoteDAO.stream_delivery_notes(filters), delivery_notes_json)
+    if limit is None and filters.is_empty():
+        delivery_notes = await run_dao(deliveryNoteDAO.get_all_delivery_notes)
+    else:
+        delivery_notes, next_cursor = await run_dao(deliveryNoteDAO.get_delivery_notes_page, limit, after, filters)
+        set_next_cursor(response, next_cursor)
     if not delivery_notes:
         return []
-    delivery_note_json = [delivery_note.get_json() for delivery_note in delivery_notes]
+    delivery_note_json = await delivery_notes_json(delivery_notes)
     logger.debug(f"Delivery notes retrieved: {delivery_note_json}")
-    return delivery_note_json
+    return trusted_json_response(delivery_note_json, list[DeliveryNoteModel], response)
 
 @router.post("/", tags=["deliveryNote"], dependencies=[Depends(verifyTokenEmployee)])
 async def create_delivery_note(order_data: dict[str,str], token: dict[str,str] = Depends(verifyTokenEmployee)) -> None:
@@ -53,7 +89,7 @@ async def create_delivery_note(order_data: dict[str,str], token: dict[str,str] =
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     # Get order information from the ID
-    order = orderDAO.get_order_by_id(orderID)
+    order = await run_dao(orderDAO.get_order_by_id, orderID)
     if not order:
         logger.error("Order not found")
         raise HTTPException(status_code=404, detail="Order not found")
@@ -63,11 +99,6 @@ async def create_delivery_note(order_data: dict[str,str], token: dict[str,str] =
     # format the delivery note ID clientID = "cl-xxxxxx" deliveryNoteID = "dn-xxxxxx" with the same xxxxxx
     deliveryNoteID = "dn-" + orderID[3:]
     
-    # Check if the order is already delivered
-    existing_delivery_note = deliveryNoteDAO.check_delivery_note_exists(deliveryNoteID)
-    if existing_delivery_note:
-        logger.error("Delivery note already exists")
-        raise HTTPException(status_code=400, detail="Delivery note already exists")
     # Create a new DeliveryNote object
     delivery_note = DeliveryNote(
         deliveryNoteID=deliveryNoteID,
@@ -76,16 +107,20 @@ async def create_delivery_note(order_data: dict[str,str], token: dict[str,str] =
         products=order.products,
     )
     
-    # Insert the new delivery note into the database
+    # Insert the new delivery note into the database, nothing is inserted if the order was already delivered
     try:
-        delivery_note_id = deliveryNoteDAO.create_delivery_note(delivery_note)
-        logger.info(f"Delivery note created with ID: {delivery_note_id}")
+        created = await run_dao(deliveryNoteDAO.create_delivery_note, delivery_note)
     except Exception as e:
         logger.error(f"Failed to create delivery note: {e}")
         raise HTTPException(status_code=500, detail="Failed to create delivery note")
+    if not created:
+        logger.error("Delivery note already exists")
+        raise HTTPException(status_code=409, detail="Delivery note already exists")
+    logger.info(f"Delivery note created with ID: {deliveryNoteID}")
 
 @router.get("/pdf", tags=["deliveryNote"], dependencies=[Depends(verifyTokenEmployee)])
-async def get_delivery_note_pdf(deliveryNoteID: str, token: dict[str,str] = Depends(verifyTokenEmployee)):
+async def get_delivery_note_pdf(deliveryNoteID: str, token: dict[str,str] = Depends(verifyTokenEmployee),
+        if_none_match: Annotated[Optional[str], Header()] = None):
     """
     Get the PDF of a delivery note
     """
@@ -95,20 +130,11 @@ async def get_delivery_note_pdf(deliveryNoteID: str, token: dict[str,str] = Depe
         logger.error("Missing delivery note ID")
         raise HTTPException(status_code=400, detail="Missing delivery note ID")
 
-    # Generate the PDF
-    pdf_path = deliveryNotePDF.create_delivery_note_pdf(deliveryNoteID)
+    delivery_note = await run_dao(deliveryNoteDAO.get_delivery_note_by_id, deliveryNoteID)
+    await load_names([delivery_note.employeId], [delivery_note.clientId])
+    document = pdf_document("deliveryNote", delivery_note.deliveryNoteID, delivery_note.date, delivery_note.employeId, delivery_note.clientId, delivery_note.totalPrice, delivery_note.products)
 
-    #extract the filename from the path
-    filename = os.path.basename(pdf_path)
-    
-    if not pdf_path or not os.path.exists(pdf_path):
-        logger.error("Failed to generate PDF")
-        raise HTTPException(status_code=500, detail="Failed to generate PDF")
-    
-    return FileResponse(
-        path=pdf_path, 
-        filename=filename,
-        media_type="application/pdf"
-    )
+    # 304 when the client has this version, else from the cache or rendered in a worker process
+    return await cached_pdf_response(document, if_none_match)
 
     
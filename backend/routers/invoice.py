@@ -1,34 +1,70 @@
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, Header, HTTPException, Query, Response
 from verificator import verifyTokenEmployee
-from fastapi.responses import FileResponse
-import os
+from connect import run_dao, use_async_driver
+from pagination import MAX_PAGE_LIMIT, set_next_cursor
+from jsonResponse import trusted_json_response
+from documentFilter import DocumentFilter
+from datetime import date
+from typing import Annotated, Optional
+from nameLoader import load_names
+from streaming import ndjson_response
 import logging
 
 from DAO.deliveryNoteDAO import DeliveryNoteDAO
+from asyncDAO.deliveryNoteDAO import AsyncDeliveryNoteDAO
 from DAO.productDAO import ProductDAO
+from asyncDAO.productDAO import AsyncProductDAO
 from DAO.invoiceDAO import InvoiceDAO
+from asyncDAO.invoiceDAO import AsyncInvoiceDAO
 from DAO.invoice import Invoice
 from DAO.invoice import InvoiceModel
-import pdf.invoicePDF  as invoicePDF
+from pdf.documentPDF import pdf_document
+from pdf.pdfCache import cached_pdf_response
 
 router = APIRouter()
-invoiceDAO = InvoiceDAO()
-deliveryNoteDAO = DeliveryNoteDAO()
-productDAO = ProductDAO()
+invoiceDAO = AsyncInvoiceDAO() if use_async_driver() else InvoiceDAO()
+deliveryNoteDAO = AsyncDeliveryNoteDAO() if use_async_driver() else DeliveryNoteDAO()
+productDAO = AsyncProductDAO() if use_async_driver() else ProductDAO()
 logger = logging.getLogger("appLogger")
 
+async def invoices_json(invoices: list[Invoice]) -> list[InvoiceModel]:
+    """
+    Load the employee and client names of the invoices and serialize them.
+    """
+    await load_names([invoice.employeId for invoice in invoices], [invoice.clientId for invoice in invoices])
+    return [invoice.get_json() for invoice in invoices]
+
 @router.get("/", tags=["invoice"], dependencies=[Depends(verifyTokenEmployee)])
-async def get_all_invoices(token: str = Depends(verifyTokenEmployee)) -> list[InvoiceModel]:
+async def get_all_invoices(token: str = Depends(verifyTokenEmployee),
+                           limit: Annotated[Optional[int], Query(ge=1, le=MAX_PAGE_LIMIT)] = None, after: Optional[str] = None,
+                           clientID: Optional[int] = None, employeID: Optional[str] = None,
+                           date_from: Optional[date] = None, date_to: Optional[date] = None,
+                           min_totalPrice: Optional[float] = None, max_totalPrice: Optional[float] = None,
+                           stream: bool = False,
+                           response: Response = None) -> list[InvoiceModel]:
     """
-    Get all invoices
+    Get all invoices, or one page of them when a limit is given.
+    The cursor of the next page is sent in the X-Next-Cursor header.
+    clientID, employeID, date_from/date_to and min/max_totalPrice filter the list in the database.
+    With stream=true the whole filtered list is sent as NDJSON, one document per line, read in batches from a
+    server-side cursor. limit and after are ignored.
     """
     logger.debug("Invoices requested")
-    invoices = invoiceDAO.get_all_invoices()
+    filters = DocumentFilter(clientID=clientID, employeID=employeID, date_from=date_from, date_to=date_to,
+                             min_totalPrice=min_totalPrice, max_totalPrice=max_totalPrice)
+    filters.check()
+    if stream:
+        return ndjson_response(lambda: invoiceDAO.stream_invoices(filters), invoices_json)
+    if limit is None and filters.is_empty():
+        invoices = await run_dao(invoiceDAO.get_all_invoices)
+    else:
+        invoices, next_cursor = await run_dao(invoiceDAO.get_invoices_page, limit, after, filters)
+        set_next_cursor(response, next_cursor)
     if not invoices:
         return []
-    invoice_json = [invoice.get_json() for invoice in invoices]
+    invoice_json = await invoices_json(invoices)
     logger.debug(f"Invoices retrieved: {invoice_json}")
-    return invoice_json
+    return trusted_json_response(invoice_json, list[InvoiceModel], response)
 
 @router.post("/", tags=["invoice"], dependencies=[Depends(verifyTokenEmployee)])
 async def create_invoice(invoice_data: dict[str,str], token: dict[str,str] = Depends(verifyTokenEmployee)) -> None:
@@ -52,7 +88,7 @@ async def create_invoice(invoice_data: dict[str,str], token: dict[str,str] = Dep
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     # Get delivery note information from the ID
-    delivery_note = deliveryNoteDAO.get_delivery_note_by_id(deliveryNoteID)
+    delivery_note = await run_dao(deliveryNoteDAO.get_delivery_note_by_id, deliveryNoteID)
     if not delivery_note:
         logger.error("Delivery note not found")
         raise HTTPException(status_code=404, detail="Delivery note not found")
@@ -60,11 +96,6 @@ async def create_invoice(invoice_data: dict[str,str], token: dict[str,str] = Dep
     # format the invoice ID clientID = "cl-xxxxxx" invoiceID = "in-xxxxxx" with the same xxxxxx
     invoiceID = "in-" + deliveryNoteID[3:]
     
-    # check if the invoice already exists
-    existing_invoice = invoiceDAO.check_invoice_exists(invoiceID)
-    if existing_invoice:
-        logger.error("Invoice already exists")
-        raise HTTPException(status_code=400, detail="Invoice already exists")
     # Create the invoice
     invoice = Invoice(
         invoiceID=invoiceID,
@@ -75,12 +106,15 @@ async def create_invoice(invoice_data: dict[str,str], token: dict[str,str] = Dep
         products=delivery_note.products
     )
     
-    # Create the invoice in the database
-    invoiceDAO.create_invoice(invoice)
-    logger.debug(f"Invoice created: {invoice.get_json()}")
+    # Create the invoice in the database, nothing is inserted if the delivery note was already invoiced
+    if not await run_dao(invoiceDAO.create_invoice, invoice):
+        logger.error("Invoice already exists")
+        raise HTTPException(status_code=409, detail="Invoice already exists")
+    logger.debug(f"Invoice created: {invoice.invoiceID}")
     
 @router.get("/pdf", tags=["invoice"], dependencies=[Depends(verifyTokenEmployee)])
-async def get_invoice_pdf(invoiceID: str, token: dict[str,str] = Depends(verifyTokenEmployee)):
+async def get_invoice_pdf(invoiceID: str, token: dict[str,str] = Depends(verifyTokenEmployee),
+        if_none_match: Annotated[Optional[str], Header()] = None):
     """
     Get the PDF of an invoice
     """
@@ -90,19 +124,10 @@ async def get_invoice_pdf(invoiceID: str, token: dict[str,str] = Depends(verifyT
         logger.error("Missing invoice ID")
         raise HTTPException(status_code=400, detail="Missing invoice ID")
 
-    # Generate the PDF
-    pdf_path = invoicePDF.create_invoice_pdf(invoiceID)
+    invoice = await run_dao(invoiceDAO.get_invoice_by_id, invoiceID)
+    await load_names([invoice.employeId], [invoice.clientId])
+    document = pdf_document("invoice", invoice.invoiceID, invoice.date, invoice.employeId, invoice.clientId, invoice.totalPrice, invoice.products)
 
-    #extract the filename from the path
-    filename = os.path.basename(pdf_path)
-    
-    if not pdf_path or not os.path.exists(pdf_path):
-        logger.error("Failed to generate PDF")
-        raise HTTPException(status_code=500, detail="Failed to generate PDF")
-    
-    return FileResponse(
-        path=pdf_path, 
-        filename=filename,
-        media_type="application/pdf"
-    )
+    # 304 when the client has this version, else from the cache or rendered in a worker process
+    return await cached_pdf_response(document, if_none_match)
     
\ No newline at end of file
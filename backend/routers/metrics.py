@@ -0,0 +1,32 @@
+from fastapi import Depends, APIRouter
+import logging
+
+from verificator import verifyTokenAdmin, certificate_store
+from connect import get_pool_stats, use_async_driver
+from asyncConnect import get_async_pool_stats
+from cache import get_cache_stats
+from pdf.renderPool import get_render_pool_stats
+from pdf.pdfCache import get_pdf_cache_stats
+
+# Runtime statistics used to size pools and caches
+
+router = APIRouter()
+logger = logging.getLogger("appLogger")
+
+@router.get("/", tags=["metrics"], dependencies=[Depends(verifyTokenAdmin)])
+async def get_metrics() -> dict[str, dict[str, float]]:
+    """
+    Get runtime statistics of the backend
+    """
+    logger.debug("Metrics requested")
+    metrics = {
+        "database_pool": get_pool_stats(),
+    }
+    if use_async_driver():
+        metrics["async_database_pool"] = get_async_pool_stats()
+    metrics["google_certificates"] = certificate_store.stats()
+    metrics["pdf_render_pool"] = get_render_pool_stats()
+    metrics["pdf_cache"] = get_pdf_cache_stats()
+    for name, stats in get_cache_stats().items():
+        metrics[f"{name}_cache"] = stats
+    return metrics
@@ -1,40 +1,110 @@
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, Header, HTTPException, Query, Response
 from verificator import verifyTokenEmployee
+from connect import run_dao, use_async_driver
+from pagination import MAX_PAGE_LIMIT, set_next_cursor
+from jsonResponse import trusted_json_response
+from documentFilter import DocumentFilter
+from datetime import date
+from typing import Annotated, Optional
+from nameLoader import load_names
+from streaming import ndjson_response
 from pydantic import BaseModel
-from fastapi.responses import FileResponse
-import os
 import logging
 
 
-from DAO.offerDAO import OfferDAO
+from DAO.offerDAO import OfferDAO, use_create_offer_function
+from asyncDAO.offerDAO import AsyncOfferDAO
 from DAO.productDAO import ProductDAO
+from asyncDAO.productDAO import AsyncProductDAO
 from DAO.product import Product
 from DAO.offer import Offer
 from DAO.offer import OfferModel
 
-import pdf.offerPDF  as offerPDF
+from pdf.documentPDF import pdf_document
+from pdf.pdfCache import cached_pdf_response
 
 
 
 
 
 router = APIRouter()
-offerDAO = OfferDAO()
-productDAO = ProductDAO()
+offerDAO = AsyncOfferDAO() if use_async_driver() else OfferDAO()
+productDAO = AsyncProductDAO() if use_async_driver() else ProductDAO()
 logger = logging.getLogger("appLogger")
 
+async def offers_json(offers: list[Offer]) -> list[OfferModel]:
+    """
+    Load the employee and client names of the offers and serialize them.
+    """
+    await load_names([offer.employeID for offer in offers], [offer.clientID for offer in offers])
+    return [offer.get_json() for offer in offers]
+
 @router.get("/", tags=["offer"], dependencies=[Depends(verifyTokenEmployee)])
-async def get_all_offers(token: str = Depends(verifyTokenEmployee)) -> list[OfferModel]:
+async def get_all_offers(token: str = Depends(verifyTokenEmployee),
+                         limit: Annotated[Optional[int], Query(ge=1, le=MAX_PAGE_LIMIT)] = None, after: Optional[str] = None,
+                         clientID: Optional[int] = None, employeID: Optional[str] = None,
+                         date_from: Optional[date] = None, date_to: Optional[date] = None,
+                         min_totalPrice: Optional[float] = None, max_totalPrice: Optional[float] = None,
+                         stream: bool = False,
+                         response: Response = None) -> list[OfferModel]:
     """
-    Get all offers
+    Get all offers, or one page of them when a limit is given.
+    The cursor of the next page is sent in the X-Next-Cursor header.
+    clientID, employeID, date_from/date_to and min/max_totalPrice filter the list in the database.
+    With stream=true the whole filtered list is sent as NDJSON, one document per line, read in batches from a
+    server-side cursor. limit and after are ignored.
     """
     logger.debug("Offers requested")
-    offers = offerDAO.get_all_offers()
+    filters = DocumentFilter(clientID=clientID, employeID=employeID, date_from=date_from, date_to=date_to,
+                             min_totalPrice=min_totalPrice, max_totalPrice=max_totalPrice)
+    filters.check()
+    if stream:
+        return ndjson_response(lambda: offerDAO.stream_offers(filters), offers_json)
+    if limit is None and filters.is_empty():
+        offers = await run_dao(offerDAO.get_all_offers)
+    else:
+        offers, next_cursor = await run_dao(offerDAO.get_offers_page, limit, after, filters)
+        set_next_cursor(response, next_cursor)
     if not offers:
         return []
-    offer_json = [offer.get_json() for offer in offers]
+    offer_json = await offers_json(offers)
     logger.debug(f"Offers retrieved: {offer_json}")
-    return offer_json
+    return trusted_json_response(offer_json, list[OfferModel], response)
+
+def parse_offer_lines(products_data: list[dict[str, str]]) -> list[tuple[int, int]]:
+    """
+    Validate the product lines of a request.
+    :param products_data: The lines of the request, with "id" and "quantity".
+    :return: The (product ID, quantity) lines.
+    """
+    lines = list[tuple[int, int]]()
+    for product_data in products_data:
+        product_id = product_data.get("id")
+        quantity = product_data.get("quantity")
+
+        if not product_id or not quantity:
+            logger.error("Missing required fields in products")
+            raise HTTPException(status_code=400, detail="Missing required fields in products")
+
+        # check product quantity > 0
+        if int(quantity) <= 0:
+            logger.error("Product quantity must be greater than 0")
+            raise HTTPException(status_code=400, detail="Product quantity must be greater than 0")
+
+        lines.append((int(product_id), int(quantity)))
+    return lines
+
+async def get_offer_products(products_data: list[dict[str, str]]) -> list[tuple[Product, int]]:
+    """
+    Validate the product lines of a request and resolve their products with one lookup.
+    :param products_data: The lines of the request, with "id" and "quantity".
+    :return: The (product, quantity) lines.
+    """
+    lines = parse_offer_lines(products_data)
+
+    # Get all the products from the database at once, missing ones raise a 404
+    products = await run_dao(productDAO.get_products_by_ids, [product_id for product_id, _ in lines])
+    return [(products[product_id], quantity) for product_id, quantity in lines]
 
 class createOfferModel(BaseModel):
     clientID: str
@@ -63,38 +133,22 @@ async def create_offer(offer: createOfferModel, token: dict[str,str] = Depends(v
         logger.error("Unauthorized access")
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    products: list[tuple[Product, int]] = []
+    if use_create_offer_function():
+        # Products are checked and priced by the database in the same call
+        offer_id = await run_dao(offerDAO.create_offer_in_database, employee_id, client_id, parse_offer_lines(products_list))
+        logger.debug(f"Offer {offer_id} created")
+        return
+
     logger.debug("processing products")
-    for product_data in products_list:
-        product_id = product_data.get("id")
-        quantity = product_data.get("quantity")
-        
-        if not product_id or not quantity:
-            logger.error("Missing required fields in products")
-            raise HTTPException(status_code=400, detail="Missing required fields in products")
-        
-        # check product quantity > 0
-        if int(quantity) <= 0:
-            logger.error("Product quantity must be greater than 0")
-            raise HTTPException(status_code=400, detail="Product quantity must be greater than 0")
-        
-        # Get the product from the database
-        product = productDAO.get_product_by_id(int(product_id))
-        if not product:
-            logger.error(f"Product with ID {product_id} not found")
-            raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
-        
-        # Append the product and its quantity to the list
-        products.append((product, int(quantity)))
+    products = await get_offer_products(products_list)
 
-        
     # Create the offer
     new_offer = Offer(
         employeId=employee_id,
         clientId=client_id,
         products=products
     )
-    new_offer = offerDAO.create_offer(new_offer)
+    new_offer = await run_dao(offerDAO.create_offer, new_offer)
     if not new_offer:
         logger.error("Failed to create offer")
         raise HTTPException(status_code=500, detail="Failed to create offer")
@@ -130,37 +184,12 @@ async def update_offer(offer: updateOfferModel, token: dict[str,str] = Depends(v
         logger.error("Unauthorized access")
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    products: list[tuple[Product, int]] = []
     logger.debug("Processing products")
+    products = await get_offer_products(products_data)
 
-    for product_data in products_data:
-
-        product_id = product_data.get("id")
-
-        quantity = product_data.get("quantity")
-
-        
-        if not product_id or not quantity:
-            logger.error("Missing required fields in products")
-            raise HTTPException(status_code=400, detail="Missing required fields in products")
-        
-        # check product quantity > 0
-        if int(quantity) <= 0:
-            logger.error("Product quantity must be greater than 0")
-            raise HTTPException(status_code=400, detail="Product quantity must be greater than 0")
-
-        
-        # Get the product from the database
-        product = productDAO.get_product_by_id(int(product_id))
-        if not product:
-            logger.error(f"Product with ID {product_id} not found")
-            raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
-        
-        # Append the product and its quantity to the list
-        products.append((product, int(quantity)))
     # find existing offer
     logger.debug(f"Finding offer with ID {offer_id}")
-    existing_offer = offerDAO.get_offer_by_id(offer_id)
+    existing_offer = await run_dao(offerDAO.get_offer_by_id, offer_id)
     if not existing_offer:
         logger.error(f"Offer with ID {offer_id} not found")
         raise HTTPException(status_code=404, detail=f"Offer with ID {offer_id} not found")
@@ -168,16 +197,17 @@ async def update_offer(offer: updateOfferModel, token: dict[str,str] = Depends(v
     existing_offer.set_products(products)
     
     logger.debug("Updating offer in database")
-    new_offer = offerDAO.update_offer(existing_offer)
+    changes = await run_dao(offerDAO.update_offer, existing_offer)
     
-    if not new_offer:
+    if changes is None:
         logger.error("Failed to update offer")
         raise HTTPException(status_code=500, detail="Failed to update offer")
     
-    logger.debug(f"Offer {offer_id} updated successfully")
+    logger.debug(f"Offer {offer_id} updated successfully: {changes}")
 
 @router.get("/pdf", tags=["offer"], dependencies=[Depends(verifyTokenEmployee)])
-async def get_offer_pdf(offerID: str, token: dict[str,str] = Depends(verifyTokenEmployee)):
+async def get_offer_pdf(offerID: str, token: dict[str,str] = Depends(verifyTokenEmployee),
+        if_none_match: Annotated[Optional[str], Header()] = None):
     """
     Get the PDF of an offer
     """
@@ -187,18 +217,9 @@ async def get_offer_pdf(offerID: str, token: dict[str,str] = Depends(verifyToken
         logger.error("Missing offer ID")
         raise HTTPException(status_code=400, detail="Missing offer ID")
     
-    # Generate the PDF
-    pdf_path = offerPDF.create_offer_pdf(offerID)
-    
-    #extract the filename from the path
-    filename = os.path.basename(pdf_path)
-    
-    if not pdf_path or not os.path.exists(pdf_path):
-        logger.error("Failed to generate PDF")
-        raise HTTPException(status_code=500, detail="Failed to generate PDF")
-    
-    return FileResponse(
-        path=pdf_path, 
-        filename=filename,
-        media_type="application/pdf"
-    )
+    offer = await run_dao(offerDAO.get_offer_by_id, offerID)
+    await load_names([offer.employeID], [offer.clientID])
+    document = pdf_document("offer", offer.offerID, offer.date, offer.employeID, offer.clientID, offer.TotalPrice, offer.products)
+
+    # 304 when the client has this version, else from the cache or rendered in a worker process
+    return await cached_pdf_response(document, if_none_match)
@@ -1,34 +1,70 @@
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, Header, HTTPException, Query, Response
 from verificator import verifyTokenEmployee
-from fastapi.responses import FileResponse
-import os
+from connect import run_dao, use_async_driver
+from pagination import MAX_PAGE_LIMIT, set_next_cursor
+from jsonResponse import trusted_json_response
+from documentFilter import DocumentFilter
+from datetime import date
+from typing import Annotated, Optional
+from nameLoader import load_names
+from streaming import ndjson_response
 import logging
 
 from DAO.offerDAO import OfferDAO
+from asyncDAO.offerDAO import AsyncOfferDAO
 from DAO.productDAO import ProductDAO
+from asyncDAO.productDAO import AsyncProductDAO
 from DAO.orderDAO import OrderDAO
+from asyncDAO.orderDAO import AsyncOrderDAO
 from DAO.order import Order
 from DAO.order import OrderModel
-import pdf.orderPDF  as orderPDF
+from pdf.documentPDF import pdf_document
+from pdf.pdfCache import cached_pdf_response
 
 router = APIRouter()
-orderDAO = OrderDAO()
-offerDAO = OfferDAO()
-productDAO = ProductDAO()
+orderDAO = AsyncOrderDAO() if use_async_driver() else OrderDAO()
+offerDAO = AsyncOfferDAO() if use_async_driver() else OfferDAO()
+productDAO = AsyncProductDAO() if use_async_driver() else ProductDAO()
 logger = logging.getLogger("appLogger")
 
+async def orders_json(orders: list[Order]) -> list[OrderModel]:
+    """
+    Load the employee and client names of the orders and serialize them.
+    """
+    await load_names([order.employeId for order in orders], [order.clientId for order in orders])
+    return [order.get_json() for order in orders]
+
 @router.get("/", tags=["order"], dependencies=[Depends(verifyTokenEmployee)])
-async def get_all_orders(token: str = Depends(verifyTokenEmployee)) -> list[OrderModel]:
+async def get_all_orders(token: str = Depends(verifyTokenEmployee),
+                         limit: Annotated[Optional[int], Query(ge=1, le=MAX_PAGE_LIMIT)] = None, after: Optional[str] = None,
+                         clientID: Optional[int] = None, employeID: Optional[str] = None,
+                         date_from: Optional[date] = None, date_to: Optional[date] = None,
+                         min_totalPrice: Optional[float] = None, max_totalPrice: Optional[float] = None,
+                         stream: bool = False,
+                         response: Response = None) -> list[OrderModel]:
     """
-    Get all orders
+    Get all orders, or one page of them when a limit is given.
+    The cursor of the next page is sent in the X-Next-Cursor header.
+    clientID, employeID, date_from/date_to and min/max_totalPrice filter the list in the database.
+    With stream=true the whole filtered list is sent as NDJSON, one document per line, read in batches from a
+    server-side cursor. limit and after are ignored.
     """
     logger.debug("Orders requested")
-    orders = orderDAO.get_all_orders()
+    filters = DocumentFilter(clientID=clientID, employeID=employeID, date_from=date_from, date_to=date_to,
+                             min_totalPrice=min_totalPrice, max_totalPrice=max_totalPrice)
+    filters.check()
+    if stream:
+        return ndjson_response(lambda: orderDAO.stream_orders(filters), orders_json)
+    if limit is None and filters.is_empty():
+        orders = await run_dao(orderDAO.get_all_orders)
+    else:
+        orders, next_cursor = await run_dao(orderDAO.get_orders_page, limit, after, filters)
+        set_next_cursor(response, next_cursor)
     if not orders:
         return []
-    order_json = [order.get_json() for order in orders]
+    order_json = await orders_json(orders)
     logger.debug(f"Orders retrieved: {order_json}")
-    return order_json
+    return trusted_json_response(order_json, list[OrderModel], response)
 
 @router.post("/", tags=["order"], dependencies=[Depends(verifyTokenEmployee)])
 async def create_order(order_data: dict[str,str], token: dict[str,str] = Depends(verifyTokenEmployee)) -> None:
@@ -52,7 +88,7 @@ async def create_order(order_data: dict[str,str], token: dict[str,str] = Depends
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     # Get offer information from the ID
-    offer = offerDAO.get_offer_by_id(offerID)
+    offer = await run_dao(offerDAO.get_offer_by_id, offerID)
     
     if not offer:
         logger.error("Offer not found")
@@ -61,18 +97,16 @@ async def create_order(order_data: dict[str,str], token: dict[str,str] = Depends
     # format the order ID offerID = "of-xxxxxx" orderID = "or-xxxxxx" with the same xxxxxx
     orderID = "or-" + offerID[3:]
     
-    # check if the order already exists
-    existing_order = orderDAO.check_order_exists(orderID)
-    if existing_order:
-        logger.error("Order already exists")
-        raise HTTPException(status_code=400, detail="Order already exists")
-    # Create the order 
+    # Create the order, nothing is inserted if the offer was already converted
     order = Order(orderID=orderID, employeId=employee_id, clientId=offer.clientID, products=offer.products)
-    orderDAO.create_order(order)
-    logger.debug(f"Order created: {order.get_json()}")
+    if not await run_dao(orderDAO.create_order, order):
+        logger.error("Order already exists")
+        raise HTTPException(status_code=409, detail="Order already exists")
+    logger.debug(f"Order created: {order.orderID}")
 
 @router.get("/pdf", tags=["order"], dependencies=[Depends(verifyTokenEmployee)])
-async def get_order_pdf(orderID: str, token: dict[str,str] = Depends(verifyTokenEmployee)):
+async def get_order_pdf(orderID: str, token: dict[str,str] = Depends(verifyTokenEmployee),
+        if_none_match: Annotated[Optional[str], Header()] = None):
     """
     Get the PDF of an order
     """
@@ -82,20 +116,11 @@ async def get_order_pdf(orderID: str, token: dict[str,str] = Depends(verifyToken
         logger.error("Missing order ID")
         raise HTTPException(status_code=400, detail="Missing order ID")
 
-    # Generate the PDF
-    pdf_path = orderPDF.create_order_pdf(orderID)
+    order = await run_dao(orderDAO.get_order_by_id, orderID)
+    await load_names([order.employeId], [order.clientId])
+    document = pdf_document("order", order.orderID, order.date, order.employeId, order.clientId, order.totalPrice, order.products)
 
-    #extract the filename from the path
-    filename = os.path.basename(pdf_path)
-    
-    if not pdf_path or not os.path.exists(pdf_path):
-        logger.error("Failed to generate PDF")
-        raise HTTPException(status_code=500, detail="Failed to generate PDF")
-    
-    return FileResponse(
-        path=pdf_path, 
-        filename=filename,
-        media_type="application/pdf"
-    )
+    # 304 when the client has this version, else from the cache or rendered in a worker process
+    return await cached_pdf_response(document, if_none_match)
 
     
@@ -1,23 +1,43 @@
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, HTTPException, Query, Response
 import logging
 
 from verificator import verifyToken, verifyTokenCURProduct, verifyTokenEmployee
+from connect import run_dao, use_async_driver
+from pagination import MAX_PAGE_LIMIT, set_next_cursor
+from jsonResponse import trusted_json_response
+from streaming import ndjson_response
+from typing import Annotated, Optional
 
 from DAO.productDAO import ProductDAO
+from asyncDAO.productDAO import AsyncProductDAO
 from DAO.product import Product
 
 router = APIRouter()
-productDAO = ProductDAO()
+productDAO = AsyncProductDAO() if use_async_driver() else ProductDAO()
 logger = logging.getLogger("appLogger")
 
+async def products_json(products: list[Product]) -> list[dict[str, str]]:
+    """
+    Serialize the products.
+    """
+    return [product.get_product_JSON() for product in products]
+
 @router.get("/", tags=["product"], dependencies=[Depends(verifyTokenEmployee)])
-async def get_all_products(token: str = Depends(verifyToken)) -> list[dict[str, str]]:
+async def get_all_products(token: str = Depends(verifyToken), limit: Annotated[Optional[int], Query(ge=1, le=MAX_PAGE_LIMIT)] = None, after: Optional[str] = None, stream: bool = False, response: Response = None) -> list[dict[str, str]]:
     """
-    Get all products
+    Get all products, or one page of them when a limit is given.
+    The cursor of the next page is sent in the X-Next-Cursor header.
+    With stream=true the whole catalog is sent as NDJSON, one product per line, limit and after are ignored.
     """
     logger.debug("Products requested")
-    products = productDAO.get_all_products()
-    return [product.get_product_JSON() for product in products]
+    if stream:
+        return ndjson_response(productDAO.stream_products, products_json)
+    if limit is None:
+        products = await run_dao(productDAO.get_all_products)
+    else:
+        products, next_cursor = await run_dao(productDAO.get_products_page, limit, after)
+        set_next_cursor(response, next_cursor)
+    return trusted_json_response(await products_json(products), list[dict[str, str]], response)
 
 @router.put("/", tags=["product"], dependencies=[Depends(verifyTokenCURProduct)])
 async def update_product(product: dict[str, str], token: str = Depends(verifyToken)) -> dict[str, str]:
@@ -42,7 +62,7 @@ async def update_product(product: dict[str, str], token: str = Depends(verifyTok
         raise HTTPException(status_code=400, detail="Product verification failed")
 
     #Update the product
-    updated_product = productDAO.update_product(new_product)
+    updated_product = await run_dao(productDAO.update_product, new_product)
     logger.info(f"Product updated: {updated_product}")
     return updated_product.get_product_JSON()
 
@@ -70,7 +90,7 @@ async def create_product(product: dict[str, str], token: str = Depends(verifyTok
         raise HTTPException(status_code=400, detail="Product verification failed")
 
     
-    new_product = productDAO.create_product(new_product)
+    new_product = await run_dao(productDAO.create_product, new_product)
     logger.info(f"Product created: {new_product}")
     return new_product.get_product_JSON()
     
\ No newline at end of file
@@ -1,14 +1,19 @@
-from fastapi import Depends, APIRouter
+from fastapi import Depends, APIRouter, Query, Response
 import logging
 
 from verificator import verifyToken, verifyTokenAdmin
+from connect import run_dao, use_async_driver
+from pagination import MAX_PAGE_LIMIT, set_next_cursor
+from jsonResponse import trusted_json_response
+from typing import Annotated, Optional
 
 from DAO.employeDAO import EmployeDAO 
+from asyncDAO.employeDAO import AsyncEmployeDAO
         
 # App user related endpoints
 
 router = APIRouter()
-employeDAO = EmployeDAO()
+employeDAO = AsyncEmployeDAO() if use_async_driver() else EmployeDAO()
 
 @router.get("/", tags=["user"], dependencies=[Depends(verifyToken)])
 async def get_user(token: dict[str,str] = Depends(verifyToken)) -> dict[str,str]:
@@ -23,21 +28,26 @@ async def get_user(token: dict[str,str] = Depends(verifyToken)) -> dict[str,str]
     if "family_name" not in token:
         token["family_name"] = ""
 
-    user = employeDAO.retriveOrCreate(token["sub"], token["name"], token["family_name"], token["email"])
+    user = await run_dao(employeDAO.retriveOrCreate, token["sub"], token["name"], token["family_name"], token["email"])
     logging.info(f"User {user.getUserJSON()} retrieved")
     return user.getUserJSON()
 
 @router.get("/users", tags=["user"], dependencies=[Depends(verifyTokenAdmin)])
-async def get_all_users() -> list[dict[str,str]]:
+async def get_all_users(limit: Annotated[Optional[int], Query(ge=1, le=MAX_PAGE_LIMIT)] = None, after: Optional[str] = None, response: Response = None) -> list[dict[str,str]]:
     """
-    Get all users information
+    Get all users information, or one page of them when a limit is given.
+    The cursor of the next page is sent in the X-Next-Cursor header.
     """
     logging.debug("Information of all users requested")
-    users = employeDAO.get_all_employees()
+    if limit is None:
+        users = await run_dao(employeDAO.get_all_employees)
+    else:
+        users, next_cursor = await run_dao(employeDAO.get_employees_page, limit, after)
+        set_next_cursor(response, next_cursor)
     users_json = [user.getUserJSON() for user in users]
 
     logging.info(f"Information of {len(users)} users retrieved")
-    return users_json
+    return trusted_json_response(users_json, list[dict[str, str]], response)
 
 
 @router.put("/update", tags=["user"], dependencies=[Depends(verifyTokenAdmin)])
@@ -54,8 +64,8 @@ async def update_user(employeData: dict[str,str]) -> dict[str,str]:
         logging.debug("Invalid rol value")
         raise ValueError("rol must be between 0 and 6")
     
-    employe = employeDAO.get_employee_by_id(employe_id)
-    employe = employeDAO.update_employee(employe_id, employe.name, employe.family_name, employe.email, rol)
+    employe = await run_dao(employeDAO.get_employee_by_id, employe_id)
+    employe = await run_dao(employeDAO.update_employee, employe_id, employe.name, employe.family_name, employe.email, rol)
 
     logging.info(f"User {employe_id} updated")
     return employe.getUserJSON()        
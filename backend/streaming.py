@@ -0,0 +1,76 @@
+import json
+import logging
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, TypeVar, Union
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from asyncConnect import bind_async_db_connection
+from connect import bind_db_connection, use_async_driver
+from nameLoader import bind_name_loader
+
+# Media type of the streamed lists, one JSON document per line
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+logger = logging.getLogger("appLogger")
+
+T = TypeVar("T")
+Batches = Union[Iterator[list[T]], AsyncIterator[list[T]]]
+
+
+async def iterate_batches(batches: Batches) -> AsyncIterator[list[T]]:
+    """
+    Iterate the batches of a DAO stream from the event loop.
+    The generators of the sync DAOs are advanced in the threadpool, the ones of the async DAOs awaited.
+    Both are closed when the iteration stops, which closes their server-side cursor.
+    """
+    if hasattr(batches, "__anext__"):
+        try:
+            async for batch in batches:
+                yield batch
+        finally:
+            await batches.aclose()
+        return
+
+    try:
+        while True:
+            batch = await run_in_threadpool(next, batches, None)
+            if batch is None:
+                break
+            yield batch
+    finally:
+        await run_in_threadpool(batches.close)
+
+def ndjson_line(item: Any) -> str:
+    """
+    Serialize one element of a streamed list as a line of NDJSON.
+    """
+    if isinstance(item, BaseModel):
+        return item.model_dump_json() + "\n"
+    return json.dumps(item, default=str) + "\n"
+
+def ndjson_response(open_batches: Callable[[], Batches], serialize: Callable[[list[T]], Awaitable[list[Any]]]) -> StreamingResponse:
+    """
+    Stream a list as NDJSON, batch by batch.
+    The request connection is given back before the body is sent, the body binds a connection and
+    a NameLoader of its own for as long as it runs.
+    :param open_batches: Open the DAO stream, called once the body starts.
+    :param serialize: Turn a batch into the models or dicts sent to the client.
+    :return: The response.
+    """
+    async def body() -> AsyncIterator[str]:
+        async with AsyncExitStack() as stack:
+            await stack.enter_async_context(bind_db_connection())
+            if use_async_driver():
+                await stack.enter_async_context(bind_async_db_connection())
+            stack.enter_context(bind_name_loader())
+
+            count = 0
+            async for batch in iterate_batches(open_batches()):
+                yield "".join(ndjson_line(item) for item in await serialize(batch))
+                count += len(batch)
+            logger.info(f"Streamed {count} rows")
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
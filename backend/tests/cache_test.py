@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+sys.path.append("../")
+
+import cache
+from cache import TTLCache, get_cache_stats, load_cache_env
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache[int, str]("test", 2, 10.0, clock=self.clock)
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get(1))
+        self.cache.set(1, "one")
+        self.assertEqual(self.cache.get(1), "one")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_least_recently_used_evicted(self):
+        self.cache.set(1, "one")
+        self.cache.set(2, "two")
+        self.cache.get(1)
+        self.cache.set(3, "three")
+
+        self.assertIsNone(self.cache.get(2))
+        self.assertEqual(self.cache.get(1), "one")
+        self.assertEqual(self.cache.get(3), "three")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_expiration(self):
+        self.cache.set(1, "one")
+        self.cache.set(2, "two", ttl=2.0)
+
+        self.clock.now = 5.0
+        self.assertIsNone(self.cache.get(2))
+        self.assertEqual(self.cache.get(1), "one")
+
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get(1))
+        self.assertEqual(self.cache.stats()["expirations"], 2)
+
+    def test_invalidate(self):
+        self.cache.set(1, "one")
+        self.cache.set(2, "two")
+        self.cache.invalidate(1)
+
+        self.assertIsNone(self.cache.get(1))
+        self.assertEqual(self.cache.get(2), "two")
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+    def test_disabled(self):
+        cache = TTLCache[int, str]("disabled", 0, 10.0)
+        cache.set(1, "one")
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.stats()["misses"], 0)
+
+    def test_registered_for_metrics(self):
+        self.assertIn("test", get_cache_stats())
+
+class TestLoadCacheEnv(unittest.TestCase):
+    def test_ps_env_found_from_any_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env_path = os.path.join(directory, "ps.env")
+            with open(env_path, "w") as env_file:
+                env_file.write("TEST_CACHE_SIZE=7\nTEST_CACHE_TTL=1.5\n")
+
+            cwd = os.getcwd()
+            os.chdir(tempfile.gettempdir())
+            try:
+                with patch.object(cache, "env_path", env_path), patch.dict("os.environ"):
+                    self.assertEqual(load_cache_env("TEST_CACHE", 1, 2.0), (7, 1.5))
+            finally:
+                os.chdir(cwd)
+
+if __name__ == "__main__":
+    unittest.main()
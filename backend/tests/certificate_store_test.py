@@ -0,0 +1,140 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append("../")
+
+import rsa
+from google.auth import crypt, exceptions, jwt
+
+with patch('connect.get_db_connection') as mock_db_conn:
+    # Create a mock connection
+    mock_connection = MagicMock()
+    mock_db_conn.return_value = mock_connection
+
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    import verificator
+    from certificateStore import CertificateStore
+
+AUDIENCE = "client-id"
+
+def new_key(kid: str) -> tuple[crypt.RSASigner, str]:
+    """
+    Create a signing key and the public key Google would publish for it.
+    """
+    public_key, private_key = rsa.newkeys(1024)
+    signer = crypt.RSASigner.from_string(private_key.save_pkcs1().decode(), key_id=kid)
+    return signer, public_key.save_pkcs1().decode()
+
+def new_token(signer: crypt.RSASigner, **claims) -> str:
+    now = int(time.time())
+    payload = {"iss": "https://accounts.google.com", "aud": AUDIENCE, "sub": "1", "iat": now, "exp": now + 600}
+    payload.update(claims)
+    return jwt.encode(signer, payload).decode()
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class TestCertificateStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.signer, cls.public_key = new_key("key-1")
+        cls.other_signer, cls.other_public_key = new_key("key-2")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "certs.json")
+        self.write_certs({"key-1": self.public_key})
+
+        self.clock = FakeClock()
+        self.store = CertificateStore(self.path, default_max_age=3600.0, refresh_margin=300.0, clock=self.clock)
+
+    def write_certs(self, certs: dict[str, str]) -> None:
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(certs, file)
+
+    def test_verify_locally(self):
+        claims = self.store.verify(new_token(self.signer), AUDIENCE)
+
+        self.assertEqual(claims["sub"], "1")
+        self.store.verify(new_token(self.signer, sub="2"), AUDIENCE)
+        self.assertEqual(self.store.stats()["fetches"], 1)
+
+    def test_rejected_tokens(self):
+        with self.assertRaises(ValueError):
+            self.store.verify(new_token(self.signer), "another-client")
+        with self.assertRaises(ValueError):
+            self.store.verify(new_token(self.signer, exp=int(time.time()) - 60), AUDIENCE)
+        with self.assertRaises(exceptions.GoogleAuthError):
+            self.store.verify(new_token(self.signer, iss="https://example.com"), AUDIENCE)
+
+    def test_unknown_key_refreshes(self):
+        self.store.verify(new_token(self.signer), AUDIENCE)
+
+        # Keys rotated at the source
+        self.write_certs({"key-1": self.public_key, "key-2": self.other_public_key})
+        self.clock.now += 120
+
+        self.assertEqual(self.store.verify(new_token(self.other_signer), AUDIENCE)["sub"], "1")
+        self.assertEqual(self.store.stats()["fetches"], 2)
+
+    def test_background_refresh_before_expiry(self):
+        self.store.get_certs()
+
+        with patch("certificateStore.threading.Thread") as mock_thread:
+            self.clock.now += 3000
+            self.store.get_certs()
+            mock_thread.assert_not_called()
+
+            self.clock.now += 400
+            self.store.get_certs()
+            mock_thread.assert_called_once()
+            mock_thread.return_value.start.assert_called_once()
+
+    def test_expired_certificates_kept_on_failure(self):
+        self.store.get_certs()
+        os.remove(self.path)
+        self.clock.now += 4000
+
+        self.assertIn("key-1", self.store.get_certs())
+        self.assertEqual(self.store.stats()["failures"], 1)
+
+    def test_cache_control_max_age(self):
+        response = MagicMock()
+        response.status = 200
+        response.headers = {"Cache-Control": "public, max-age=20000, must-revalidate", "Age": "500"}
+        response.data = json.dumps({"key-1": self.public_key}).encode()
+
+        store = CertificateStore("https://example.com/certs", clock=self.clock)
+        store._request = MagicMock(return_value=response)
+        store.get_certs()
+
+        self.assertEqual(store.stats()["expires_in"], 19500)
+
+class TestVerificatorOffline(unittest.TestCase):
+    def test_verify_token_with_local_keys(self):
+        signer, public_key = new_key("key-1")
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as file:
+            json.dump({"key-1": public_key}, file)
+        self.addCleanup(os.remove, file.name)
+
+        verificator.token_cache.clear()
+        with patch("verificator.certificate_store", CertificateStore(file.name)), \
+             patch("verificator.CLIENT_ID", AUDIENCE), \
+             patch("verificator.CLIENT_SECRET", "client-secret"):
+            token = HTTPAuthorizationCredentials(scheme="Bearer", credentials=new_token(signer))
+            self.assertEqual(verificator.get_principal(token).sub, "1")
+        verificator.token_cache.clear()
+
+if __name__ == "__main__":
+    unittest.main()
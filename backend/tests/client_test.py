@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
 import asyncio
+import json
 import sys
 
 sys.path.append("../")
@@ -114,7 +115,7 @@ class TestClientRouter(unittest.TestCase):
 
             # Check if the result matches the expected data
             self.mock_client_dao.get_all_clients.assert_called_once()
-            self.assertEqual(result, expected_data)
+            self.assertEqual(json.loads(result.body), expected_data)
 
         asyncio.run(_async_test())
 
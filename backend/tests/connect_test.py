@@ -0,0 +1,187 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import sys
+
+sys.path.append("../")
+
+import psycopg2.extensions
+
+import connect
+import asyncConnect
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        # Replace psycopg2.connect so no database is needed
+        self.patcher = patch("connect.psycopg2.connect", side_effect=lambda **kwargs: self._new_connection())
+        self.mock_connect = self.patcher.start()
+
+        self.pool = connect.ConnectionPool(1, 2, 0.05, dbname="test")
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def _new_connection(self) -> MagicMock:
+        connection = MagicMock()
+        connection.closed = 0
+        connection.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        return connection
+
+    def test_checkout_and_return(self):
+        # The min_size connection is opened with the pool
+        self.mock_connect.assert_called_once_with(dbname="test")
+        connection = self.pool.getconn()
+        self.assertEqual(self.pool.stats()["in_use"], 1)
+
+        self.pool.putconn(connection)
+        stats = self.pool.stats()
+        self.assertEqual((stats["in_use"], stats["idle"], stats["checkouts"]), (0, 1, 1))
+        connection.close.assert_not_called()
+        self.assertIs(self.pool.getconn(), connection)
+        self.assertEqual(self.mock_connect.call_count, 1)
+
+    def test_connections_above_min_size_reused(self):
+        first = self.pool.getconn()
+        second = self.pool.getconn()
+        self.assertEqual(self.mock_connect.call_count, 2)
+
+        # in_use is above min_size, the returned connections are kept anyway
+        self.pool.putconn(first)
+        self.pool.putconn(second)
+        self.assertEqual(self.pool.stats()["idle"], 2)
+        first.close.assert_not_called()
+        second.close.assert_not_called()
+
+        self.assertEqual({self.pool.getconn(), self.pool.getconn()}, {first, second})
+        self.assertEqual(self.mock_connect.call_count, 2)
+
+    def test_checkout_timeout(self):
+        self.pool.getconn()
+        self.pool.getconn()
+
+        # Both slots are taken, the third checkout has to time out
+        with self.assertRaises(connect.PoolTimeoutError):
+            self.pool.getconn()
+        self.assertEqual(self.pool.stats()["timeouts"], 1)
+
+    def test_open_transaction_rolled_back(self):
+        connection = self.pool.getconn()
+        connection.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+
+        self.pool.putconn(connection)
+
+        connection.rollback.assert_called_once()
+        self.assertEqual(self.pool.stats()["idle"], 1)
+
+    def test_broken_connection_replaced(self):
+        connection = self.pool.getconn()
+        connection.closed = 2
+        self.pool.putconn(connection)
+        self.assertEqual(self.pool.stats()["idle"], 0)
+
+        self.assertIsNot(self.pool.getconn(), connection)
+        self.assertEqual(self.mock_connect.call_count, 2)
+
+    def test_closed_while_idle_replaced(self):
+        connection = self.pool.getconn()
+        self.pool.putconn(connection)
+        connection.closed = 1
+
+        self.assertIsNot(self.pool.getconn(), connection)
+
+    def test_closeall(self):
+        idle = self.pool.getconn()
+        in_use = self.pool.getconn()
+        self.pool.putconn(idle)
+
+        self.pool.closeall()
+        idle.close.assert_called_once()
+        in_use.close.assert_not_called()
+
+        # Closed when returned
+        self.pool.putconn(in_use)
+        in_use.close.assert_called_once()
+        self.assertEqual(self.pool.stats()["idle"], 0)
+
+    def test_request_connection_is_lazy(self):
+        async def _async_test():
+            with patch("connect.DatabasePool.get_instance", return_value=self.pool), \
+                 patch.object(self.pool, "getconn", wraps=self.pool.getconn) as getconn:
+                dependency = connect.get_db()
+                await dependency.__anext__()
+
+                # Nothing is checked out until a DAO asks for the connection
+                getconn.assert_not_called()
+                connection = connect.get_db_connection()
+                self.assertIs(connect.get_db_connection(), connection)
+                getconn.assert_called_once()
+
+                with self.assertRaises(StopAsyncIteration):
+                    await dependency.__anext__()
+
+            self.assertEqual(self.pool.stats()["in_use"], 0)
+            connection.close.assert_not_called()
+
+        asyncio.run(_async_test())
+
+    def test_no_connection_bound(self):
+        with self.assertRaises(RuntimeError):
+            connect.get_db_connection()
+
+class TestRunDao(unittest.TestCase):
+    def test_async_method_is_awaited(self):
+        async def _async_test():
+            async def get_all():
+                return ["async"]
+
+            self.assertEqual(await connect.run_dao(get_all), ["async"])
+
+        asyncio.run(_async_test())
+
+    def test_sync_method_runs_in_threadpool(self):
+        async def _async_test():
+            import threading
+            loop_thread = threading.get_ident()
+
+            def get_by_id(item_id: int) -> tuple[int, bool]:
+                return item_id, threading.get_ident() != loop_thread
+
+            self.assertEqual(await connect.run_dao(get_by_id, 3), (3, True))
+
+        asyncio.run(_async_test())
+
+    def test_request_connection_visible_in_threadpool(self):
+        async def _async_test():
+            holder = MagicMock()
+            token = connect._request_connection.set(holder)
+            try:
+                await connect.run_dao(connect.get_db_connection)
+            finally:
+                connect._request_connection.reset(token)
+            holder.get.assert_called_once()
+
+        asyncio.run(_async_test())
+
+class TestAsyncDatabasePool(unittest.TestCase):
+    def test_opened_once_by_concurrent_requests(self):
+        async def _async_test():
+            async def slow_open():
+                # Give the other requests the time to arrive while the pool opens
+                await asyncio.sleep(0.01)
+
+            with patch("asyncConnect.AsyncConnectionPool") as mock_pool_class, \
+                 patch("asyncConnect.load_database_env", return_value=("db", "user", "password", "host")), \
+                 patch.object(asyncConnect.AsyncDatabasePool, "_lock", asyncio.Lock()), \
+                 patch.object(asyncConnect.AsyncDatabasePool, "_instance", None):
+                mock_pool_class.return_value.open = AsyncMock(side_effect=slow_open)
+
+                pools = await asyncio.gather(*[asyncConnect.AsyncDatabasePool.get_instance() for _ in range(5)])
+
+            mock_pool_class.assert_called_once()
+            mock_pool_class.return_value.open.assert_awaited_once()
+            self.assertTrue(all(pool is mock_pool_class.return_value for pool in pools))
+
+        asyncio.run(_async_test())
+
+if __name__ == "__main__":
+    unittest.main()
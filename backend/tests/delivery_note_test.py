@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
 import asyncio
+import json
 import datetime
 import sys
 
@@ -51,8 +52,7 @@ class TestDeliveryNoteDAO(unittest.TestCase):
                 "orderID": "72747"
             }
             
-            with patch("routers.order.OrderDAO.get_order_by_id") as mock_get_order, \
-                patch("routers.deliveryNote.deliveryNoteDAO.check_delivery_note_exists", return_value=False):
+            with patch("routers.order.OrderDAO.get_order_by_id") as mock_get_order:
                 mock_order = MagicMock(spec=Order)
                 mock_order.clientId = "72747"
                 mock_order.products = [(product, 2)]
@@ -156,8 +156,8 @@ class TestDeliveryNoteDAO(unittest.TestCase):
                 expected_data = [note_obj_1.get_json(), note_obj_2.get_json()]
 
                 response = await self.delivery_note_module.get_all_delivery_notes("1")
-                self.assertIsInstance(response, list)
-                self.assertEqual(response, expected_data)
+                self.assertEqual(response.media_type, "application/json")
+                self.assertEqual(json.loads(response.body), [model.model_dump(mode="json") for model in expected_data])
 
         asyncio.run(_async_test())
 
@@ -217,6 +217,58 @@ class TestDeliveryNoteDAO(unittest.TestCase):
                 self.assertEqual(str(context.exception), "404: Order not found")
 
         asyncio.run(_async_test())
-        
+
+    def test_create_delivery_note_already_exists(self):
+        async def _async_test():
+            product = Product(productId=1, name="Test Product", description="Test Description", stock=100, minStock=1, maxStock=10, purchasePrice=5.0, sellPrice=10.0)
+            self.mock_delivery_note_dao.create_delivery_note.return_value = False
+
+            with patch("routers.order.OrderDAO.get_order_by_id") as mock_get_order:
+                mock_order = MagicMock(spec=Order)
+                mock_order.clientId = "72747"
+                mock_order.products = [(product, 2)]
+                mock_get_order.return_value = mock_order
+
+                with self.assertRaises(Exception) as context:
+                    await self.delivery_note_module.create_delivery_note({"orderID": "or-000001"}, token={"sub": "1"})
+                self.assertEqual(str(context.exception), "409: Delivery note already exists")
+
+        asyncio.run(_async_test())
+
+class TestDeliveryNoteDAOCreate(unittest.TestCase):
+    def setUp(self):
+        self.cursor = MagicMock()
+        self.connection = MagicMock()
+        self.connection.cursor.return_value.__enter__.return_value = self.cursor
+
+        self.patchers = [
+            patch("DAO.deliveryNoteDAO.get_db_connection", return_value=self.connection),
+            patch("DAO.deliveryNoteDAO.write_lines"),
+        ]
+        self.patchers[0].start()
+        self.write_lines = self.patchers[1].start()
+        self.delivery_note = DeliveryNote(deliveryNoteID="dn-000001", employeId="1", clientId="1", products=[], totalPrice=0)
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_create(self):
+        self.cursor.fetchone.return_value = ("dn-000001",)
+
+        self.assertTrue(DeliveryNoteDAO().create_delivery_note(self.delivery_note))
+        self.assertIn("ON CONFLICT", self.cursor.execute.call_args.args[0])
+        self.write_lines.assert_called_once()
+        self.connection.commit.assert_called_once()
+
+    def test_create_conflict(self):
+        # ON CONFLICT DO NOTHING returns no row
+        self.cursor.fetchone.return_value = None
+
+        self.assertFalse(DeliveryNoteDAO().create_delivery_note(self.delivery_note))
+        self.assertEqual(self.cursor.execute.call_count, 1)
+        self.write_lines.assert_not_called()
+        self.connection.rollback.assert_called_once()
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,54 @@
+import unittest
+from datetime import date
+import sys
+
+sys.path.append("../")
+
+from fastapi import HTTPException
+
+from documentFilter import DocumentFilter
+from pagination import document_page_query, encode_cursor
+
+class TestDocumentFilter(unittest.TestCase):
+    def test_empty(self):
+        filters = DocumentFilter()
+
+        self.assertTrue(filters.is_empty())
+        self.assertEqual(filters.clauses(), ([], []))
+
+    def test_clauses(self):
+        filters = DocumentFilter(clientID=7, employeID="emp1", date_from=date(2025, 5, 1), date_to=date(2025, 5, 31), min_totalPrice=10, max_totalPrice=100)
+
+        clauses, params = filters.clauses()
+        self.assertFalse(filters.is_empty())
+        self.assertEqual(clauses, ['"ClientID" = %s', '"EmployeID" = %s', '"Date" >= %s', '"Date" <= %s', '"TotalPrice" >= %s', '"TotalPrice" <= %s'])
+        self.assertEqual(params, [7, "emp1", date(2025, 5, 1), date(2025, 5, 31), 10, 100])
+
+    def test_values_are_parameters(self):
+        clauses, params = DocumentFilter(employeID="'; DROP TABLE \"Invoices\"; --").clauses()
+
+        self.assertEqual(clauses, ['"EmployeID" = %s'])
+        self.assertEqual(params, ["'; DROP TABLE \"Invoices\"; --"])
+
+    def test_empty_ranges_rejected(self):
+        for filters in (DocumentFilter(date_from=date(2025, 6, 1), date_to=date(2025, 5, 1)), DocumentFilter(min_totalPrice=10, max_totalPrice=5)):
+            with self.assertRaises(HTTPException) as context:
+                filters.check()
+            self.assertEqual(context.exception.status_code, 400)
+
+        DocumentFilter(date_from=date(2025, 5, 1), date_to=date(2025, 5, 1)).check()
+
+    def test_filtered_page_query(self):
+        cursor = encode_cursor(date(2025, 5, 20), "in-000010")
+        query, params = document_page_query('"Invoices"', '"InvoiceID"', 20, cursor, DocumentFilter(clientID=7, date_from=date(2025, 5, 1)))
+
+        self.assertIn('WHERE "ClientID" = %s AND "Date" >= %s AND ("Date", "InvoiceID") < (%s, %s)', query)
+        self.assertEqual(params, [7, date(2025, 5, 1), date(2025, 5, 20), "in-000010", 21])
+
+    def test_filtered_query_without_limit(self):
+        _, params = document_page_query('"Invoices"', '"InvoiceID"', None, None, DocumentFilter(clientID=7))
+
+        self.assertEqual(params, [7, None])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from datetime import date
+import json
+import os
+import re
+import sys
+
+sys.path.append("../")
+
+with patch('connect.get_db_connection') as mock_db_conn:
+    # Create a mock connection
+    mock_connection = MagicMock()
+    mock_db_conn.return_value = mock_connection
+
+    import psycopg2
+
+    from DAO.offerDAO import OFFER_PRODUCTS_QUERY
+    from DAO.orderDAO import ORDER_LINES_QUERY
+    from DAO.deliveryNoteDAO import DELIVERY_NOTE_LINES_QUERY
+    from DAO.invoiceDAO import INVOICE_LINES_QUERY
+    from documentFilter import DocumentFilter
+    from pagination import document_page_query, encode_cursor
+    from migrations.runner import load_migrations, split_statements
+
+# libpq connection string of a database with the sellcontrol schema, for example the one of docker compose:
+# TEST_DATABASE_DSN="host=localhost dbname=sellcontrol user=pi password=changeme!"
+TEST_DATABASE_DSN = os.getenv("TEST_DATABASE_DSN")
+# Version of the migration with the indexes of the document tables
+INDEX_MIGRATION = 1
+
+DOCUMENTS = 20000
+CLIENTS = 200
+EMPLOYES = 20
+PRODUCTS = 500
+FIRST_ID = 1000000
+
+# table, ID column, ID prefix, line table
+DOCUMENT_TABLES = [
+    ("Offers", "OfferID", "of", "ProdOfe"),
+    ("Orders", "OrderID", "or", "ProdOrd"),
+    ("DeliveryNotes", "DeliveryNoteID", "dn", "ProdDn"),
+    ("Invoices", "InvoiceID", "in", "ProdInv"),
+]
+LARGE_TABLES = {table for table, _, _, _ in DOCUMENT_TABLES} | {lines for _, _, _, lines in DOCUMENT_TABLES}
+
+def migration_statements(version: int) -> list[str]:
+    """
+    Read the statements of a migration, CONCURRENTLY is dropped because the test runs in a transaction.
+    """
+    migration = next(migration for migration in load_migrations() if migration.version == version)
+    return [statement.replace("CONCURRENTLY ", "") for statement in split_statements(migration.sql)]
+
+def seq_scans(plan: dict) -> list[str]:
+    """
+    Tables read with a sequential scan anywhere in an EXPLAIN (FORMAT JSON) plan.
+    """
+    tables = [plan["Relation Name"]] if plan["Node Type"] == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        tables.extend(seq_scans(child))
+    return tables
+
+@unittest.skipUnless(TEST_DATABASE_DSN, "TEST_DATABASE_DSN not set")
+class TestQueryPlans(unittest.TestCase):
+    """
+    Seed a local database, apply the index migration and check the plans of the DAO queries.
+    Everything runs in one transaction that is rolled back, the database is left as it was.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.connection = psycopg2.connect(TEST_DATABASE_DSN)
+        cls.cursor = cls.connection.cursor()
+        for statement in migration_statements(INDEX_MIGRATION):
+            cls.cursor.execute(statement)
+        cls.seed(cls.cursor)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.connection.rollback()
+        cls.connection.close()
+
+    @staticmethod
+    def seed(cursor) -> None:
+        cursor.execute("""
+        INSERT INTO "Employes" ("EmployeID", "Name", "Family_name", "Email", "Rol")
+        SELECT 'explain-emp-' || i, 'Name', 'Family name', 'explain@example.com', 2
+        FROM generate_series(1, %s) i;
+        """, (EMPLOYES,))
+        cursor.execute("""
+        INSERT INTO "Clients" ("ClientID", "CompanyName", "CIF", "Address", "Email", "Phone", "Contact")
+        OVERRIDING SYSTEM VALUE
+        SELECT %s + i, 'Company', 'B00000000', 'Street', 'c@example.com', 600000000, 'Contact'
+        FROM generate_series(1, %s) i;
+        """, (FIRST_ID, CLIENTS))
+        cursor.execute("""
+        INSERT INTO "Products" ("ProductID", "Name", "Description", "Stock", "MaxStock", "MinStock", "Location", "PurchasePrice", "SellPrice")
+        SELECT %s + i, 'Product', 'Description', 100, 200, 10, 'A1', 5, 10
+        FROM generate_series(1, %s) i;
+        """, (FIRST_ID, PRODUCTS))
+
+        for table, id_column, prefix, lines in DOCUMENT_TABLES:
+            # Three years of documents, three lines each
+            cursor.execute(f"""
+            INSERT INTO "{table}" ("{id_column}", "EmployeID", "ClientID", "Date", "TotalPrice")
+            SELECT 'explain-{prefix}-' || lpad(i::text, 6, '0'), 'explain-emp-' || (1 + i %% %s), %s + 1 + i %% %s,
+                   DATE '2023-01-01' + i %% 1095, i %% 5000
+            FROM generate_series(1, %s) i;
+            """, (EMPLOYES, FIRST_ID, CLIENTS, DOCUMENTS))
+            cursor.execute(f"""
+            INSERT INTO "{lines}" ("{id_column}", "ProductID", "Quantity")
+            SELECT 'explain-{prefix}-' || lpad(i::text, 6, '0'), %s + 1 + (i * 3 + k) %% %s, 1 + k
+            FROM generate_series(1, %s) i, generate_series(0, 2) k;
+            """, (FIRST_ID, PRODUCTS, DOCUMENTS))
+
+        for table in ["Employes", "Clients", "Products", *sorted(LARGE_TABLES)]:
+            cursor.execute(f'ANALYZE "{table}";')
+
+    def explain(self, query: str, params) -> dict:
+        self.cursor.execute("EXPLAIN (FORMAT JSON) " + query.strip(), params)
+        plan = self.cursor.fetchone()[0]
+        return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+    def assertNoSeqScan(self, query: str, params) -> None:
+        plan = self.explain(query, params)
+        scanned = [table for table in seq_scans(plan) if table in LARGE_TABLES]
+        statement = re.sub(r"\s+", " ", query).strip()
+        self.assertEqual(scanned, [], f"Sequential scan of {scanned} in: {statement}\n{json.dumps(plan, indent=1)}")
+
+    def test_document_pages(self):
+        for table, id_column, prefix, _ in DOCUMENT_TABLES:
+            with self.subTest(table=table):
+                cursor = encode_cursor(date(2024, 6, 1), f"explain-{prefix}-010000")
+                self.assertNoSeqScan(*document_page_query(f'"{table}"', f'"{id_column}"', 50, None))
+                self.assertNoSeqScan(*document_page_query(f'"{table}"', f'"{id_column}"', 50, cursor))
+
+    def test_filtered_documents(self):
+        filters = [
+            DocumentFilter(clientID=FIRST_ID + 7),
+            DocumentFilter(employeID="explain-emp-3"),
+            DocumentFilter(date_from=date(2024, 5, 1), date_to=date(2024, 5, 31)),
+            DocumentFilter(clientID=FIRST_ID + 7, date_from=date(2024, 5, 1), date_to=date(2024, 5, 31)),
+        ]
+        for table, id_column, _, _ in DOCUMENT_TABLES:
+            for document_filter in filters:
+                with self.subTest(table=table, filters=document_filter):
+                    self.assertNoSeqScan(*document_page_query(f'"{table}"', f'"{id_column}"', 50, None, document_filter))
+
+            # Without a limit only a selective filter can avoid reading the table
+            with self.subTest(table=table, limit=None):
+                self.assertNoSeqScan(*document_page_query(f'"{table}"', f'"{id_column}"', None, None, filters[0]))
+
+    def test_document_lines(self):
+        queries = [
+            (OFFER_PRODUCTS_QUERY, "of"),
+            (ORDER_LINES_QUERY, "or"),
+            (DELIVERY_NOTE_LINES_QUERY, "dn"),
+            (INVOICE_LINES_QUERY, "in"),
+        ]
+        for query, prefix in queries:
+            with self.subTest(prefix=prefix):
+                ids = [f"explain-{prefix}-{i:06d}" for i in range(1000, 1050)]
+                self.assertNoSeqScan(query, (ids,))
+
+class TestMigrationStatements(unittest.TestCase):
+    def test_indexes_of_the_migration(self):
+        statements = migration_statements(INDEX_MIGRATION)
+
+        self.assertTrue(all(statement.strip().startswith("CREATE INDEX IF NOT EXISTS") for statement in statements))
+        indexed = " ".join(statements)
+        for table in ("ProdOrd", "ProdDn", "ProdInv", "Offers", "Orders", "DeliveryNotes", "Invoices"):
+            self.assertIn(f'public."{table}"', indexed)
+
+if __name__ == "__main__":
+    unittest.main()
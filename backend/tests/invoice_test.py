@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
 import asyncio
+import json
 import datetime
 import sys
 
@@ -71,8 +72,7 @@ class TestInvoiceDAO(unittest.TestCase):
             invoice_obj.get_json = MagicMock(return_value=expected_json)
 
             with patch("routers.invoice.deliveryNoteDAO.get_delivery_note_by_id") as mock_get_delivery_note, \
-                 patch("DAO.invoice.Invoice.get_json") as mock_get_json, \
-                 patch("routers.invoice.invoiceDAO.check_invoice_exists", return_value=False):
+                 patch("DAO.invoice.Invoice.get_json") as mock_get_json:
                 
                 mock_delivery_note = MagicMock(spec=DeliveryNote)
                 mock_delivery_note.deliveryNoteID = "72345"
@@ -101,6 +101,8 @@ class TestInvoiceDAO(unittest.TestCase):
 
                 # Check if the result matches the expected data
                 self.mock_invoice_dao.create_invoice.assert_called_once()
+                # The invoice is not serialized after being created, that would look up its employee and client
+                mock_get_json.assert_not_called()
 
         asyncio.run(_async_test())
 
@@ -150,11 +152,38 @@ class TestInvoiceDAO(unittest.TestCase):
                 result = await self.invoice_module.get_all_invoices(token={"sub": "1"})
 
                 # Check if the result matches the expected data
+                result = json.loads(result.body)
                 self.assertEqual(len(result), 1)
-                self.assertEqual(result[0].invoiceID, invoice_obj.invoiceID)
+                self.assertEqual(result[0]["invoiceID"], invoice_obj.invoiceID)
 
         asyncio.run(_async_test())
     
+    def test_get_invoices_filtered(self):
+        async def _async_test():
+            self.mock_invoice_dao.get_invoices_page.return_value = ([], None)
+
+            result = await self.invoice_module.get_all_invoices(token={"sub": "1"}, clientID=82345,
+                                                                date_from=datetime.date(2025, 5, 1), date_to=datetime.date(2025, 5, 31))
+
+            # Filters without a limit return every matching invoice
+            self.assertEqual(result, [])
+            limit, after, filters = self.mock_invoice_dao.get_invoices_page.call_args.args
+            self.assertIsNone(limit)
+            self.assertIsNone(after)
+            self.assertEqual(filters.clientID, 82345)
+            self.mock_invoice_dao.get_all_invoices.assert_not_called()
+
+        asyncio.run(_async_test())
+
+    def test_get_invoices_empty_date_range(self):
+        async def _async_test():
+            with self.assertRaises(invoice.HTTPException) as context:
+                await self.invoice_module.get_all_invoices(token={"sub": "1"}, date_from=datetime.date(2025, 6, 1), date_to=datetime.date(2025, 5, 1))
+            self.assertEqual(context.exception.status_code, 400)
+            self.mock_invoice_dao.get_invoices_page.assert_not_called()
+
+        asyncio.run(_async_test())
+
     def test_create_invoice_missing_fields(self):
         async def _async_test():
             # Simulate a token
@@ -204,5 +233,26 @@ class TestInvoiceDAO(unittest.TestCase):
 
         asyncio.run(_async_test())
 
+    def test_create_invoice_already_exists(self):
+        async def _async_test():
+            product = Product(productId=1, name="Test Product", description="Test Description", stock=100, minStock=1, maxStock=10, purchasePrice=5.0, sellPrice=10.0)
+            self.mock_invoice_dao.create_invoice.return_value = False
+
+            with patch("routers.invoice.deliveryNoteDAO.get_delivery_note_by_id") as mock_get_delivery_note:
+                mock_delivery_note = MagicMock(spec=DeliveryNote)
+                mock_delivery_note.clientId = "1"
+                mock_delivery_note.date = datetime.date.today()
+                mock_delivery_note.totalPrice = 20.0
+                mock_delivery_note.products = [(product, 2)]
+                mock_get_delivery_note.return_value = mock_delivery_note
+
+                with self.assertRaises(invoice.HTTPException) as context:
+                    await self.invoice_module.create_invoice({"DeliveryNoteID": "dn-000001"}, token={"sub": "1"})
+
+                self.assertEqual(context.exception.status_code, 409)
+                self.assertEqual(context.exception.detail, "Invoice already exists")
+
+        asyncio.run(_async_test())
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
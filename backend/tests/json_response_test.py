@@ -0,0 +1,36 @@
+import unittest
+from datetime import date
+import json
+import sys
+
+sys.path.append("../")
+
+from fastapi import Response
+
+from jsonResponse import JSON_MEDIA_TYPE, trusted_json_response
+from pagination import NEXT_CURSOR_HEADER, set_next_cursor
+from DAO.offer import OfferModel, ProductInOffer
+
+class TestTrustedJSONResponse(unittest.TestCase):
+    def test_models(self):
+        offer = OfferModel(offerID="of-000001", employeID="1", employeName="John Doe", clientID="2", clientName="Company",
+                           date=date(2025, 1, 31), totalPrice=30.0, products=[ProductInOffer(id=1, name="Product 1", quantity=3)])
+
+        result = trusted_json_response([offer], list[OfferModel])
+
+        self.assertEqual(result.media_type, JSON_MEDIA_TYPE)
+        self.assertEqual(json.loads(result.body), [offer.model_dump(mode="json")])
+        self.assertEqual(json.loads(result.body)[0]["date"], "2025-01-31")
+
+    def test_keeps_route_headers(self):
+        response = Response()
+        set_next_cursor(response, "next-cursor")
+
+        result = trusted_json_response([{"productId": "1"}], list[dict[str, str]], response)
+
+        self.assertEqual(result.headers[NEXT_CURSOR_HEADER], "next-cursor")
+        # The length is the one of the body, not the one of the empty route response
+        self.assertEqual(result.headers["content-length"], str(len(result.body)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import sys
+
+sys.path.append("../")
+
+with patch('connect.get_db_connection') as mock_db_conn:
+    # Create a mock connection
+    mock_connection = MagicMock()
+    mock_db_conn.return_value = mock_connection
+
+    from DAO.lineWriter import LINE_TABLES, LineChanges, copy_lines_data, upsert_lines, upsert_lines_query, write_lines
+    from DAO.offer import Offer
+    from DAO.offerDAO import OfferDAO
+    from DAO.product import Product
+    from asyncDAO.lineWriter import values_lines_query, write_lines as async_write_lines
+
+def make_lines(count: int) -> list[tuple[Product, int]]:
+    return [
+        (Product(productId=i, name=f"Product {i}", description="", stock=10, maxStock=20, minStock=5, purchasePrice=5, sellPrice=10), i % 3 + 1)
+        for i in range(1, count + 1)
+    ]
+
+class TestLineWriter(unittest.TestCase):
+    def setUp(self):
+        self.cursor = MagicMock()
+        self.patcher = patch("DAO.lineWriter.psycopg2.extras.execute_values")
+        self.execute_values = self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_small_document_single_insert(self):
+        write_lines(self.cursor, "ProdOrd", "or-1", make_lines(3), copy_threshold=10)
+
+        self.execute_values.assert_called_once()
+        cursor, query, rows = self.execute_values.call_args.args
+        self.assertIs(cursor, self.cursor)
+        self.assertEqual(query, 'INSERT INTO "ProdOrd" ("OrderID", "ProductID", "Quantity") VALUES %s;')
+        self.assertEqual(rows, [("or-1", 1, 2), ("or-1", 2, 3), ("or-1", 3, 1)])
+        # Every line in the same statement
+        self.assertEqual(self.execute_values.call_args.kwargs["page_size"], 3)
+        self.cursor.copy_expert.assert_not_called()
+
+    def test_large_document_copy(self):
+        write_lines(self.cursor, "ProdInv", "in-1", make_lines(10), copy_threshold=10)
+
+        self.execute_values.assert_not_called()
+        self.cursor.copy_expert.assert_called_once()
+        query, data = self.cursor.copy_expert.call_args.args
+        self.assertEqual(query, 'COPY "ProdInv" ("InvoiceID", "ProductID", "Quantity") FROM STDIN;')
+        rows = data.getvalue().splitlines()
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0], "in-1\t1\t2")
+
+    def test_no_lines(self):
+        write_lines(self.cursor, "ProdDn", "dn-1", [])
+
+        self.execute_values.assert_not_called()
+        self.cursor.copy_expert.assert_not_called()
+
+    def test_every_line_table(self):
+        for table, column in LINE_TABLES.items():
+            with self.subTest(table=table):
+                write_lines(self.cursor, table, "id-1", make_lines(1))
+                self.assertIn(f'"{table}" ("{column}", "ProductID", "Quantity")', self.execute_values.call_args.args[1])
+
+    def test_repeated_product_is_merged(self):
+        lines = make_lines(2)
+
+        write_lines(self.cursor, "ProdOrd", "or-1", [lines[0], lines[1], (lines[0][0], 4)], copy_threshold=10)
+
+        # One row per product, as upsert_lines writes them
+        self.assertEqual(self.execute_values.call_args.args[2], [("or-1", 1, 6), ("or-1", 2, 3)])
+
+    def test_repeated_product_is_merged_in_copy(self):
+        lines = make_lines(1)
+
+        write_lines(self.cursor, "ProdOrd", "or-1", [lines[0], lines[0]], copy_threshold=1)
+
+        self.assertEqual(self.cursor.copy_expert.call_args.args[1].getvalue(), "or-1\t1\t4\n")
+
+    def test_copy_escapes_text(self):
+        self.assertEqual(copy_lines_data([("a\tb\\c\nd", 1, None)]), "a\\tb\\\\c\\nd\t1\t\\N\n")
+
+class TestUpsertLines(unittest.TestCase):
+    def test_single_statement_with_changes(self):
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [("deleted", 1, 2), ("inserted", 4, 1), ("updated", 5, 7)]
+        product = make_lines(5)
+
+        changes = upsert_lines(cursor, "ProdOfe", "of-1", [product[1], product[3], (product[4][0], 7)])
+
+        cursor.execute.assert_called_once_with(upsert_lines_query("ProdOfe"), ([2, 4, 5], [3, 2, 7], "of-1", "of-1"))
+        self.assertEqual(changes, LineChanges(inserted=[(4, 1)], updated=[(5, 7)], deleted=[(1, 2)]))
+        self.assertFalse(changes.is_empty())
+
+    def test_unchanged_lines(self):
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+
+        self.assertTrue(upsert_lines(cursor, "ProdOfe", "of-1", make_lines(2)).is_empty())
+
+    def test_repeated_product_is_merged(self):
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+        line = make_lines(1)[0]
+
+        upsert_lines(cursor, "ProdOfe", "of-1", [line, (line[0], 4)])
+
+        self.assertEqual(cursor.execute.call_args.args[1][:2], ([1], [6]))
+
+    def test_only_differing_rows_are_written(self):
+        query = upsert_lines_query("ProdOfe")
+
+        self.assertIn('ON CONFLICT ("ProductID", "OfferID") DO UPDATE', query)
+        self.assertIn('IS DISTINCT FROM EXCLUDED."Quantity"', query)
+
+class TestAsyncLineWriter(unittest.TestCase):
+    def test_small_document_single_insert(self):
+        cursor = MagicMock()
+        cursor.execute = AsyncMock()
+
+        asyncio.run(async_write_lines(cursor, "ProdOfe", "of-1", make_lines(2), copy_threshold=10))
+
+        cursor.execute.assert_awaited_once_with(values_lines_query("ProdOfe", 2), ["of-1", 1, 2, "of-1", 2, 3])
+        self.assertIn("VALUES (%s, %s, %s), (%s, %s, %s);", values_lines_query("ProdOfe", 2))
+
+    def test_repeated_product_is_merged(self):
+        cursor = MagicMock()
+        cursor.execute = AsyncMock()
+        lines = make_lines(1)
+
+        asyncio.run(async_write_lines(cursor, "ProdOfe", "of-1", [lines[0], lines[0]], copy_threshold=10))
+
+        cursor.execute.assert_awaited_once_with(values_lines_query("ProdOfe", 1), ["of-1", 1, 4])
+
+    def test_large_document_copy(self):
+        copy = MagicMock()
+        copy.write_row = AsyncMock()
+        cursor = MagicMock()
+        cursor.execute = AsyncMock()
+        cursor.copy.return_value.__aenter__ = AsyncMock(return_value=copy)
+        cursor.copy.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        asyncio.run(async_write_lines(cursor, "ProdOfe", "of-1", make_lines(5), copy_threshold=5))
+
+        cursor.execute.assert_not_awaited()
+        cursor.copy.assert_called_once_with('COPY "ProdOfe" ("OfferID", "ProductID", "Quantity") FROM STDIN;')
+        self.assertEqual(copy.write_row.await_count, 5)
+
+class TestOfferDAOLines(unittest.TestCase):
+    def setUp(self):
+        self.cursor = MagicMock()
+        connection = MagicMock()
+        connection.cursor.return_value.__enter__.return_value = self.cursor
+
+        self.patchers = [
+            patch("DAO.offerDAO.get_db_connection", return_value=connection),
+            patch("DAO.offerDAO.write_lines"),
+        ]
+        self.patchers[0].start()
+        self.write_lines = self.patchers[1].start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_create_offer_writes_lines_once(self):
+        self.cursor.fetchone.return_value = ("of-7",)
+        lines = make_lines(4)
+
+        offer = OfferDAO().create_offer(Offer("emp1", "1", lines, TotalPrice=40))
+
+        self.assertEqual(offer.offerID, "of-7")
+        self.write_lines.assert_called_once_with(self.cursor, "ProdOfe", "of-7", lines)
+        # The header only, the lines go through the writer
+        self.assertEqual(self.cursor.execute.call_count, 1)
+
+    def test_update_offer_upserts_lines(self):
+        self.cursor.rowcount = 1
+        changes = LineChanges(inserted=[], updated=[(1, 5)], deleted=[])
+        lines = make_lines(2)
+
+        with patch("DAO.offerDAO.upsert_lines", return_value=changes) as mock_upsert:
+            result = OfferDAO().update_offer(Offer("emp1", "1", lines, TotalPrice=40, offerID="of-7"))
+
+        self.assertIs(result, changes)
+        mock_upsert.assert_called_once_with(self.cursor, "ProdOfe", "of-7", lines)
+        # The header only, nothing is deleted and written again
+        self.assertEqual(self.cursor.execute.call_count, 1)
+        self.write_lines.assert_not_called()
+
+    def test_update_missing_offer(self):
+        self.cursor.rowcount = 0
+
+        with patch("DAO.offerDAO.upsert_lines") as mock_upsert:
+            result = OfferDAO().update_offer(Offer("emp1", "1", make_lines(2), TotalPrice=40, offerID="of-404"))
+
+        self.assertIsNone(result)
+        mock_upsert.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
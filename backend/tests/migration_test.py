@@ -0,0 +1,127 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import tempfile
+
+sys.path.append("../")
+
+import psycopg2
+
+from migrations.runner import MigrationError, MigrationRunner, load_migrations, split_statements
+
+class TestMigrationScripts(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, filename: str, sql: str) -> None:
+        with open(os.path.join(self.directory, filename), "w", encoding="utf-8") as file:
+            file.write(sql)
+
+    def test_load_in_version_order(self):
+        self.write("0002_second.sql", "SELECT 2;")
+        self.write("0010_tenth.sql", "SELECT 10;")
+        self.write("0001_first.sql", "SELECT 1;")
+        self.write("README.md", "not a migration")
+
+        self.assertEqual([(m.version, m.name) for m in load_migrations(self.directory)], [(1, "first"), (2, "second"), (10, "tenth")])
+
+    def test_duplicated_version(self):
+        self.write("0001_first.sql", "SELECT 1;")
+        self.write("0001_again.sql", "SELECT 1;")
+
+        with self.assertRaises(MigrationError):
+            load_migrations(self.directory)
+
+    def test_split_statements(self):
+        sql = """
+        -- a comment; with a semicolon
+        CREATE TABLE "A" ("Name" character varying DEFAULT 'a;b');
+        CREATE FUNCTION f() RETURNS integer LANGUAGE plpgsql AS $$
+        BEGIN
+          RETURN 1;
+        END;
+        $$;
+        """
+        statements = split_statements(sql)
+
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[0].startswith('CREATE TABLE "A"'))
+        self.assertIn("RETURN 1;", statements[1])
+
+    def test_repository_migrations(self):
+        migrations = load_migrations()
+
+        self.assertEqual(migrations[0].version, 1)
+        # Indexes are built concurrently, outside a transaction
+        self.assertFalse(migrations[0].transactional)
+        self.assertTrue(all(statement.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS") for statement in split_statements(migrations[0].sql)))
+
+        # The create_offer function, its body is one statement
+        self.assertEqual(migrations[1].version, 2)
+        self.assertTrue(migrations[1].transactional)
+        self.assertEqual(len(split_statements(migrations[1].sql)), 1)
+
+class TestMigrationRunner(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with open(os.path.join(directory.name, "0001_table.sql"), "w", encoding="utf-8") as file:
+            file.write('CREATE TABLE "A" ("ID" integer);\n')
+        with open(os.path.join(directory.name, "0002_index.sql"), "w", encoding="utf-8") as file:
+            file.write('CREATE INDEX CONCURRENTLY IF NOT EXISTS "A_ID_idx" ON "A" ("ID");\n')
+
+        self.connection = MagicMock()
+        self.cursor = self.connection.cursor.return_value.__enter__.return_value
+        self.cursor.description = None
+        self.runner = MigrationRunner(self.connection, directory.name)
+
+    def executed(self) -> list[str]:
+        return [" ".join(c.args[0].split()) for c in self.cursor.execute.call_args_list]
+
+    def test_apply_pending(self):
+        # 0001 already applied with the same script
+        self.runner.applied = MagicMock(return_value={1: ("table", self.runner.migrations[0].checksum)})
+
+        applied = self.runner.migrate()
+
+        self.assertEqual([m.version for m in applied], [2])
+        executed = self.executed()
+        self.assertTrue(executed[0].startswith("SELECT pg_advisory_lock"))
+        self.assertIn('CREATE INDEX CONCURRENTLY IF NOT EXISTS "A_ID_idx" ON "A" ("ID")', executed)
+        self.assertTrue(any(statement.startswith("INSERT INTO public.schema_version") for statement in executed))
+        self.assertTrue(executed[-1].startswith("SELECT pg_advisory_unlock"))
+        # The concurrent index is never built inside a transaction
+        self.connection.commit.assert_not_called()
+
+    def test_transactional_migration(self):
+        self.runner.applied = MagicMock(return_value={})
+
+        self.runner.migrate(target=1)
+
+        self.assertIn('CREATE TABLE "A" ("ID" integer);', self.executed())
+        self.connection.commit.assert_called_once()
+
+    def test_failed_migration_rolled_back(self):
+        self.runner.applied = MagicMock(return_value={})
+        def execute(query, params=None):
+            if "CREATE TABLE" in query:
+                raise psycopg2.Error("syntax error")
+        self.cursor.execute.side_effect = execute
+
+        with self.assertRaises(MigrationError):
+            self.runner.migrate()
+
+        self.connection.rollback.assert_called_once()
+        self.assertTrue(self.executed()[-1].startswith("SELECT pg_advisory_unlock"))
+
+    def test_changed_migration_rejected(self):
+        self.runner.applied = MagicMock(return_value={1: ("table", "0" * 64)})
+
+        with self.assertRaises(MigrationError):
+            self.runner.pending()
+
+if __name__ == "__main__":
+    unittest.main()
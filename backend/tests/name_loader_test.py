@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import asyncio
+import sys
+
+sys.path.append("../")
+
+with patch('connect.get_db_connection') as mock_db_conn:
+    # Create a mock connection
+    mock_connection = MagicMock()
+    mock_db_conn.return_value = mock_connection
+
+    from DAO.clientDAO import ClientDAO
+    from DAO.employeDAO import EmployeDAO
+    from DAO.client import Client
+    from DAO.employe import Employe
+    from DAO.invoice import Invoice
+
+    import nameLoader
+
+class TestNameLoader(unittest.TestCase):
+    def setUp(self):
+        self.loader = nameLoader.NameLoader()
+        self.loader.employe_dao = MagicMock(spec=EmployeDAO)
+        self.loader.client_dao = MagicMock(spec=ClientDAO)
+
+        self.loader.employe_dao.get_employees_by_ids.return_value = {
+            "1": Employe(employe_id="1", name="John", family_name="Doe", email="john@example.com", rol=1),
+            "2": Employe(employe_id="2", name="Jane", family_name="Doe", email="jane@example.com", rol=3),
+        }
+        self.loader.client_dao.get_clients_by_ids.return_value = {
+            7: Client(clientID=7, CompanyName="Test Company", CIF="B123", address="Street", email="c@example.com", phone=600000000, contact="Ann"),
+        }
+
+    def test_one_query_per_entity(self):
+        self.loader.prime(["1", "2", "1", "2"], [7, "7", 7])
+        self.loader.load()
+
+        self.loader.employe_dao.get_employees_by_ids.assert_called_once_with({"1", "2"})
+        self.loader.client_dao.get_clients_by_ids.assert_called_once_with({"7"})
+
+        # Everything is memoized for the rest of the request
+        self.assertEqual(self.loader.get_employe("2").name, "Jane")
+        self.assertEqual(self.loader.get_client(7).CompanyName, "Test Company")
+        self.assertEqual(self.loader.get_client("7").CompanyName, "Test Company")
+        self.loader.prime(["1"], [7])
+        self.loader.load()
+        self.loader.employe_dao.get_employees_by_ids.assert_called_once()
+        self.loader.client_dao.get_clients_by_ids.assert_called_once()
+
+    def test_unknown_ids(self):
+        self.loader.employe_dao.get_employees_by_ids.return_value = {}
+        self.loader.client_dao.get_clients_by_ids.return_value = {}
+
+        with self.assertRaises(ValueError):
+            self.loader.get_employe("9")
+        with self.assertRaises(nameLoader.HTTPException) as context:
+            self.loader.get_client(9)
+        self.assertEqual(context.exception.status_code, 404)
+
+    def test_request_scope(self):
+        async def _async_test():
+            dependency = nameLoader.name_loader_scope()
+            await dependency.__anext__()
+
+            loader = nameLoader.get_name_loader()
+            self.assertIs(nameLoader.get_name_loader(), loader)
+
+            with self.assertRaises(StopAsyncIteration):
+                await dependency.__anext__()
+
+            self.assertIsNot(nameLoader.get_name_loader(), loader)
+
+        asyncio.run(_async_test())
+
+    def test_documents_use_request_loader(self):
+        invoices = [
+            Invoice(invoiceID=f"in-{i}", employeId=str(i % 2 + 1), clientId=7, products=[], totalPrice=0)
+            for i in range(10)
+        ]
+
+        with patch("nameLoader.get_name_loader", return_value=self.loader), \
+             patch("DAO.invoice.get_name_loader", return_value=self.loader):
+            asyncio.run(nameLoader.load_names([i.employeId for i in invoices], [i.clientId for i in invoices]))
+            names = [invoice.get_json().employeName for invoice in invoices]
+
+        self.assertEqual(names[:2], ["John", "Jane"])
+        self.loader.employe_dao.get_employees_by_ids.assert_called_once()
+        self.loader.client_dao.get_clients_by_ids.assert_called_once()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
 from unittest.mock import MagicMock, patch
 import asyncio
+import json
+from fastapi.responses import StreamingResponse
 import sys
+from datetime import date
 
 sys.path.append("../")
 
@@ -10,7 +13,8 @@ with patch('connect.get_db_connection') as mock_db_conn:
     mock_connection = MagicMock()
     mock_db_conn.return_value = mock_connection
 
-    from DAO.offerDAO import OfferDAO
+    from DAO.offerDAO import OfferDAO, CREATE_OFFER_FUNCTION_QUERY, create_offer_error
+    from DAO.productDAO import ProductDAO
     from DAO.offer import Offer
 
     from DAO.product import Product
@@ -18,6 +22,7 @@ with patch('connect.get_db_connection') as mock_db_conn:
     from DAO.client import Client
 
     from routers import offer
+    from documentFilter import DocumentFilter
 
 class TestOfferRouter(unittest.TestCase):
     def setUp(self):
@@ -25,12 +30,17 @@ class TestOfferRouter(unittest.TestCase):
         self.original_offer_dao = offer.offerDAO
         offer.offerDAO = self.mock_offer_dao
 
+        self.mock_product_dao = MagicMock(spec=ProductDAO)
+        self.original_product_dao = offer.productDAO
+        offer.productDAO = self.mock_product_dao
+
         # Save reference to module
         self.offer_module = offer
 
     def tearDown(self):
         # Restore original DAOs
         offer.offerDAO = self.original_offer_dao
+        offer.productDAO = self.original_product_dao
 
     def test_create_offer(self):
         async def _async_test():
@@ -74,10 +84,13 @@ class TestOfferRouter(unittest.TestCase):
 
                 # Mock the DAO method
                 self.mock_offer_dao.create_offer.return_value = offer_obj
+                self.mock_product_dao.get_products_by_ids.return_value = {product.productId: product for product, _ in offer_obj.products}
 
                 await self.offer_module.create_offer(test_data, token={"sub": "1"})
 
                 self.mock_offer_dao.create_offer.assert_called_once()
+                # One lookup for all the lines
+                self.mock_product_dao.get_products_by_ids.assert_called_once_with([1, 2])
 
         asyncio.run(_async_test())
 
@@ -128,8 +141,23 @@ class TestOfferRouter(unittest.TestCase):
 
                 # Check if the result matches the expected data
                 self.mock_offer_dao.get_all_offers.assert_called_once()
-                self.assertEqual(result, expected_data)
+                self.assertEqual(json.loads(result.body), [model.model_dump(mode="json") for model in expected_data])
+
+
+        asyncio.run(_async_test())
+
+    def test_create_offer_with_database_function(self):
+        async def _async_test():
+            test_data = offer.createOfferModel(clientID="1", products=[{"id": "1", "quantity": "2"}, {"id": "2", "quantity": "3"}])
+            self.mock_offer_dao.create_offer_in_database.return_value = "of-000042"
+
+            with patch("routers.offer.use_create_offer_function", return_value=True):
+                await self.offer_module.create_offer(test_data, token={"sub": "1"})
 
+            self.mock_offer_dao.create_offer_in_database.assert_called_once_with("1", "1", [(1, 2), (2, 3)])
+            # Products are checked by the function, not looked up first
+            self.mock_product_dao.get_products_by_ids.assert_not_called()
+            self.mock_offer_dao.create_offer.assert_not_called()
 
         asyncio.run(_async_test())
 
@@ -173,6 +201,7 @@ class TestOfferRouter(unittest.TestCase):
 
                 # Mock the DAO method
                 self.mock_offer_dao.update_offer.return_value = offer_obj
+                self.mock_product_dao.get_products_by_ids.return_value = {product.productId: product for product, _ in offer_obj.products}
 
                 await self.offer_module.update_offer(test_data, token={"sub": "1"})
 
@@ -193,6 +222,32 @@ class TestOfferRouter(unittest.TestCase):
 
         asyncio.run(_async_test())
 
+    def test_get_offers_page(self):
+        async def _async_test():
+            self.mock_offer_dao.get_offers_page.return_value = ([], "next-cursor")
+            response = offer.Response()
+
+            result = await self.offer_module.get_all_offers(token={"sub": "1"}, limit=20, after="cursor", response=response)
+
+            self.assertEqual(result, [])
+            self.mock_offer_dao.get_offers_page.assert_called_once_with(20, "cursor", DocumentFilter())
+            self.mock_offer_dao.get_all_offers.assert_not_called()
+            self.assertEqual(response.headers["X-Next-Cursor"], "next-cursor")
+
+        asyncio.run(_async_test())
+
+    def test_get_offers_stream(self):
+        async def _async_test():
+            result = await self.offer_module.get_all_offers(token={"sub": "1"}, limit=20, clientID=1, stream=True)
+
+            self.assertIsInstance(result, StreamingResponse)
+            self.assertEqual(result.media_type, "application/x-ndjson")
+            # Nothing is read before the body is sent
+            self.mock_offer_dao.stream_offers.assert_not_called()
+            self.mock_offer_dao.get_offers_page.assert_not_called()
+
+        asyncio.run(_async_test())
+
     def test_update_offer_no_products(self):
         async def _async_test():
             # Simulate a request to update an offer with no products
@@ -268,6 +323,23 @@ class TestOfferRouter(unittest.TestCase):
 
         asyncio.run(_async_test())
 
+    def test_create_offer_missing_products(self):
+        async def _async_test():
+            test_data = offer.createOfferModel(
+                clientID="1",
+                products=[{"id": "1", "quantity": "2"}, {"id": "8", "quantity": "1"}, {"id": "9", "quantity": "1"}]
+            )
+
+            self.mock_product_dao.get_products_by_ids.side_effect = offer.HTTPException(status_code=404, detail="Products not found: 8, 9")
+
+            with self.assertRaises(offer.HTTPException) as context:
+                await self.offer_module.create_offer(test_data, token={"sub": "1"})
+
+            self.assertEqual(context.exception.status_code, 404)
+            self.mock_offer_dao.create_offer.assert_not_called()
+
+        asyncio.run(_async_test())
+
     def test_create_offer_unauthorized(self):
         async def _async_test():
             # Simulate a request to create an offer with unauthorized access
@@ -288,5 +360,111 @@ class TestOfferRouter(unittest.TestCase):
 
         asyncio.run(_async_test())
 
+class TestOfferDAOLoading(unittest.TestCase):
+    def setUp(self):
+        self.cursor = MagicMock()
+        connection = MagicMock()
+        connection.cursor.return_value.__enter__.return_value = self.cursor
+
+        self.patcher = patch("DAO.offerDAO.get_db_connection", return_value=connection)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_get_all_offers_uses_two_queries(self):
+        self.cursor.fetchall.side_effect = [
+            [
+                ("of-1", "emp1", "1", "2025-01-01", 30),
+                ("of-2", "emp1", "2", "2025-01-02", 10),
+                ("of-3", "emp2", "1", "2025-01-03", 0),
+            ],
+            [
+                ("of-1", 2, 1, "Product 1", "Desc 1", 10, 20, 5, 5, 10),
+                ("of-1", 1, 2, "Product 2", "Desc 2", 10, 20, 5, 5, 10),
+                ("of-2", 1, 2, "Product 2", "Desc 2", 10, 20, 5, 5, 10),
+            ],
+        ]
+
+        offers = OfferDAO().get_all_offers()
+
+        # Headers and lines, regardless of the number of offers
+        self.assertEqual(self.cursor.execute.call_count, 2)
+        self.assertEqual(self.cursor.execute.call_args.args[1], (["of-1", "of-2", "of-3"],))
+
+        self.assertEqual([len(o.products) for o in offers], [2, 1, 0])
+        product, quantity = offers[0].products[0]
+        self.assertEqual(product.name, "Product 1")
+        self.assertEqual(quantity, 2)
+
+    def test_create_offer_in_database(self):
+        self.cursor.fetchone.return_value = ("of-000042",)
+
+        offer_id = OfferDAO().create_offer_in_database("emp1", "1", [(1, 2), (2, 3)])
+
+        self.assertEqual(offer_id, "of-000042")
+        # One call for the header, the lines and the prices
+        self.cursor.execute.assert_called_once_with(
+            CREATE_OFFER_FUNCTION_QUERY, ("emp1", "1", '[{"id": 1, "quantity": 2}, {"id": 2, "quantity": 3}]')
+        )
+
+    def test_create_offer_function_errors(self):
+        self.assertEqual(create_offer_error("P0002", "3,7").status_code, 404)
+        self.assertEqual(create_offer_error("P0002", "3,7").detail, "Products not found: 3,7")
+        self.assertEqual(create_offer_error("22023", None).status_code, 400)
+        self.assertEqual(create_offer_error("23503", None).status_code, 500)
+
+    def test_get_all_offers_empty(self):
+        self.cursor.fetchall.return_value = []
+
+        self.assertEqual(OfferDAO().get_all_offers(), [])
+        self.assertEqual(self.cursor.execute.call_count, 1)
+
+    def test_get_offers_page(self):
+        self.cursor.fetchall.side_effect = [
+            [
+                ("of-3", "emp2", "1", date(2025, 1, 3), 0),
+                ("of-2", "emp1", "2", date(2025, 1, 2), 10),
+                ("of-1", "emp1", "1", date(2025, 1, 1), 30),
+            ],
+            [("of-2", 1, 2, "Product 2", "Desc 2", 10, 20, 5, 5, 10)],
+            [("of-1", "emp1", "1", date(2025, 1, 1), 30)],
+            [("of-1", 2, 1, "Product 1", "Desc 1", 10, 20, 5, 5, 10)],
+        ]
+
+        offers, next_cursor = OfferDAO().get_offers_page(2)
+
+        # One extra row tells there is a next page, its lines are not loaded
+        self.assertEqual([o.offerID for o in offers], ["of-3", "of-2"])
+        self.assertEqual(self.cursor.execute.call_args_list[0].args[1], [3])
+        self.assertEqual(self.cursor.execute.call_args.args[1], (["of-3", "of-2"],))
+        self.assertIsNotNone(next_cursor)
+
+        offers, next_cursor = OfferDAO().get_offers_page(2, next_cursor)
+
+        self.assertEqual([o.offerID for o in offers], ["of-1"])
+        self.assertEqual(self.cursor.execute.call_args_list[2].args[1], [date(2025, 1, 2), "of-2", 3])
+        self.assertIsNone(next_cursor)
+
+    def test_stream_offers(self):
+        self.cursor.fetchmany.side_effect = [
+            [("of-3", "emp2", "1", date(2025, 1, 3), 0), ("of-2", "emp1", "2", date(2025, 1, 2), 10)],
+            [("of-1", "emp1", "1", date(2025, 1, 1), 30)],
+            [],
+        ]
+        self.cursor.fetchall.side_effect = [
+            [("of-2", 1, 2, "Product 2", "Desc 2", 10, 20, 5, 5, 10)],
+            [("of-1", 2, 1, "Product 1", "Desc 1", 10, 20, 5, 5, 10)],
+        ]
+
+        batches = list(OfferDAO().stream_offers(batch_size=2))
+
+        self.assertEqual([[o.offerID for o in batch] for batch in batches], [["of-3", "of-2"], ["of-1"]])
+        self.assertEqual([len(o.products) for o in batches[0]], [0, 1])
+        self.cursor.fetchmany.assert_called_with(2)
+        # The whole list is read by one query, without a page limit
+        self.assertEqual(self.cursor.execute.call_args_list[0].args[1], [None])
+        self.assertEqual(self.cursor.execute.call_args.args[1], (["of-1"],))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
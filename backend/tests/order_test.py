@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
 import asyncio
+import json
 import datetime
 import sys
 
@@ -71,8 +72,7 @@ class TestOrderDAO(unittest.TestCase):
             order_obj.get_json = MagicMock(return_value=expected_json)
 
             with patch("routers.order.offerDAO.get_offer_by_id") as mock_get_offer, \
-                patch("routers.order.Order.get_json") as mock_get_json, \
-                patch("routers.order.orderDAO.check_order_exists", return_value=False):
+                patch("routers.order.Order.get_json") as mock_get_json:
 
                 mock_offer = MagicMock(spec=Offer)
                 mock_offer.clientID = "82345"
@@ -97,6 +97,8 @@ class TestOrderDAO(unittest.TestCase):
 
                 # Assertions
                 self.mock_order_dao.create_order.assert_called_once()
+                # The order is not serialized after being created, that would look up its employee and client
+                mock_get_json.assert_not_called()
 
         asyncio.run(_async_test())
 
@@ -137,8 +139,9 @@ class TestOrderDAO(unittest.TestCase):
 
                 # Assertions
                 self.mock_order_dao.get_all_orders.assert_called_once()
+                result = json.loads(result.body)
                 self.assertEqual(len(result), 1)
-                self.assertEqual(result[0].orderID, order_obj.orderID)
+                self.assertEqual(result[0]["orderID"], order_obj.orderID)
 
         asyncio.run(_async_test())
 
@@ -189,8 +192,10 @@ class TestOrderDAO(unittest.TestCase):
                 "offerID": "72747"
             }
 
-            with patch("routers.order.orderDAO.get_order_by_id", return_value=True), \
-                patch("routers.order.offerDAO.get_offer_by_id") as mock_get_offer:
+            # The insert finds the order converted from the same offer
+            self.mock_order_dao.create_order.return_value = False
+
+            with patch("routers.order.offerDAO.get_offer_by_id") as mock_get_offer:
                 mock_offer = MagicMock(spec=Offer)
                 mock_offer.clientID = "82345"
                 mock_offer.products = [(Product(productId=1, name="Test Product", description="Test Description", stock=100, minStock=1, maxStock=10, purchasePrice=5.0, sellPrice=10.0), 2)]
@@ -198,7 +203,7 @@ class TestOrderDAO(unittest.TestCase):
 
                 with self.assertRaises(order.HTTPException) as context:
                     await self.order_module.create_order(order_data, token={"sub": "1"})
-                self.assertEqual(context.exception.status_code, 400)
+                self.assertEqual(context.exception.status_code, 409)
                 self.assertEqual(context.exception.detail, "Order already exists")
 
         asyncio.run(_async_test())
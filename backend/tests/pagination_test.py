@@ -0,0 +1,100 @@
+import unittest
+from datetime import date
+import sqlite3
+import sys
+
+sys.path.append("../")
+
+from fastapi import HTTPException, Response
+
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, document_page_query, encode_cursor, id_page_query, set_next_cursor, split_page
+
+class TestCursor(unittest.TestCase):
+    def test_round_trip(self):
+        cursor = encode_cursor(date(2025, 1, 31), "of-000042")
+
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor, 2), ["2025-01-31", "of-000042"])
+
+    def test_invalid_cursor(self):
+        for cursor, size in (("not a cursor", 1), (encode_cursor(1, 2), 1), (encode_cursor("2025-01-31"), 2)):
+            with self.assertRaises(HTTPException) as context:
+                decode_cursor(cursor, size)
+            self.assertEqual(context.exception.status_code, 400)
+
+    def test_split_page(self):
+        rows = [(3, "c"), (2, "b"), (1, "a")]
+
+        page, next_cursor = split_page(rows, 2, lambda row: (row[0],))
+        self.assertEqual(page, rows[:2])
+        self.assertEqual(decode_cursor(next_cursor, 1), [2])
+
+        # No cursor on the last page
+        self.assertEqual(split_page(rows, 3, lambda row: (row[0],)), (rows, None))
+
+    def test_next_cursor_header(self):
+        response = Response()
+        set_next_cursor(response, None)
+        self.assertNotIn(NEXT_CURSOR_HEADER, response.headers)
+
+        set_next_cursor(response, "abc")
+        self.assertEqual(response.headers[NEXT_CURSOR_HEADER], "abc")
+
+class TestPageQueries(unittest.TestCase):
+    def test_first_document_page(self):
+        query, params = document_page_query('"Offers"', '"OfferID"', 50, None)
+
+        self.assertNotIn("WHERE", query)
+        self.assertIn('ORDER BY "Date" DESC NULLS FIRST, "OfferID" DESC', query)
+        self.assertEqual(params, [51])
+
+    def test_next_document_page(self):
+        query, params = document_page_query('"Offers"', '"OfferID"', 50, encode_cursor(date(2025, 1, 31), "of-000042"))
+
+        self.assertIn('WHERE ("Date", "OfferID") < (%s, %s)', query)
+        self.assertEqual(params, [date(2025, 1, 31), "of-000042", 51])
+
+    def test_next_document_page_without_date(self):
+        query, params = document_page_query('"Offers"', '"OfferID"', 50, encode_cursor(None, "of-000042"))
+
+        self.assertIn('WHERE (("Date" IS NULL AND "OfferID" < %s) OR "Date" IS NOT NULL)', query)
+        self.assertEqual(params, ["of-000042", 51])
+
+    def test_pages_across_documents_without_date(self):
+        # Rows without a date fill the end of the first page and the start of the second one
+        offers = [("of-000001", "2025-01-02"), ("of-000002", None), ("of-000003", "2025-01-01"), ("of-000004", None),
+                  ("of-000005", None), ("of-000006", "2025-01-02"), ("of-000007", "2024-12-31")]
+        database = sqlite3.connect(":memory:")
+        self.addCleanup(database.close)
+        database.execute('CREATE TABLE "Offers" ("OfferID" TEXT PRIMARY KEY, "Date" TEXT)')
+        database.executemany('INSERT INTO "Offers" VALUES (?, ?)', offers)
+
+        seen = list[str]()
+        after = None
+        while True:
+            query, params = document_page_query('"Offers"', '"OfferID"', 2, after)
+            params = [value.isoformat() if isinstance(value, date) else value for value in params]
+            rows, after = split_page(database.execute(query.replace("%s", "?"), params).fetchall(), 2, lambda row: (row[1], row[0]))
+            seen.extend(row[0] for row in rows)
+            if after is None:
+                break
+
+        self.assertEqual(seen, ["of-000005", "of-000004", "of-000002", "of-000006", "of-000001", "of-000003", "of-000007"])
+
+    def test_invalid_document_cursor(self):
+        with self.assertRaises(HTTPException) as context:
+            document_page_query('"Offers"', '"OfferID"', 50, encode_cursor("yesterday", "of-000042"))
+        self.assertEqual(context.exception.status_code, 400)
+
+    def test_id_page(self):
+        query, params = id_page_query('"Products"', '"ProductID"', 10, encode_cursor(7))
+
+        self.assertIn('WHERE "ProductID" > %s', query)
+        self.assertIn('ORDER BY "ProductID"', query)
+        self.assertEqual(params, [7, 11])
+
+        with self.assertRaises(HTTPException):
+            id_page_query('"Products"', '"ProductID"', 10, encode_cursor("seven"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from unittest.mock import patch
+import datetime
+import os
+import sys
+import tempfile
+
+sys.path.append("../")
+
+with patch('connect.get_db_connection'):
+    from pdf.documentPDF import PDFDocument, PDFLine
+    from pdf import pdfCache
+    from pdf.pdfCache import PDFCache, etag_matches, load_pdf_cache_env, pdf_key
+
+DOCUMENT = PDFDocument(documentType="order", documentID="or-000001", date=datetime.date(2025, 5, 1), employeName="John Doe",
+                       clientName="Test Company", clientAddress="Main Street 1", clientPhone="600000000", totalPrice=30.0,
+                       lines=[PDFLine(productId=1, name="Product 1", description="Description 1", quantity=3, unitPrice=10.0)])
+
+class TestPDFKey(unittest.TestCase):
+    def test_same_content_same_key(self):
+        self.assertEqual(pdf_key(DOCUMENT), pdf_key(DOCUMENT.model_copy(deep=True)))
+
+    def test_changed_content_new_key(self):
+        changed_line = DOCUMENT.model_copy(update={"lines": [DOCUMENT.lines[0].model_copy(update={"quantity": 4})]})
+        changed_client = DOCUMENT.model_copy(update={"clientAddress": "Main Street 2"})
+        other_document = DOCUMENT.model_copy(update={"documentID": "or-000002"})
+
+        keys = {pdf_key(DOCUMENT), pdf_key(changed_line), pdf_key(changed_client), pdf_key(other_document)}
+        self.assertEqual(len(keys), 4)
+
+    def test_engine_version_in_key(self):
+        key = pdf_key(DOCUMENT)
+        with patch("pdf.pdfCache.ENGINE_VERSION", -1):
+            self.assertNotEqual(pdf_key(DOCUMENT), key)
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"abc"', '"abc"'))
+        self.assertTrue(etag_matches('"xyz", W/"abc"', '"abc"'))
+        self.assertTrue(etag_matches("*", '"abc"'))
+        self.assertFalse(etag_matches('"xyz"', '"abc"'))
+        self.assertFalse(etag_matches(None, '"abc"'))
+
+class TestLoadPDFCacheEnv(unittest.TestCase):
+    def test_ps_env_found_from_any_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env_path = os.path.join(directory, "ps.env")
+            with open(env_path, "w") as env_file:
+                env_file.write(f"PDF_CACHE_MEMORY_MB=1\nPDF_CACHE_DISK_MB=2\nPDF_CACHE_DIR={directory}\n")
+
+            cwd = os.getcwd()
+            os.chdir(tempfile.gettempdir())
+            try:
+                with patch.object(pdfCache, "env_path", env_path), patch.dict("os.environ"):
+                    self.assertEqual(load_pdf_cache_env(), (1024 * 1024, 2 * 1024 * 1024, directory))
+            finally:
+                os.chdir(cwd)
+
+    def test_same_ps_env_as_connect(self):
+        import connect
+
+        self.assertEqual(os.path.abspath(pdfCache.env_path), os.path.abspath(connect.env_path))
+
+class TestPDFCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_memory_hit(self):
+        cache = PDFCache(100, 0, self.directory)
+
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", b"%PDF a")
+
+        self.assertEqual(cache.get("a"), b"%PDF a")
+        stats = cache.stats()
+        self.assertEqual((stats["memory_hits"], stats["misses"]), (1, 1))
+        # The disk tier is disabled
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_memory_eviction_by_size(self):
+        cache = PDFCache(10, 0, self.directory)
+        cache.set("a", b"aaaa")
+        cache.set("b", b"bbbb")
+        cache.get("a")
+        cache.set("c", b"cccc")
+
+        # b is the least recently used
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"aaaa")
+        self.assertEqual(cache.stats()["memory_bytes"], 8)
+
+    def test_too_large_for_memory(self):
+        cache = PDFCache(3, 0, self.directory)
+        cache.set("a", b"aaaa")
+
+        self.assertEqual(cache.stats()["memory_entries"], 0)
+
+    def test_disk_hit_back_to_memory(self):
+        cache = PDFCache(0, 100, self.directory)
+        cache.set("a", b"%PDF a")
+
+        self.assertEqual(os.listdir(self.directory), ["a.pdf"])
+        self.assertEqual(cache.get("a"), b"%PDF a")
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_disk_eviction_removes_files(self):
+        cache = PDFCache(0, 10, self.directory)
+        cache.set("a", b"aaaa")
+        cache.set("b", b"bbbb")
+        cache.set("c", b"cccc")
+
+        self.assertEqual(sorted(os.listdir(self.directory)), ["b.pdf", "c.pdf"])
+        self.assertEqual(cache.stats()["disk_bytes"], 8)
+
+    def test_disk_survives_restart(self):
+        PDFCache(0, 100, self.directory).set("a", b"%PDF a")
+
+        cache = PDFCache(100, 100, self.directory)
+
+        self.assertEqual(cache.get("a"), b"%PDF a")
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_file_removed_by_another_process(self):
+        cache = PDFCache(0, 100, self.directory)
+        cache.set("a", b"%PDF a")
+        os.remove(os.path.join(self.directory, "a.pdf"))
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual((cache.stats()["disk_entries"], cache.stats()["disk_bytes"]), (0, 0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import asyncio
+import datetime
+import os
+import pickle
+import re
+import sys
+import tempfile
+import zlib
+
+sys.path.append("../")
+
+with patch('connect.get_db_connection'):
+    from pdf import documentPDF
+    from pdf.documentPDF import DocumentPDFEngine, PDFDocument, PDFLine, pdf_document, render_document_pdf
+    from routers import invoice
+    from pdf.renderPool import PDFRenderPool, RenderPool
+    from pdf import pdfCache
+    from pdf.pdfCache import PDFCache
+    from nameLoader import bind_name_loader
+    from DAO.invoiceDAO import InvoiceDAO
+    from DAO.invoice import Invoice
+    from DAO.product import Product
+    from DAO.employe import Employe
+    from DAO.client import Client
+
+PDF_DIRECTORY = os.path.dirname(documentPDF.__file__)
+
+def page_streams(content: bytes) -> list[bytes]:
+    # The content stream of every page, they are compressed
+    return [zlib.decompress(stream) for stream in re.findall(rb"stream\r?\n(.*?)endstream", content, re.S)
+            if b"Page " in zlib.decompress(stream)]
+
+def make_document(lines: int = 2) -> PDFDocument:
+    return PDFDocument(documentType="invoice", documentID="inv-000001", date=datetime.date(2025, 5, 1),
+                       employeName="John Doe", clientName="Test Company", clientAddress="Main Street 1", clientPhone="600000000",
+                       totalPrice=30.0 * lines,
+                       lines=[PDFLine(productId=i, name=f"Product {i}", description="Description", quantity=3, unitPrice=10.0)
+                              for i in range(lines)])
+
+class TestDocumentPDFEngine(unittest.TestCase):
+    def test_render_in_memory(self):
+        files = set(os.listdir(PDF_DIRECTORY))
+
+        content = render_document_pdf(make_document())
+
+        self.assertTrue(content.startswith(b"%PDF"))
+        # Nothing is written to (or deleted from) the pdf directory
+        self.assertEqual(set(os.listdir(PDF_DIRECTORY)), files)
+
+    def test_every_document_type(self):
+        for document_type in documentPDF.DOCUMENT_TITLES:
+            document = make_document().model_copy(update={"documentType": document_type})
+            self.assertTrue(render_document_pdf(document).startswith(b"%PDF"))
+
+    def test_multi_page_table(self):
+        pages = page_streams(render_document_pdf(make_document(200)))
+
+        self.assertGreater(len(pages), 1)
+        for number, page in enumerate(pages, start=1):
+            self.assertIn(f"(Page {number} of {len(pages)})".encode(), page)
+            # The header of the product table is repeated on every page
+            self.assertEqual(page.count(b"(Product ID)"), 1)
+        # Every line is drawn once, and the total after the last one
+        self.assertEqual(sum(len(re.findall(rb"\(Product \d+\)", page)) for page in pages), 200)
+        self.assertIn(b"(TOTAL INVOICE PRICE: 6000.00", pages[-1])
+
+    def test_single_page(self):
+        pages = page_streams(render_document_pdf(make_document()))
+
+        self.assertEqual(len(pages), 1)
+        self.assertIn(b"(Page 1 of 1)", pages[0])
+
+    def test_null_name_and_description(self):
+        document = make_document(1)
+        document.lines.append(PDFLine(productId=7, name=None, description=None, quantity=1, unitPrice=2.5))
+
+        pages = page_streams(render_document_pdf(document))
+
+        # Empty cells, as for NULL columns of the Products table
+        self.assertIn(b"(7)", pages[0])
+        self.assertNotIn(b"(None)", pages[0])
+
+    def test_missing_logo(self):
+        engine = DocumentPDFEngine(logo_path="missing.png")
+
+        self.assertIsNone(engine.logo)
+        self.assertTrue(engine.render(make_document()).startswith(b"%PDF"))
+
+    def test_document_is_picklable(self):
+        document = make_document()
+
+        self.assertEqual(pickle.loads(pickle.dumps(document)), document)
+        self.assertEqual(document.get_filename(), "inv-000001_2025-05-01.pdf")
+
+class TestPDFDocument(unittest.TestCase):
+    def setUp(self):
+        self.product = Product(productId=1, name="Product 1", description="Description 1", stock=100, minStock=10, maxStock=500,
+                               purchasePrice=5.0, sellPrice=10.0)
+        self.employe = MagicMock(spec=Employe)
+        self.employe.name = "John Doe"
+        self.client = MagicMock(spec=Client)
+        self.client.CompanyName = "Test Company"
+        self.client.address = "Main Street 1"
+        self.client.phone = 600000000
+
+    def test_normalize(self):
+        with bind_name_loader() as name_loader:
+            name_loader.employes["1"] = self.employe
+            name_loader.clients["7"] = self.client
+
+            document = pdf_document("invoice", "inv-000001", datetime.date(2025, 5, 1), "1", 7, 30.0, [(self.product, 3)])
+
+        self.assertEqual(document.employeName, "John Doe")
+        self.assertEqual(document.clientPhone, "600000000")
+        self.assertEqual(document.lines, [PDFLine(productId=1, name="Product 1", description="Description 1", quantity=3, unitPrice=10.0)])
+
+    def get_invoice_pdf(self, if_none_match=None):
+        invoice_obj = Invoice("inv-000001", "1", "7", [(self.product, 3)], invoiceDate=datetime.date(2025, 5, 1))
+        mock_invoice_dao = MagicMock(spec=InvoiceDAO)
+        mock_invoice_dao.get_invoice_by_id.return_value = invoice_obj
+
+        # Rendered in the threadpool, no worker process
+        with patch.object(invoice, "invoiceDAO", mock_invoice_dao), patch.object(RenderPool, "_instance", self.render_pool), \
+             patch.object(pdfCache, "pdf_cache", self.cache), bind_name_loader() as name_loader:
+            name_loader.employes["1"] = self.employe
+            name_loader.clients["7"] = self.client
+
+            response = asyncio.run(invoice.get_invoice_pdf("inv-000001", token={"sub": "1"}, if_none_match=if_none_match))
+
+        mock_invoice_dao.get_invoice_by_id.assert_called_once_with("inv-000001")
+        return response
+
+    def test_normalize_null_columns(self):
+        product = Product(productId=2, name=None, description=None, stock=1, minStock=0, maxStock=5, purchasePrice=1.0, sellPrice=2.0)
+        client = MagicMock(spec=Client)
+        client.CompanyName = None
+        client.address = None
+        client.phone = None
+        with bind_name_loader() as name_loader:
+            name_loader.employes["1"] = self.employe
+            name_loader.clients["7"] = client
+
+            document = pdf_document("invoice", "inv-000001", datetime.date(2025, 5, 1), "1", 7, 2.0, [(product, 1)])
+
+        self.assertEqual((document.clientName, document.clientAddress, document.clientPhone), ("", "", ""))
+        self.assertEqual(document.lines, [PDFLine(productId=2, name=None, description=None, quantity=1, unitPrice=2.0)])
+        self.assertTrue(render_document_pdf(document).startswith(b"%PDF"))
+
+    def test_router_response(self):
+        self.render_pool = PDFRenderPool(0, 1)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = PDFCache(1024 * 1024, 1024 * 1024, directory.name)
+
+        response = self.get_invoice_pdf()
+
+        self.assertEqual(response.media_type, "application/pdf")
+        self.assertEqual(response.headers["content-length"], str(len(response.body)))
+        self.assertEqual(response.headers["content-disposition"], 'attachment; filename="inv-000001_2025-05-01.pdf"')
+        etag = response.headers["etag"]
+        self.assertEqual(self.cache.get(etag.strip('"')), response.body)
+
+        # Served from the cache, not rendered again
+        self.assertEqual(self.get_invoice_pdf().body, response.body)
+        self.assertEqual(self.render_pool.stats()["renders"], 1)
+
+        # The client already has it
+        not_modified = self.get_invoice_pdf(if_none_match=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.body, b"")
+        self.assertEqual(not_modified.headers["etag"], etag)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
 import asyncio
+import json
 import sys
 
 sys.path.append('../')
@@ -10,7 +11,7 @@ with patch('connect.get_db_connection') as mock_db_conn:
     mock_connection = MagicMock()
     mock_db_conn.return_value = mock_connection
 
-    from DAO.productDAO import ProductDAO
+    from DAO.productDAO import ProductDAO, product_cache, catalog_cache, CATALOG_KEY
     from DAO.product import Product
 
     from routers import product
@@ -120,7 +121,7 @@ class TestProductRouter(unittest.TestCase):
 
             # Check if the result matches the expected data
             self.mock_product_dao.get_all_products.assert_called_once()
-            self.assertEqual(result, expected_data)
+            self.assertEqual(json.loads(result.body), expected_data)
 
         asyncio.run(_async_test())
     
@@ -348,5 +349,100 @@ class TestProductRouter(unittest.TestCase):
 
         asyncio.run(_async_test())
 
+class TestProductDAOBulkLookup(unittest.TestCase):
+    def setUp(self):
+        self.cursor = MagicMock()
+        self.cursor.__enter__.return_value = self.cursor
+        connection = MagicMock()
+        connection.cursor.return_value = self.cursor
+
+        self.patcher = patch("DAO.productDAO.get_db_connection", return_value=connection)
+        self.patcher.start()
+        product_cache.clear()
+        catalog_cache.clear()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_get_products_by_ids(self):
+        self.cursor.fetchall.return_value = [
+            (1, "Product 1", "Desc 1", 10, 20, 5, "A1", 5.0, 10.0),
+            (2, "Product 2", "Desc 2", 10, 20, 5, "A2", 6.0, 12.0),
+        ]
+
+        products = ProductDAO().get_products_by_ids([2, 1, 2])
+
+        # One query, duplicates removed
+        self.cursor.execute.assert_called_once()
+        self.assertEqual(self.cursor.execute.call_args.args[1], ([2, 1],))
+        self.assertEqual(set(products), {1, 2})
+        self.assertEqual(products[2].sellPrice, 12.0)
+
+    def test_get_products_by_ids_reports_all_missing(self):
+        self.cursor.fetchall.return_value = [(1, "Product 1", "Desc 1", 10, 20, 5, "A1", 5.0, 10.0)]
+
+        with self.assertRaises(product.HTTPException) as context:
+            ProductDAO().get_products_by_ids([1, 7, 9])
+
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertEqual(context.exception.detail, "Products not found: 7, 9")
+
+    def test_get_products_by_ids_empty(self):
+        self.assertEqual(ProductDAO().get_products_by_ids([]), {})
+        self.cursor.execute.assert_not_called()
+
+    def test_cached_products_not_queried(self):
+        self.cursor.fetchone.return_value = (1, "Product 1", "Desc 1", 10, 20, 5, "A1", 5.0, 10.0)
+        ProductDAO().get_product_by_id(1)
+
+        self.cursor.fetchall.return_value = [(2, "Product 2", "Desc 2", 10, 20, 5, "A2", 6.0, 12.0)]
+        products = ProductDAO().get_products_by_ids([1, 2])
+
+        # Only the product missing from the cache is queried
+        self.assertEqual(self.cursor.execute.call_args.args[1], ([2],))
+        self.assertEqual(set(products), {1, 2})
+
+        self.cursor.execute.reset_mock()
+        self.assertEqual(ProductDAO().get_product_by_id(2).name, "Product 2")
+        self.cursor.execute.assert_not_called()
+
+    def test_bulk_reads_not_cached_by_id(self):
+        self.cursor.fetchall.return_value = [
+            (1, "Product 1", "Desc 1", 10, 20, 5, "A1", 5.0, 10.0),
+            (2, "Product 2", "Desc 2", 10, 20, 5, "A2", 6.0, 12.0),
+        ]
+        dao = ProductDAO()
+        dao.get_all_products()
+        dao.get_products_page(2)
+
+        # A catalog larger than the cache would evict the products the other requests use
+        self.assertIsNone(product_cache.get(1))
+        self.assertIsNone(product_cache.get(2))
+        self.assertIsNotNone(catalog_cache.get(CATALOG_KEY))
+
+    def test_writes_invalidate_cache(self):
+        self.cursor.fetchone.side_effect = [
+            (1, "Product 1", "Desc 1", 10, 20, 5, "A1", 5.0, 10.0),
+            (2, "Product 2", "Desc 2", 10, 20, 5, "A2", 6.0, 12.0),
+        ]
+        self.cursor.fetchall.return_value = [
+            (1, "Product 1", "Desc 1", 10, 20, 5, "A1", 5.0, 10.0),
+            (2, "Product 2", "Desc 2", 10, 20, 5, "A2", 6.0, 12.0),
+        ]
+        dao = ProductDAO()
+        dao.get_product_by_id(1)
+        dao.get_product_by_id(2)
+        dao.get_all_products()
+        dao.get_all_products()
+        self.assertEqual(self.cursor.execute.call_count, 3)
+
+        self.cursor.rowcount = 1
+        dao.update_product(Product(productId=1, name="Product 1", description="New", stock=10, maxStock=20, minStock=5, purchasePrice=5.0, sellPrice=11.0))
+
+        # The updated product and the catalog are dropped, the other product is kept
+        self.assertIsNone(product_cache.get(1))
+        self.assertIsNotNone(product_cache.get(2))
+        self.assertIsNone(catalog_cache.get(CATALOG_KEY))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import datetime
+import os
+import signal
+import sys
+import time
+
+sys.path.append("../")
+
+from fastapi import HTTPException
+
+with patch('connect.get_db_connection'):
+    from pdf.documentPDF import PDFDocument, PDFLine
+    from pdf.renderPool import PDFRenderPool, RenderPool, RenderQueueFullError, render_pdf
+
+DOCUMENT = PDFDocument(documentType="order", documentID="or-000001", date=datetime.date(2025, 5, 1), employeName="John Doe",
+                       clientName="Test Company", clientAddress="Main Street 1", clientPhone="600000000", totalPrice=30.0,
+                       lines=[PDFLine(productId=1, name="Product 1", description="Description 1", quantity=3, unitPrice=10.0)])
+
+class TestPDFRenderPool(unittest.TestCase):
+    def test_render_in_worker_process(self):
+        pool = PDFRenderPool(1, 1)
+        self.addCleanup(pool.close)
+
+        content = asyncio.run(pool.render(DOCUMENT))
+
+        self.assertTrue(content.startswith(b"%PDF"))
+        stats = pool.stats()
+        self.assertEqual((stats["renders"], stats["pending"], stats["rejected"]), (1, 0, 0))
+
+    def test_worker_killed_while_idle(self):
+        pool = PDFRenderPool(1, 1)
+        self.addCleanup(pool.close)
+        asyncio.run(pool.render(DOCUMENT))
+
+        broken = pool._executor
+        for process in list(broken._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        # The executor notices the dead worker in its management thread
+        deadline = time.monotonic() + 10
+        while not broken._broken and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertTrue(broken._broken)
+
+        # The next render starts new workers instead of failing until the API restarts
+        self.assertTrue(asyncio.run(pool.render(DOCUMENT)).startswith(b"%PDF"))
+        self.assertIsNot(pool._executor, broken)
+        self.assertEqual(pool.stats()["pending"], 0)
+
+    def test_render_in_threadpool(self):
+        pool = PDFRenderPool(0, 0)
+
+        self.assertTrue(asyncio.run(pool.render(DOCUMENT)).startswith(b"%PDF"))
+        self.assertEqual(pool.stats()["renders"], 1)
+
+    def test_queue_full(self):
+        pool = PDFRenderPool(0, 1)
+        # Two renders running or waiting, the bound of one worker and a queue of one
+        self.assertTrue(pool._slots.acquire(blocking=False))
+        self.assertTrue(pool._slots.acquire(blocking=False))
+
+        with self.assertRaises(RenderQueueFullError):
+            asyncio.run(pool.render(DOCUMENT))
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+    def test_queue_full_is_503(self):
+        pool = PDFRenderPool(0, 0)
+        pool._slots.acquire(blocking=False)
+
+        with patch.object(RenderPool, "_instance", pool), patch.dict("os.environ", {"PDF_RETRY_AFTER": "5"}):
+            with self.assertRaises(HTTPException) as context:
+                asyncio.run(render_pdf(DOCUMENT))
+
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(context.exception.headers, {"Retry-After": "5"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from contextlib import aclosing, asynccontextmanager
+import asyncio
+import json
+import sys
+
+sys.path.append("../")
+
+with patch('connect.get_db_connection'):
+    import streaming
+    from streaming import NDJSON_MEDIA_TYPE, iterate_batches, ndjson_line, ndjson_response
+
+@asynccontextmanager
+async def no_connection():
+    yield
+
+class TestIterateBatches(unittest.TestCase):
+    def collect(self, batches, stop_after=None) -> list:
+        async def _collect():
+            collected = []
+            async with aclosing(iterate_batches(batches)) as iterator:
+                async for batch in iterator:
+                    collected.append(batch)
+                    if len(collected) == stop_after:
+                        break
+            return collected
+        return asyncio.run(_collect())
+
+    def test_sync_generator(self):
+        closed = MagicMock()
+        def batches():
+            try:
+                yield [1, 2]
+                yield [3]
+            finally:
+                closed()
+
+        self.assertEqual(self.collect(batches()), [[1, 2], [3]])
+        closed.assert_called_once()
+
+    def test_sync_generator_stopped_early(self):
+        # A client that goes away closes the generator, and with it the server-side cursor
+        closed = MagicMock()
+        def batches():
+            try:
+                yield [1]
+                yield [2]
+            finally:
+                closed()
+
+        self.assertEqual(self.collect(batches(), stop_after=1), [[1]])
+        closed.assert_called_once()
+
+    def test_async_generator(self):
+        async def batches():
+            yield [1]
+            yield [2, 3]
+
+        self.assertEqual(self.collect(batches()), [[1], [2, 3]])
+
+class TestNdjsonResponse(unittest.TestCase):
+    def test_line(self):
+        self.assertEqual(ndjson_line({"id": 1, "name": "a"}), '{"id": 1, "name": "a"}\n')
+
+    def test_body(self):
+        async def serialize(batch):
+            return [{"id": item} for item in batch]
+
+        async def _async_test():
+            with patch.object(streaming, "bind_db_connection", no_connection), \
+                 patch.object(streaming, "use_async_driver", return_value=False):
+                response = ndjson_response(lambda: (batch for batch in [[1, 2], [3]]), serialize)
+                self.assertEqual(response.media_type, NDJSON_MEDIA_TYPE)
+                return [chunk async for chunk in response.body_iterator]
+
+        chunks = asyncio.run(_async_test())
+
+        # One chunk per batch, one document per line
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual([json.loads(line) for line in "".join(chunks).splitlines()], [{"id": 1}, {"id": 2}, {"id": 3}])
+
+if __name__ == "__main__":
+    unittest.main()
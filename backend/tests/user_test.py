@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
 import asyncio
+import json
 import sys
 
 sys.path.append("../")
@@ -10,11 +11,59 @@ with patch('connect.get_db_connection') as mock_db_conn:
     mock_connection = MagicMock()
     mock_db_conn.return_value = mock_connection
 
-    from DAO.employeDAO import EmployeDAO
+    from DAO.employeDAO import EmployeDAO, employe_cache
     from DAO.employe import Employe
 
     from routers import user as employe
 
+# Other tests replace methods of EmployeDAO on the class, keep the real ones
+REAL_EMPLOYE_DAO = {name: EmployeDAO.__dict__[name] for name in ("get_employee_by_id", "update_employee", "delete_employee")}
+
+class TestEmployeRoleCache(unittest.TestCase):
+    def setUp(self):
+        self.cursor = MagicMock()
+        connection = MagicMock()
+        connection.cursor.return_value.__enter__.return_value = self.cursor
+
+        self.patchers = [patch("DAO.employeDAO.get_db_connection", return_value=connection)]
+        self.patchers += [patch.object(EmployeDAO, name, method) for name, method in REAL_EMPLOYE_DAO.items()]
+        for patcher in self.patchers:
+            patcher.start()
+        employe_cache.clear()
+
+        self.cursor.fetchone.return_value = ("1", "John", "Doe", "john@example.com", 3)
+        self.cursor.rowcount = 1
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        employe_cache.clear()
+
+    def test_role_read_once(self):
+        dao = EmployeDAO()
+        for _ in range(3):
+            self.assertEqual(dao.get_employee_by_id("1").rol, 3)
+        self.cursor.execute.assert_called_once()
+
+    def test_update_invalidates(self):
+        dao = EmployeDAO()
+        dao.get_employee_by_id("1")
+
+        dao.update_employee("1", "John", "Doe", "john@example.com", 1)
+        self.cursor.fetchone.return_value = ("1", "John", "Doe", "john@example.com", 1)
+
+        self.assertEqual(dao.get_employee_by_id("1").rol, 1)
+
+    def test_delete_invalidates(self):
+        dao = EmployeDAO()
+        dao.get_employee_by_id("1")
+
+        dao.delete_employee("1")
+        self.cursor.fetchone.return_value = None
+
+        with self.assertRaises(ValueError):
+            dao.get_employee_by_id("1")
+
 class TestEmployeDAO(unittest.TestCase):
     def setUp(self):
         self.mock_employe_dao = MagicMock(spec=EmployeDAO)
@@ -122,7 +171,7 @@ class TestEmployeDAO(unittest.TestCase):
 
             # Check if the result matches the expected data
             self.mock_employe_dao.get_all_employees.assert_called_once()
-            self.assertEqual(result, [expected_data])
+            self.assertEqual(json.loads(result.body), [expected_data])
 
         asyncio.run(_async_test())
     
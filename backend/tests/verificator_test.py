@@ -0,0 +1,130 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import inspect
+import sys
+import time
+
+sys.path.append("../")
+
+with patch('connect.get_db_connection') as mock_db_conn:
+    # Create a mock connection
+    mock_connection = MagicMock()
+    mock_db_conn.return_value = mock_connection
+
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from DAO.employe import Employe
+    import verificator
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        verificator.token_cache.clear()
+
+        self.patchers = [
+            patch("verificator.CLIENT_ID", "client-id"),
+            patch("verificator.CLIENT_SECRET", "client-secret"),
+            patch("verificator.certificate_store.verify"),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        self.mock_verify = verificator.certificate_store.verify
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        verificator.token_cache.clear()
+
+    def _credentials(self, token: str) -> HTTPAuthorizationCredentials:
+        return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def test_repeated_token_verified_once(self):
+        self.mock_verify.return_value = {"sub": "1", "exp": time.time() + 600}
+
+        first = verificator.get_principal(self._credentials("token-1")).claims
+        second = verificator.get_principal(self._credentials("token-1")).claims
+
+        self.assertEqual(first, second)
+        self.mock_verify.assert_called_once()
+        self.assertEqual(verificator.token_cache.stats()["hits"], 1)
+
+    def test_different_tokens_verified_separately(self):
+        self.mock_verify.side_effect = [
+            {"sub": "1", "exp": time.time() + 600},
+            {"sub": "2", "exp": time.time() + 600},
+        ]
+
+        self.assertEqual(verificator.get_principal(self._credentials("token-1")).sub, "1")
+        self.assertEqual(verificator.get_principal(self._credentials("token-2")).sub, "2")
+        self.assertEqual(self.mock_verify.call_count, 2)
+
+    def test_expired_claims_not_cached(self):
+        self.mock_verify.return_value = {"sub": "1", "exp": time.time() - 1}
+
+        verificator.get_principal(self._credentials("token-1"))
+        verificator.get_principal(self._credentials("token-1"))
+
+        self.assertEqual(self.mock_verify.call_count, 2)
+
+    def test_rejected_token_not_cached(self):
+        self.mock_verify.side_effect = ValueError("Wrong signature")
+
+        for _ in range(2):
+            with self.assertRaises(verificator.HTTPException) as context:
+                verificator.get_principal(self._credentials("token-1"))
+            self.assertEqual(context.exception.status_code, 401)
+
+        self.assertEqual(self.mock_verify.call_count, 2)
+        self.assertEqual(verificator.token_cache.stats()["size"], 0)
+
+class TestPrincipal(unittest.TestCase):
+    def setUp(self):
+        self.patcher = patch("verificator.employeDAO")
+        self.mock_employe_dao = self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def _principal(self, rol: int) -> verificator.Principal:
+        self.mock_employe_dao.get_employee_by_id.return_value = Employe(employe_id="1", name="John", family_name="Doe", email="john@example.com", rol=rol)
+        return verificator.Principal({"sub": "1"})
+
+    def test_role_loaded_once(self):
+        principal = self._principal(2)
+
+        # Every check of a request runs against the same principal
+        self.assertEqual(verificator.verifyTokenEmployee(principal), {"sub": "1"})
+        verificator.verifyTokenCURProduct(principal)
+        self.assertEqual(verificator.verifyToken(principal), {"sub": "1"})
+
+        self.mock_employe_dao.get_employee_by_id.assert_called_once_with("1")
+
+    def test_claims_only_do_not_load_role(self):
+        verificator.verifyToken(self._principal(0))
+        self.mock_employe_dao.get_employee_by_id.assert_not_called()
+
+    def test_role_checks(self):
+        with self.assertRaises(verificator.HTTPException) as context:
+            verificator.verifyTokenEmployee(self._principal(0))
+        self.assertEqual(context.exception.status_code, 403)
+
+        with self.assertRaises(verificator.HTTPException):
+            verificator.verifyTokenAdmin(self._principal(2))
+        verificator.verifyTokenAdmin(self._principal(1))
+
+        with self.assertRaises(verificator.HTTPException):
+            verificator.verifyTokenCURProduct(self._principal(3))
+        verificator.verifyTokenCURProduct(self._principal(4))
+
+    def test_unknown_employee(self):
+        self.mock_employe_dao.get_employee_by_id.side_effect = ValueError("Employee with ID 1 not found.")
+
+        with self.assertRaises(ValueError):
+            verificator.verifyTokenEmployee(verificator.Principal({"sub": "1"}))
+
+    def test_checks_share_one_dependency(self):
+        # FastAPI caches a dependency per request, so every check reuses one get_principal call
+        for check in (verificator.verifyToken, verificator.verifyTokenEmployee, verificator.verifyTokenAdmin, verificator.verifyTokenCURProduct):
+            self.assertIs(inspect.signature(check).parameters["principal"].default.dependency, verificator.get_principal)
+
+if __name__ == "__main__":
+    unittest.main()
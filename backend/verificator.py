@@ -1,15 +1,20 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials 
 from dotenv import load_dotenv
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+from google.auth.exceptions import GoogleAuthError
+from typing import Optional
 import jwt
+import hashlib
 import os
+import time
 
 import logging 
 
 
 from DAO.employeDAO import EmployeDAO
+from DAO.employe import Employe
+from cache import TTLCache, load_cache_env
+from certificateStore import CertificateStore, GOOGLE_CERTS_URL
 
 security = HTTPBearer()
 employeDAO = EmployeDAO()
@@ -21,13 +26,76 @@ load_dotenv(env_path)
 CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 
-def verifyToken(token: HTTPAuthorizationCredentials = Depends(security)) -> dict[str, str]:
+# Claims of the tokens already verified, keyed by token hash, kept until the token expires
+TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL = load_cache_env("TOKEN_CACHE", 1024, 3600.0)
+token_cache = TTLCache[str, dict[str, str]]("token", TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+
+# Google signing keys, fetched once and verified against locally. GOOGLE_CERTS_URL may also be a local file.
+certificate_store = CertificateStore(os.getenv("GOOGLE_CERTS_URL", GOOGLE_CERTS_URL))
+
+def verify_google_token(credentials: str) -> dict[str, str]:
     """
-    Verify the token
+    Verify a Google ID token, reusing the claims of a token verified before.
+    :param credentials: The token.
+    :return: The claims of the token.
     """
+    token_hash = hashlib.sha256(credentials.encode()).hexdigest()
 
-    logging.debug("Verifying token")
+    decoded_token = token_cache.get(token_hash)
+    if decoded_token is not None:
+        return decoded_token
+
+    decoded_token = certificate_store.verify(credentials, CLIENT_ID)
+
+    # Never keep the claims past the expiration of the token
+    token_cache.set(token_hash, decoded_token, ttl=float(decoded_token["exp"]) - time.time())
+    return decoded_token
+
+class Principal:
+    """
+    Authenticated user of a request: the claims of the token and, loaded on first use, the employee.
+    """
+
+    def __init__(self, claims: dict[str, str]):
+        self.claims = claims
+        self._employe: Optional[Employe] = None
+
+    @property
+    def sub(self) -> str:
+        return self.claims["sub"]
+
+    @property
+    def employe(self) -> Employe:
+        """
+        The employee of the user, loaded once per request.
+        """
+        if self._employe is None:
+            try:
+                self._employe = employeDAO.get_employee_by_id(self.sub)
+            except ValueError:
+                raise ValueError("Employee not found")
+        return self._employe
+
+    @property
+    def rol(self) -> int:
+        return self.employe.rol
+
+    def is_employee(self) -> bool:
+        return self.rol != 0
+
+    def is_admin(self) -> bool:
+        return self.rol == 1
+
+    def can_manage_products(self) -> bool:
+        # 0 = none, 1 = admin, 2 = manager, 3 = sales, 4 = warehouse manager
+        return self.rol not in (0, 3)
 
+def get_principal(token: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
+    """
+    Verify the token once per request, every role check below depends on this
+    """
+
+    logging.debug("Verifying token")
 
     credentials = token.credentials  # Extract the actual token string
 
@@ -40,131 +108,47 @@ def verifyToken(token: HTTPAuthorizationCredentials = Depends(security)) -> dict
 
     # Verify the token
     try:
-        decoded_token = id_token.verify_oauth2_token( #type: ignore
-            credentials,
-            request=google_requests.Request(),
-            audience=CLIENT_ID
-        )
-
-        logging.info(f"Token verified for user: {decoded_token['sub']}")
-        return decoded_token
-    
+        decoded_token = verify_google_token(credentials)
     except jwt.ExpiredSignatureError:
         logging.debug("Token has expired")
         raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.InvalidTokenError:
+    except (jwt.InvalidTokenError, ValueError, GoogleAuthError):
         logging.debug("Invalid token")
-
         raise HTTPException(status_code=401, detail="Invalid token")
+
+    logging.info(f"Token verified for user: {decoded_token['sub']}")
+    # Handlers may add fields to their claims, the cached ones stay untouched
+    return Principal(dict(decoded_token))
+
+def verifyToken(principal: Principal = Depends(get_principal)) -> dict[str, str]:
+    """
+    Verify the token
+    """
+    return principal.claims
     
-def verifyTokenEmployee(token: HTTPAuthorizationCredentials = Depends(security)) -> dict[str, str]:
+def verifyTokenEmployee(principal: Principal = Depends(get_principal)) -> dict[str, str]:
     """
     Verify the token and check if the user is an employee
     """
+    if not principal.is_employee():
+        raise HTTPException(status_code=403, detail="User is not an employee")
+    return principal.claims
     
-    print("Verifying token")  # TODO: REMOVE WHEN LOGGER IS READY
-
-    credentials = token.credentials  # Extract the actual token string
-
-    # Verify loaded environment variables
-    if CLIENT_ID is None or CLIENT_SECRET is None:
-        raise HTTPException(status_code=500, detail="Missing environment variables")
-
-    # Verify the token
-    try:
-        decoded_token = id_token.verify_oauth2_token( #type: ignore
-            credentials,
-            request=google_requests.Request(),
-            audience=CLIENT_ID
-        )
-        
-        employe = employeDAO.get_employee_by_id(decoded_token["sub"])
-        
-        if employe.rol == 0:
-            raise HTTPException(status_code=403, detail="User is not an employee")
-        return decoded_token
-    
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except ValueError:
-        raise ValueError("Employee not found")
-    
-    
-def verifyTokenAdmin(token: HTTPAuthorizationCredentials = Depends(security)) -> None:
+def verifyTokenAdmin(principal: Principal = Depends(get_principal)) -> None:
     """
     Verify the token and check if the user is an admin
     """
     logging.debug("Verifying token for admin")
 
-    credentials = token.credentials  # Extract the actual token string
-
-    # Verify loaded environment variables
-    if CLIENT_ID is None or CLIENT_SECRET is None:
-        logging.debug("Missing environment variables")
-
-        raise HTTPException(status_code=500, detail="Missing environment variables")
-
-    # Verify the token
-    try:
-        decoded_token = id_token.verify_oauth2_token( #type: ignore
-            credentials,
-            request=google_requests.Request(),
-            audience=CLIENT_ID
-        )
-        
-        employe = employeDAO.get_employee_by_id(decoded_token["sub"])
-        
-        if employe.rol != 1:
-
-            logging.debug("User is not an admin")
-            raise HTTPException(status_code=403, detail="User is not an admin")
-        
-        logging.info(f"Token verified for admin")
-    
-    except jwt.ExpiredSignatureError:
-        logging.debug("Token has expired")
-        raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.InvalidTokenError:
-        logging.debug("Invalid token")
+    if not principal.is_admin():
+        logging.debug("User is not an admin")
+        raise HTTPException(status_code=403, detail="User is not an admin")
 
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except ValueError:
-        raise ValueError("Employee not found")
+    logging.info(f"Token verified for admin")
     
-def verifyTokenCURProduct(token: HTTPAuthorizationCredentials = Depends(security)) -> None:
+def verifyTokenCURProduct(principal: Principal = Depends(get_principal)) -> None:
     """
     Verify the token and check if the user have the permission to create, update or remove products
     """
-   
-    print("Verifying token CUR Product")  # TODO: REMOVE WHEN LOGGER IS READY
-
-    credentials = token.credentials  # Extract the actual token string
-
-    # Verify loaded environment variables
-    if CLIENT_ID is None or CLIENT_SECRET is None:
-        raise HTTPException(status_code=500, detail="Missing environment variables")
-
-    # Verify the token
-    try:
-        decoded_token = id_token.verify_oauth2_token( #type: ignore
-            credentials,
-            request=google_requests.Request(),
-            audience=CLIENT_ID
-        )
-        
-        employe = employeDAO.get_employee_by_id(decoded_token["sub"])
-        
-        # Check if the user has the permission to create, update or remove products
-        # 0 = none, 1 = admin, 2 = manager, 3 = sales, 4 = warehouse manager
-        if employe.rol == 3 or employe.rol == 0:
-            raise HTTPException(status_code=403, detail="User is not allowed to create, update or remove products")
-
-    
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except ValueError:
-        raise ValueError("Employee not found")
\ No newline at end of file
+    if not principal.can_manage_products():
+        raise HTTPException(status_code=403, detail="User is not allowed to create, update or remove products")